@@ -1,2 +1,135 @@
+import os
+
 TRAIN_TEST_SPLIT_RATIO = 0.3
 DEFAULT_NULL_STRATEGY = "auto"  # drop | mean | auto
+
+# Parsed uploads kept in memory, keyed by content hash
+DATASET_CACHE_MAX_BYTES = int(os.getenv("DATASET_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+# Columnar (.npy per column) copies of uploads, memory-mapped on later reads; empty disables
+COLUMN_CACHE_DIR = os.getenv("COLUMN_CACHE_DIR", "cache/columns")
+COLUMN_CACHE_MAX_BYTES = int(os.getenv("COLUMN_CACHE_MAX_BYTES", 4 * 1024 * 1024 * 1024))
+
+# Candidate model training: serial | thread | process
+TRAINING_EXECUTOR = os.getenv("TRAINING_EXECUTOR", "serial")
+TRAINING_POOL_SIZE = int(os.getenv("TRAINING_POOL_SIZE", os.cpu_count() or 1))
+# Upper bound on pool slots a single request may occupy at once
+TRAINING_MAX_WORKERS_PER_REQUEST = int(os.getenv("TRAINING_MAX_WORKERS_PER_REQUEST", 4))
+# Counted from when the pool starts a fit; a timed-out fit is abandoned, not killed, and keeps
+# its slot until it returns. Serial mode cannot interrupt a fit and applies no timeout.
+MODEL_FIT_TIMEOUT_SECONDS = float(os.getenv("MODEL_FIT_TIMEOUT_SECONDS", 300))
+
+# Background regression jobs
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", 32))
+# Finished jobs kept for status polling before the oldest are forgotten
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", 200))
+
+# Column dtypes for parsed uploads: optimized (sampled schema inference) | default (read_csv's)
+CSV_DTYPES = os.getenv("CSV_DTYPES", "default")
+# Rows sampled to infer the schema before the full parse
+CSV_SCHEMA_SAMPLE_ROWS = int(os.getenv("CSV_SCHEMA_SAMPLE_ROWS", 10_000))
+# String columns become category when distinct values are at most this share of sampled non-nulls
+CSV_CATEGORY_MAX_RATIO = float(os.getenv("CSV_CATEGORY_MAX_RATIO", 0.5))
+# Relative error allowed when narrowing float64 to float32; 0 only narrows exactly representable columns
+CSV_FLOAT32_TOLERANCE = float(os.getenv("CSV_FLOAT32_TOLERANCE", 0))
+
+# Chunked CSV reading: rows per chunk bound the peak memory of streaming paths
+CSV_CHUNK_ROWS = int(os.getenv("CSV_CHUNK_ROWS", 100_000))
+# Uploads at least this large are previewed by streaming instead of a full parse
+PREVIEW_STREAMING_MIN_BYTES = int(os.getenv("PREVIEW_STREAMING_MIN_BYTES", 64 * 1024 * 1024))
+
+# EDA statistics engine: rows per partial state and threads merging them
+EDA_CHUNK_ROWS = int(os.getenv("EDA_CHUNK_ROWS", 250_000))
+EDA_WORKERS = int(os.getenv("EDA_WORKERS", min(os.cpu_count() or 1, 8)))
+
+# Column recommendation: exact | fast (sketched distinct counts, sampled correlations)
+RECOMMENDATION_MODE = os.getenv("RECOMMENDATION_MODE", "exact")
+# Rows sampled by fast mode for target-scoring correlations and the ID pre-check
+RECOMMENDATION_SAMPLE_ROWS = int(os.getenv("RECOMMENDATION_SAMPLE_ROWS", 10_000))
+# Confidence level of the reported correlation and score bounds
+RECOMMENDATION_CONFIDENCE = float(os.getenv("RECOMMENDATION_CONFIDENCE", 0.95))
+
+# Regression plot payloads
+PLOT_MAX_POINTS = int(os.getenv("PLOT_MAX_POINTS", 1000))  # per split
+PLOT_DENSITY_BINS = int(os.getenv("PLOT_DENSITY_BINS", 40))
+PLOT_HISTOGRAM_BINS = int(os.getenv("PLOT_HISTOGRAM_BINS", 50))
+
+# Per-run plot/result store
+RUN_STORE_MAX_BYTES = int(os.getenv("RUN_STORE_MAX_BYTES", 256 * 1024 * 1024))
+RUN_STORE_TTL_SECONDS = float(os.getenv("RUN_STORE_TTL_SECONDS", 3600))
+# Empty disables the disk tier; otherwise runs evicted for space are spilled here
+RUN_STORE_SPILL_DIR = os.getenv("RUN_STORE_SPILL_DIR", "")
+RUN_STORE_SPILL_MAX_BYTES = int(os.getenv("RUN_STORE_SPILL_MAX_BYTES", 2 * 1024 * 1024 * 1024))
+
+# Where runs, memoized regression results and the latest-run pointer live:
+# memory (per process) | sqlite (one file shared by all workers on the host)
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory")
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", "cache/state.sqlite3")
+# Byte budget of pickled run payloads in the SQLite backend (LRU by last access)
+STATE_RUN_MAX_BYTES = int(os.getenv("STATE_RUN_MAX_BYTES", 2 * 1024 * 1024 * 1024))
+
+# Batch prediction
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", 8))  # loaded pipelines kept in memory
+PREDICT_CHUNK_ROWS = int(os.getenv("PREDICT_CHUNK_ROWS", 100_000))
+
+# Model registry
+MODEL_REGISTRY_DB = os.getenv("MODEL_REGISTRY_DB", "models/registry.sqlite3")
+# joblib zlib level; 0 stores artifacts uncompressed so they load memory-mapped
+MODEL_ARTIFACT_COMPRESSION = int(os.getenv("MODEL_ARTIFACT_COMPRESSION", 3))
+# Retention: keep at most this many artifacts, none older than this many days (0 disables)
+MODEL_RETENTION_MAX_COUNT = int(os.getenv("MODEL_RETENTION_MAX_COUNT", 200))
+MODEL_RETENTION_DAYS = float(os.getenv("MODEL_RETENTION_DAYS", 30))
+# Also prune artifacts that predate the registry (indexed by file mtime, no metadata)
+MODEL_RETENTION_INCLUDE_LEGACY = os.getenv("MODEL_RETENTION_INCLUDE_LEGACY", "false").lower() == "true"
+
+# Hyperparameters for Ridge/Lasso/ElasticNet: fixed | path
+REGRESSION_TUNING = os.getenv("REGRESSION_TUNING", "fixed")
+# Share of training rows held out to score Lasso/ElasticNet regularization paths
+TUNING_VALIDATION_FRACTION = float(os.getenv("TUNING_VALIDATION_FRACTION", 0.2))
+
+# Training engine: memory (full frame) | streaming (chunked Gram matrices) | auto
+TRAINING_ENGINE = os.getenv("TRAINING_ENGINE", "memory")
+# auto switches to streaming for uploads at least this large
+STREAMING_TRAIN_MIN_BYTES = int(os.getenv("STREAMING_TRAIN_MIN_BYTES", 256 * 1024 * 1024))
+# Gram matrices are width^2 float64 per split; wider encodings are rejected
+STREAMING_MAX_DESIGN_COLUMNS = int(os.getenv("STREAMING_MAX_DESIGN_COLUMNS", 2048))
+# Degree-2 polynomial is skipped when its expanded width exceeds this
+STREAMING_MAX_POLY_COLUMNS = int(os.getenv("STREAMING_MAX_POLY_COLUMNS", 1024))
+# Rows per split kept (uniformly sampled) for plots of streamed runs
+STREAMING_PLOT_SAMPLE_ROWS = int(os.getenv("STREAMING_PLOT_SAMPLE_ROWS", 20_000))
+
+# Estimated memory allowed for the PolynomialRegression expansion (train + test)
+POLY_MEMORY_BUDGET_BYTES = int(os.getenv("POLY_MEMORY_BUDGET_BYTES", 512 * 1024 * 1024))
+
+# Model evaluation: holdout (TRAIN_TEST_SPLIT_RATIO split) | kfold (cross-validation)
+REGRESSION_EVALUATION = os.getenv("REGRESSION_EVALUATION", "holdout")
+CV_FOLDS = int(os.getenv("CV_FOLDS", 5))
+# Wall-clock budget for k-fold scoring; folds beyond what fits after the first are skipped
+CV_TIME_BUDGET_SECONDS = float(os.getenv("CV_TIME_BUDGET_SECONDS", 60))
+
+# Memoized /api/regression responses keyed by content hash and request parameters; 0 disables
+REGRESSION_CACHE_MAX_BYTES = int(os.getenv("REGRESSION_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+
+# Best-model selection: full (every candidate on all rows) | halving (successive halving)
+MODEL_SELECTION = os.getenv("MODEL_SELECTION", "full")
+# Halving starts at this many training rows and multiplies rows / divides candidates by the factor
+HALVING_MIN_ROWS = int(os.getenv("HALVING_MIN_ROWS", 5_000))
+HALVING_FACTOR = int(os.getenv("HALVING_FACTOR", 3))
+
+# Admission control: requests reserve their estimated peak memory against this budget.
+# 0 uses ADMISSION_MEMORY_FRACTION of the container (cgroup) or host memory; -1 disables.
+# The budget covers the whole server and is split evenly across WEB_CONCURRENCY processes.
+ADMISSION_MEMORY_BYTES = int(os.getenv("ADMISSION_MEMORY_BYTES", 0))
+ADMISSION_MEMORY_FRACTION = float(os.getenv("ADMISSION_MEMORY_FRACTION", 0.7))
+# Worker processes sharing the host; uvicorn and gunicorn read the same variable
+WEB_CONCURRENCY = max(int(os.getenv("WEB_CONCURRENCY", 1)), 1)
+# Seconds a request waits for memory or a concurrency slot before 503 + Retry-After
+ADMISSION_QUEUE_SECONDS = float(os.getenv("ADMISSION_QUEUE_SECONDS", 10))
+# Seconds a background job waits for its reservation before failing with 503 (0 waits without limit)
+ADMISSION_JOB_QUEUE_SECONDS = float(os.getenv("ADMISSION_JOB_QUEUE_SECONDS", 600))
+# Concurrent requests per endpoint group (regression includes running jobs)
+ADMISSION_REGRESSION_CONCURRENCY = int(os.getenv("ADMISSION_REGRESSION_CONCURRENCY", 2))
+ADMISSION_ANALYSIS_CONCURRENCY = int(os.getenv("ADMISSION_ANALYSIS_CONCURRENCY", 4))
+ADMISSION_PREDICT_CONCURRENCY = int(os.getenv("ADMISSION_PREDICT_CONCURRENCY", 4))
+# Uploads above this size are rejected with 413; 0 disables
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 4 * 1024 * 1024 * 1024))
@@ -1,13 +1,36 @@
-from fastapi import FastAPI, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, UploadFile, File, Form, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 import os
-from app.utils.csv_preview import analyze_csv
+import shutil
+import tempfile
+import time
+from functools import partial
+from app.utils.csv_preview import analyze_csv_streaming, summarize_dataframe
+from app.utils.csv_loader import upload_size
+from app.core.config import MAX_UPLOAD_BYTES, PLOT_MAX_POINTS, PREVIEW_STREAMING_MIN_BYTES
 from app.services.regression_service import run_regression
 from app.services.plot_store import PLOT_STORE
+from app.services.result_cache import REGRESSION_RESULTS
+from app.services.job_queue import JOB_MANAGER
+from app.services.prediction_service import MODEL_CACHE, stream_predictions
+from app.utils.model_storage import MODEL_REGISTRY, resolve_model_path
 from fastapi import HTTPException
-from app.utils.csv_loader import load_csv
-from app.utils.eda_analyzer import analyze_eda
+from app.services.dataset_store import DATASET_CACHE, register_upload, resolve_dataset
+from app.services.column_store import COLUMN_STORE
+from app.services.admission import (
+    ADMISSION,
+    admitted_job,
+    estimate_analysis,
+    estimate_prediction,
+    estimate_regression,
+    estimate_upload,
+)
+from app.utils.json_response import FastJSONResponse
+from app.utils.timing import stage, timer_scope, with_timings
+from app.services.metrics import REQUEST_SECONDS, observe_timer, render_metrics
+from app.utils.eda_analyzer import analyze_eda, analyze_eda_streaming
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.background import BackgroundTask
 
 app = FastAPI(title="Regression Visualization API")
 
@@ -28,58 +51,286 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# =========================
+# STAGE TIMING & METRICS
+# =========================
+@app.middleware("http")
+async def stage_timing(request: Request, call_next):
+    start = time.perf_counter()
+    with timer_scope() as timer:
+        response = await call_next(request)
+
+    # Route template keeps label cardinality bounded (no ids in paths)
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", "unmatched")
+
+    REQUEST_SECONDS.observe(
+        time.perf_counter() - start,
+        request.method,
+        route_path,
+        str(response.status_code)
+    )
+    observe_timer(route_path, timer)
+    response.headers["Server-Timing"] = timer.server_timing()
+    return response
+
+# Rejected from the Content-Length header, before the body is received
+@app.middleware("http")
+async def upload_limit(request: Request, call_next):
+    length = request.headers.get("content-length", "")
+    if MAX_UPLOAD_BYTES and length.isdigit() and int(length) > MAX_UPLOAD_BYTES:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Upload exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit"}
+        )
+    return await call_next(request)
+
+@app.get("/metrics")
+def metrics():
+    dataset_stats = DATASET_CACHE.stats()
+    run_stats = PLOT_STORE.stats()
+    job_stats = JOB_MANAGER.stats()
+    admission_stats = ADMISSION.stats()
+    gauges = [
+        ("regviz_dataset_cache_bytes", "Bytes held by the parsed dataset cache.", dataset_stats["current_bytes"]),
+        ("regviz_dataset_cache_entries", "Datasets held by the parsed dataset cache.", dataset_stats["entries"]),
+        ("regviz_column_cache_bytes", "Bytes on disk in the columnar dataset cache.", COLUMN_STORE.stats()["current_bytes"]),
+        ("regviz_regression_cache_bytes", "Bytes held by memoized regression responses.", REGRESSION_RESULTS.stats()["current_bytes"]),
+        ("regviz_run_store_bytes", "Bytes held by the run store.", run_stats["current_bytes"]),
+        ("regviz_run_store_runs", "Runs held by the run store.", run_stats["runs"]),
+        ("regviz_job_queue_depth", "Regression jobs waiting for a worker.", job_stats["queue_depth"]),
+        ("regviz_jobs_running", "Regression jobs currently running.", job_stats["running"]),
+        ("regviz_model_cache_entries", "Loaded models held for prediction.", MODEL_CACHE.stats()["entries"]),
+        ("regviz_admission_reserved_bytes", "Estimated peak bytes reserved by admitted requests.", admission_stats["reserved_bytes"]),
+        ("regviz_admission_waiting", "Requests waiting for memory or a concurrency slot.", admission_stats["waiting"]),
+    ]
+    return PlainTextResponse(render_metrics(gauges), media_type="text/plain; version=0.0.4")
+
+# =========================
+# DATASET UPLOAD (PARSE ONCE)
+# =========================
+@app.post("/api/dataset/upload")
+def upload_dataset(file: UploadFile = File(...)):
+    with ADMISSION.reserve("analysis", estimate_upload(file), "upload"):
+        dataset = register_upload(file)
+    df = dataset["df"]
+    return {
+        "dataset_id": dataset["dataset_id"],
+        "filename": dataset["filename"],
+        "rows": len(df),
+        "columns": len(df.columns),
+        "memory_bytes": dataset["nbytes"],
+        "cached": dataset["dataset_id"] in DATASET_CACHE
+    }
+
+@app.get("/api/dataset/cache/stats")
+def dataset_cache_stats():
+    return {**DATASET_CACHE.stats(), "columnar": COLUMN_STORE.stats()}
+
 # =========================
 # CSV PREVIEW
 # =========================
 @app.post("/api/csv/preview")
-async def preview_csv(
-    file: UploadFile = File(...)
+def preview_csv(
+    file: UploadFile = File(None),
+    dataset_id: str = Form(None),
+    streaming: bool = Form(None),
+    timings: bool = Query(False)
 ):
-    return analyze_csv(file)
+    # Large uploads are summarized chunk by chunk instead of being parsed whole
+    if not dataset_id and file is not None and streaming is None:
+        streaming = upload_size(file) >= PREVIEW_STREAMING_MIN_BYTES
+
+    with ADMISSION.reserve("analysis", estimate_analysis(file, dataset_id, streaming), "preview"):
+        if not dataset_id and file is not None and streaming:
+            return FastJSONResponse(with_timings(analyze_csv_streaming(file), timings))
+
+        dataset = resolve_dataset(file, dataset_id)
+        summary = summarize_dataframe(dataset["df"], dataset["filename"])
+    return FastJSONResponse(with_timings(summary, timings))
 
 # =========================
 # REGRESSION (CSV RAW → ML)
 # =========================
 @app.post("/api/regression")
-async def regression(
-    file: UploadFile = File(...),
-    target_column: str = Form(...),
+def regression(
+    file: UploadFile = File(None),
+    target_column: str = Form(None),
     feature_columns: str = Form(...),
-    null_strategy: str = Form("auto")
+    null_strategy: str = Form("auto"),
+    dataset_id: str = Form(None),
+    execution_mode: str = Form(None),
+    max_workers: int = Form(None),
+    tuning: str = Form(None),
+    engine: str = Form(None),
+    selection: str = Form(None),
+    evaluation: str = Form(None),
+    target_columns: str = Form(None),
+    use_cache: bool = Form(True),
+    timings: bool = Query(False)
 ):
     features = [c.strip() for c in feature_columns.split(",") if c.strip()]
-    return run_regression(
+    targets = target_columns.split(",") if target_columns else [target_column]
+    estimate = estimate_regression(
+        file, dataset_id, len(features) + len(targets), engine, execution_mode, max_workers, evaluation
+    )
+    ADMISSION.check(estimate)
+    # Reserved only if the result is not already memoized
+    result = run_regression(
         file=file,
         target_column=target_column,
+        target_columns=target_columns.split(",") if target_columns else None,
         feature_columns=features,
-        null_strategy=null_strategy
+        null_strategy=null_strategy,
+        dataset_id=dataset_id,
+        execution_mode=execution_mode,
+        max_workers=max_workers,
+        tuning=tuning,
+        engine=engine,
+        selection=selection,
+        evaluation=evaluation,
+        use_cache=use_cache,
+        admission=partial(ADMISSION.reserve, "regression", estimate, "regression")
+    )
+    return FastJSONResponse(with_timings(result, timings))
+
+@app.get("/api/regression/cache/stats")
+def regression_cache_stats():
+    return REGRESSION_RESULTS.stats()
+
+# =========================
+# REGRESSION JOBS (BACKGROUND)
+# =========================
+@app.post("/api/jobs/regression", status_code=202)
+def submit_regression_job(
+    file: UploadFile = File(None),
+    target_column: str = Form(None),
+    feature_columns: str = Form(...),
+    null_strategy: str = Form("auto"),
+    dataset_id: str = Form(None),
+    execution_mode: str = Form(None),
+    max_workers: int = Form(None),
+    tuning: str = Form(None),
+    engine: str = Form(None),
+    selection: str = Form(None),
+    evaluation: str = Form(None),
+    target_columns: str = Form(None),
+    use_cache: bool = Form(True)
+):
+    features = [c.strip() for c in feature_columns.split(",") if c.strip()]
+    targets = target_columns.split(",") if target_columns else [target_column]
+    kwargs = {
+        "target_column": target_column,
+        "target_columns": target_columns.split(",") if target_columns else None,
+        "feature_columns": features,
+        "null_strategy": null_strategy,
+        "dataset_id": dataset_id,
+        "execution_mode": execution_mode,
+        "max_workers": max_workers,
+        "tuning": tuning,
+        "engine": engine,
+        "selection": selection,
+        "evaluation": evaluation,
+        "use_cache": use_cache
+    }
+
+    # Estimated (and rejected if too large) now; reserved when a job worker picks it up
+    estimate = estimate_regression(
+        file, dataset_id, len(features) + len(targets), engine, execution_mode, max_workers, evaluation
     )
+    ADMISSION.check(estimate)
+
+    cleanup = None
+    if not dataset_id and file is not None:
+        # The request closes its upload on return, so the job gets its own copy
+        spooled = tempfile.TemporaryFile()
+        shutil.copyfileobj(file.file, spooled)
+        spooled.seek(0)
+        kwargs["file"] = UploadFile(file=spooled, filename=file.filename)
+        cleanup = spooled.close
+
+    job = admitted_job(run_regression, "regression", estimate, "job")
+    return JOB_MANAGER.submit(job, kwargs, cleanup=cleanup)
+
+@app.get("/api/admission/stats")
+def admission_stats():
+    return ADMISSION.stats()
+
+@app.get("/api/jobs/stats")
+def job_stats():
+    return JOB_MANAGER.stats()
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    return JOB_MANAGER.get(job_id)
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str):
+    return JOB_MANAGER.cancel(job_id)
+
 #==========================
 # GET PLOT
 #==========================
 
-from app.services.plot_store import PLOT_STORE
-from fastapi import HTTPException
+PLOT_MODES = {"auto", "raw", "lttb", "minmax", "density", "residuals"}
 
 @app.get("/api/regression/plot")
-def get_regression_plot():
-    if "last" not in PLOT_STORE:
+def get_regression_plot(run_id: str = None, mode: str = "auto"):
+    if mode not in PLOT_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid mode. Use one of: {', '.join(sorted(PLOT_MODES))}"
+        )
+
+    # Without a run_id the most recent run is served, as before
+    if run_id:
+        run = PLOT_STORE.get(run_id)
+    else:
+        run_id, run = PLOT_STORE.latest()
+
+    if run is None:
         raise HTTPException(
             status_code=404,
             detail="No regression plot data available. Run regression first."
         )
 
-    return PLOT_STORE["last"]
+    plot = run["plot"]
+
+    # auto: full points while small, shape-preserving downsample beyond that
+    if mode == "auto":
+        largest = max(len(plot[split]["y_actual"]) for split in ("train", "test"))
+        mode = "raw" if largest <= PLOT_MAX_POINTS else "lttb"
+
+    if mode == "raw":
+        # NumPy arrays go straight to the encoder, no per-element conversion
+        return FastJSONResponse({
+            split: {
+                "y_actual": plot[split]["y_actual"],
+                "y_pred": plot[split]["y_pred"]
+            }
+            for split in ("train", "test")
+        })
+
+    return FastJSONResponse({"mode": mode, **plot["views"][mode]})
+
+@app.get("/api/runs/stats")
+def run_store_stats():
+    return PLOT_STORE.stats()
+
+@app.get("/api/runs/{run_id}")
+def get_run(run_id: str):
+    run = PLOT_STORE.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Run '{run_id}' not found or expired")
+    return run["result"]
 
 # =========================
 # DOWNLOAD SAVED MODEL
 # =========================
 @app.get("/api/model/download")
 async def download_model(filename: str):
-    path = f"models/saved/{filename}"
-
-    if not os.path.exists(path):
-        return {"error": "Model not found"}
+    # Registry lookup instead of joining user input into a path
+    path = resolve_model_path(filename)
 
     return FileResponse(
         path,
@@ -87,14 +338,95 @@ async def download_model(filename: str):
         filename=filename
     )
 
+# =========================
+# MODEL REGISTRY
+# =========================
+@app.get("/api/models")
+def list_models(
+    model_name: str = None,
+    dataset_id: str = None,
+    target: str = None,
+    feature: str = None,
+    min_test_r2: float = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0)
+):
+    return MODEL_REGISTRY.search(
+        model_name=model_name,
+        dataset_id=dataset_id,
+        target=target,
+        feature=feature,
+        min_test_r2=min_test_r2,
+        limit=limit,
+        offset=offset
+    )
+
+@app.get("/api/models/{filename}")
+def get_model_entry(filename: str):
+    entry = MODEL_REGISTRY.get(filename)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+    return entry
+
+# =========================
+# BATCH PREDICTION
+# =========================
+@app.post("/api/model/{filename}/predict")
+def predict_with_model(
+    filename: str,
+    file: UploadFile = File(None),
+    dataset_id: str = Form(None),
+    format: str = Form("csv"),
+    id_column: str = Form(None)
+):
+    model_bytes = os.path.getsize(resolve_model_path(filename))
+    ticket = ADMISSION.acquire(
+        "predict", estimate_prediction(model_bytes, file, dataset_id), "predict"
+    )
+    try:
+        df = resolve_dataset(dataset_id=dataset_id)["df"] if dataset_id else None
+        chunks, media_type = stream_predictions(
+            filename,
+            file=file,
+            df=df,
+            fmt=format,
+            id_column=id_column
+        )
+    except BaseException:
+        ADMISSION.release(ticket)
+        raise
+    # Held until the streamed body is finished
+    return StreamingResponse(
+        ADMISSION.held(ticket, chunks),
+        media_type=media_type,
+        background=BackgroundTask(ADMISSION.release, ticket)
+    )
+
+@app.get("/api/model/cache/stats")
+def model_cache_stats():
+    return MODEL_CACHE.stats()
+
 # =========================
 # EDA ANALYSIS
 # =========================
 
 @app.post("/api/csv/eda")
-async def csv_eda(file: UploadFile = File(...)):
-    df = load_csv(file)
-    return analyze_eda(df)
+def csv_eda(
+    file: UploadFile = File(None),
+    dataset_id: str = Form(None),
+    streaming: bool = Form(None),
+    timings: bool = Query(False)
+):
+    if not dataset_id and file is not None and streaming is None:
+        streaming = upload_size(file) >= PREVIEW_STREAMING_MIN_BYTES
+
+    with ADMISSION.reserve("analysis", estimate_analysis(file, dataset_id, streaming), "eda"):
+        if not dataset_id and file is not None and streaming:
+            return FastJSONResponse(with_timings(analyze_eda_streaming(file), timings))
+
+        df = resolve_dataset(file, dataset_id)["df"]
+        eda = analyze_eda(df)
+    return FastJSONResponse(with_timings(eda, timings))
 
 #==========================
 # regression recommendation
@@ -102,6 +434,14 @@ async def csv_eda(file: UploadFile = File(...)):
 from app.utils.recommendation_engine import recommend_regression_columns
 
 @app.post("/api/csv/recommendation")
-async def csv_recommendation(file: UploadFile = File(...)):
-    df = load_csv(file)
-    return recommend_regression_columns(df)
+def csv_recommendation(
+    file: UploadFile = File(None),
+    dataset_id: str = Form(None),
+    mode: str = Form(None),
+    timings: bool = Query(False)
+):
+    with ADMISSION.reserve("analysis", estimate_analysis(file, dataset_id), "recommendation"):
+        df = resolve_dataset(file, dataset_id)["df"]
+        with stage("recommend"):
+            recommendations = recommend_regression_columns(df, mode)
+    return FastJSONResponse(with_timings(recommendations, timings))
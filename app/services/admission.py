@@ -0,0 +1,389 @@
+import itertools
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from fastapi import HTTPException
+
+from app.core.config import (
+    ADMISSION_ANALYSIS_CONCURRENCY,
+    ADMISSION_JOB_QUEUE_SECONDS,
+    ADMISSION_MEMORY_BYTES,
+    ADMISSION_MEMORY_FRACTION,
+    ADMISSION_PREDICT_CONCURRENCY,
+    ADMISSION_QUEUE_SECONDS,
+    ADMISSION_REGRESSION_CONCURRENCY,
+    CSV_CHUNK_ROWS,
+    CV_FOLDS,
+    MAX_UPLOAD_BYTES,
+    POLY_MEMORY_BUDGET_BYTES,
+    PREDICT_CHUNK_ROWS,
+    REGRESSION_EVALUATION,
+    TRAINING_EXECUTOR,
+    TRAINING_MAX_WORKERS_PER_REQUEST,
+    WEB_CONCURRENCY,
+)
+from app.services.column_store import COLUMN_STORE
+from app.services.dataset_store import DATASET_CACHE
+from app.services.regression_service import resolve_engine
+from app.services.training_executor import TrainingCancelled
+from app.utils.csv_loader import upload_size
+
+# Parsing holds the CSV text buffers alongside the frame being built
+PARSE_BYTES_PER_CSV_BYTE = 2.0
+# Cleaning, the train/test split and the preprocessed matrices each copy the selected columns
+REGRESSION_WORKING_COPIES = 4
+# EDA and recommendation statistics allocate about one more frame of temporaries
+ANALYSIS_WORKING_COPIES = 1
+# Bytes read from the start of an upload to measure its header and mean row size
+LAYOUT_SAMPLE_BYTES = 64 * 1024
+# Retry-After before any request of a group has finished
+DEFAULT_RETRY_SECONDS = 5
+# Weight of the newest hold time in the per-group average behind Retry-After
+HOLD_SECONDS_SMOOTHING = 0.2
+# Seconds between cancellation checks of a waiting job
+CANCEL_POLL_SECONDS = 0.5
+
+
+class AdmissionController:
+    """Admits requests against a global memory budget and per-group slots.
+
+    Each request reserves its estimated peak bytes for as long as it runs.
+    Requests that do not fit wait up to `queue_seconds` and are then turned
+    away with 503 and a Retry-After based on recent hold times; requests
+    larger than the whole budget get 413 straight away. Waiters blocked on
+    memory are admitted oldest first, so large requests are not starved by
+    a stream of small ones.
+    """
+
+    def __init__(self, budget_bytes, limits, queue_seconds):
+        self.budget_bytes = budget_bytes
+        self.limits = limits
+        self.queue_seconds = queue_seconds
+        self._cond = threading.Condition()
+        self._tickets = itertools.count()
+        self._waiting = {}
+        self._reservations = {}
+        self._active = {group: 0 for group in limits}
+        self._hold_seconds = {}
+        self.reserved_bytes = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def enabled(self):
+        return self.budget_bytes >= 0
+
+    def acquire(self, group, nbytes, label=None, timeout=None, should_cancel=None):
+        """Reserves `nbytes` for one request of `group` and returns a ticket.
+        `timeout=None` uses `queue_seconds`; background jobs pass math.inf."""
+        nbytes = int(nbytes)
+        if not self.enabled:
+            return None
+        self.check(nbytes)
+
+        timeout = self.queue_seconds if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            ticket = next(self._tickets)
+            self._waiting[ticket] = {"group": group, "bytes": nbytes, "since": time.time()}
+            try:
+                while not self._admissible(ticket):
+                    if should_cancel and should_cancel():
+                        raise TrainingCancelled()
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timed_out += 1
+                        raise HTTPException(
+                            status_code=503,
+                            detail="Server is at its memory or concurrency limit. Try again later.",
+                            headers={"Retry-After": str(self._retry_after(group))}
+                        )
+                    wait = min(remaining, CANCEL_POLL_SECONDS) if should_cancel else remaining
+                    self._cond.wait(None if math.isinf(wait) else wait)
+            finally:
+                del self._waiting[ticket]
+                # An earlier waiter leaving can unblock later ones
+                self._cond.notify_all()
+
+            self._reservations[ticket] = {
+                "group": group,
+                "label": label,
+                "bytes": nbytes,
+                "admitted_at": time.time(),
+            }
+            self._active[group] += 1
+            self.reserved_bytes += nbytes
+            self.admitted += 1
+        return ticket
+
+    def check(self, nbytes):
+        # Requests that could never fit are rejected instead of queued
+        if self.enabled and nbytes > self.budget_bytes:
+            with self._cond:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=413,
+                detail=(
+                    f"Request needs about {_megabytes(nbytes)} MB of memory, more than the "
+                    f"server's {_megabytes(self.budget_bytes)} MB budget. Use a smaller file "
+                    "or the streaming engine."
+                )
+            )
+
+    def release(self, ticket):
+        # Safe to call more than once for the same ticket
+        if ticket is None:
+            return
+        with self._cond:
+            reservation = self._reservations.pop(ticket, None)
+            if reservation is None:
+                return
+            group = reservation["group"]
+            self._active[group] -= 1
+            self.reserved_bytes -= reservation["bytes"]
+            held = time.time() - reservation["admitted_at"]
+            previous = self._hold_seconds.get(group)
+            self._hold_seconds[group] = held if previous is None else (
+                HOLD_SECONDS_SMOOTHING * held + (1 - HOLD_SECONDS_SMOOTHING) * previous
+            )
+            self._cond.notify_all()
+
+    @contextmanager
+    def reserve(self, group, nbytes, label=None, timeout=None, should_cancel=None):
+        ticket = self.acquire(group, nbytes, label, timeout, should_cancel)
+        try:
+            yield
+        finally:
+            self.release(ticket)
+
+    def held(self, ticket, chunks):
+        # Keeps a reservation until a streamed response body is exhausted or closed
+        try:
+            yield from chunks
+        finally:
+            self.release(ticket)
+
+    def _admissible(self, ticket):
+        waiter = self._waiting[ticket]
+        if not self._slot_free(waiter["group"]):
+            return False
+        # An older waiter with a free slot is blocked on memory only and goes first
+        for other, older in self._waiting.items():
+            if other < ticket and self._slot_free(older["group"]):
+                return False
+        return self.reserved_bytes + waiter["bytes"] <= self.budget_bytes
+
+    def _slot_free(self, group):
+        return self._active[group] < self.limits[group]
+
+    def _retry_after(self, group):
+        hold = self._hold_seconds.get(group)
+        return max(1, math.ceil(hold)) if hold is not None else DEFAULT_RETRY_SECONDS
+
+    def stats(self):
+        now = time.time()
+        with self._cond:
+            return {
+                "enabled": self.enabled,
+                "budget_bytes": self.budget_bytes,
+                "reserved_bytes": self.reserved_bytes,
+                "available_bytes": max(self.budget_bytes - self.reserved_bytes, 0),
+                "waiting": len(self._waiting),
+                "groups": {
+                    group: {
+                        "active": self._active[group],
+                        "limit": limit,
+                        "waiting": sum(1 for w in self._waiting.values() if w["group"] == group),
+                        "avg_hold_seconds": self._hold_seconds.get(group)
+                    }
+                    for group, limit in self.limits.items()
+                },
+                "reservations": [
+                    {
+                        "group": r["group"],
+                        "label": r["label"],
+                        "bytes": r["bytes"],
+                        "held_seconds": now - r["admitted_at"]
+                    }
+                    for r in self._reservations.values()
+                ],
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+
+
+# =====================================================
+# PEAK MEMORY ESTIMATES
+# =====================================================
+def check_upload_size(size):
+    if MAX_UPLOAD_BYTES and size > MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Upload exceeds the {_megabytes(MAX_UPLOAD_BYTES)} MB limit"
+        )
+
+
+def _upload_layout(file):
+    # (bytes, columns, mean row bytes) from the header and the first rows
+    size = upload_size(file)
+    check_upload_size(size)
+    position = file.file.tell()
+    file.file.seek(0)
+    head = file.file.read(LAYOUT_SAMPLE_BYTES)
+    file.file.seek(position)
+
+    lines = head.split(b"\n")
+    columns = lines[0].count(b",") + 1 if head else 0
+    # The last line of the block may be cut off
+    rows = lines[1:-1]
+    row_bytes = sum(len(row) + 1 for row in rows) / len(rows) if rows else max(size, 1)
+    return size, columns, row_bytes
+
+
+def _dataset_layout(dataset_id):
+    # (frame bytes, rows, columns) of a registered dataset; unknown ids 404 later anyway
+    return DATASET_CACHE.info(dataset_id) or COLUMN_STORE.info(dataset_id) or (0, 0, 0)
+
+
+def _chunk_bytes(file, chunk_rows):
+    size, _, row_bytes = _upload_layout(file)
+    return min(size, chunk_rows * row_bytes) * PARSE_BYTES_PER_CSV_BYTE
+
+
+def estimate_upload(file):
+    size, _, _ = _upload_layout(file)
+    return size * PARSE_BYTES_PER_CSV_BYTE
+
+
+def estimate_analysis(file=None, dataset_id=None, streaming=False, chunk_rows=CSV_CHUNK_ROWS):
+    # Preview, EDA and recommendation
+    if dataset_id:
+        return _dataset_layout(dataset_id)[0] * (1 + ANALYSIS_WORKING_COPIES)
+    if file is None:
+        return 0
+    if streaming:
+        return _chunk_bytes(file, chunk_rows)
+    return estimate_upload(file) * (1 + ANALYSIS_WORKING_COPIES)
+
+
+def estimate_regression(
+    file=None,
+    dataset_id=None,
+    n_columns=1,
+    engine=None,
+    execution_mode=None,
+    max_workers=None,
+    evaluation=None
+):
+    # n_columns: features plus targets the request selects
+    if dataset_id:
+        # Cached and memory-mapped frames are already paid for; only working copies count
+        loaded, _, columns = _dataset_layout(dataset_id)
+        parsed = 0
+    elif file is not None:
+        size, columns, _ = _upload_layout(file)
+        parsed = loaded = size * PARSE_BYTES_PER_CSV_BYTE
+    else:
+        return 0
+
+    if resolve_engine(engine, file, dataset_id) == "streaming":
+        return _chunk_bytes(file, CSV_CHUNK_ROWS) if file is not None else loaded / max(columns, 1) * n_columns
+
+    working = loaded * min(n_columns / columns, 1) if columns else loaded
+    copies = REGRESSION_WORKING_COPIES
+    if (evaluation or REGRESSION_EVALUATION) == "kfold":
+        # Every evaluated fold keeps its own preprocessed matrices
+        copies += CV_FOLDS
+    if (execution_mode or TRAINING_EXECUTOR) == "process":
+        # Each pool worker unpickles its own copy of the design matrix
+        copies += min(max_workers or TRAINING_MAX_WORKERS_PER_REQUEST, TRAINING_MAX_WORKERS_PER_REQUEST)
+    # Degree-2 expansion grows with the column count and is capped by its planner
+    poly = min(working * (n_columns + 3) / 2, POLY_MEMORY_BUDGET_BYTES)
+    return parsed + working * copies + poly
+
+
+def estimate_prediction(model_bytes, file=None, dataset_id=None, chunk_rows=PREDICT_CHUNK_ROWS):
+    # One scored chunk at a time, plus the loaded model
+    if dataset_id:
+        frame, rows, _ = _dataset_layout(dataset_id)
+        chunk = frame * min(chunk_rows / rows, 1) if rows else frame
+    elif file is not None:
+        chunk = _chunk_bytes(file, chunk_rows)
+    else:
+        chunk = 0
+    return 2 * chunk + model_bytes
+
+
+def admitted_job(fn, group, nbytes, label=None):
+    """Wraps a job function that takes an `admission` context factory and
+    enters it only for the work that needs memory (not for memoized hits).
+
+    Jobs wait, cancellably, up to ADMISSION_JOB_QUEUE_SECONDS for their
+    reservation and then fail with 503.
+    """
+    timeout = ADMISSION_JOB_QUEUE_SECONDS or math.inf
+
+    @wraps(fn)
+    def run(on_admitted=None, **kwargs):
+        admitted = False
+
+        @contextmanager
+        def admission():
+            nonlocal admitted
+            with ADMISSION.reserve(group, nbytes, label, timeout=timeout,
+                                   should_cancel=kwargs.get("should_cancel")):
+                admitted = True
+                if on_admitted:
+                    on_admitted()
+                yield
+
+        result = fn(**kwargs, admission=admission)
+        if not admitted and on_admitted:
+            # Answered without reserving, e.g. from the result cache
+            on_admitted()
+        return result
+    # JobManager reports the job as "waiting" until on_admitted is called
+    run.waits_for_admission = True
+    return run
+
+
+def _megabytes(nbytes):
+    return round(nbytes / (1024 * 1024), 1)
+
+
+def _memory_limit():
+    # cgroup v2, then cgroup v1, then physical memory
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value)
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+
+def _default_budget():
+    if ADMISSION_MEMORY_BYTES < 0:
+        return ADMISSION_MEMORY_BYTES
+    total = ADMISSION_MEMORY_BYTES or _memory_limit() * ADMISSION_MEMORY_FRACTION
+    # Each worker process enforces its own budget, so they split the server's
+    return int(total / WEB_CONCURRENCY)
+
+
+ADMISSION = AdmissionController(
+    _default_budget(),
+    {
+        "regression": ADMISSION_REGRESSION_CONCURRENCY,
+        "analysis": ADMISSION_ANALYSIS_CONCURRENCY,
+        "predict": ADMISSION_PREDICT_CONCURRENCY,
+    },
+    ADMISSION_QUEUE_SECONDS,
+)
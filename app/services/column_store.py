@@ -0,0 +1,237 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import COLUMN_CACHE_DIR, COLUMN_CACHE_MAX_BYTES
+
+DATASET_ID_PATTERN = re.compile(r"[0-9a-f]{64}")
+META_FILE = "meta.json"
+
+
+class ColumnStore:
+    """On-disk columnar copy of parsed uploads, keyed by content hash.
+
+    Every column is one `.npy` file: numeric and boolean columns as their raw
+    values, everything else as integer codes plus a JSON list of categories.
+    Reads memory-map only the requested columns, so numeric data is paged in
+    lazily and never re-parsed from CSV. Datasets are evicted least recently
+    used first once the directory exceeds its byte budget.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._datasets = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.writes = 0
+        self.evictions = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._scan()
+
+    @property
+    def enabled(self):
+        return bool(self.directory)
+
+    def _path(self, dataset_id):
+        return os.path.join(self.directory, dataset_id)
+
+    def _scan(self):
+        # Survivors of a previous process, oldest access first
+        found = []
+        for name in os.listdir(self.directory):
+            if name.startswith(".staging-"):
+                # Interrupted write
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+                continue
+            meta_path = os.path.join(self.directory, name, META_FILE)
+            if DATASET_ID_PATTERN.fullmatch(name) and os.path.exists(meta_path):
+                found.append((os.path.getmtime(meta_path), name, _dir_size(self._path(name))))
+        for _, name, size in sorted(found):
+            self._datasets[name] = size
+            self.current_bytes += size
+
+    def __contains__(self, dataset_id):
+        with self._lock:
+            if dataset_id in self._datasets:
+                return True
+        # Other worker processes write into the same directory
+        return os.path.exists(os.path.join(self._path(dataset_id), META_FILE))
+
+    # =====================================================
+    # WRITE
+    # =====================================================
+    def write(self, dataset_id, df, filename):
+        if not self.enabled or not DATASET_ID_PATTERN.fullmatch(dataset_id) or dataset_id in self:
+            return
+
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.directory)
+        try:
+            columns = [
+                _write_column(df[name], os.path.join(staging, f"col_{i}"))
+                for i, name in enumerate(df.columns)
+            ]
+        except (TypeError, ValueError):
+            # Values that do not round-trip (e.g. non-JSON categories) stay CSV-only
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+
+        meta = {
+            "dataset_id": dataset_id,
+            "filename": filename,
+            "rows": len(df),
+            "columns": [dict(column, name=name) for name, column in zip(df.columns, columns)],
+            "created_at": time.time(),
+        }
+        with open(os.path.join(staging, META_FILE), "w") as f:
+            json.dump(meta, f)
+
+        try:
+            # Atomic publish; a concurrent writer of the same upload simply loses
+            os.rename(staging, self._path(dataset_id))
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+
+        size = _dir_size(self._path(dataset_id))
+        with self._lock:
+            self._datasets[dataset_id] = size
+            self.current_bytes += size
+            self.writes += 1
+            self._evict(keep=dataset_id)
+
+    def _evict(self, keep):
+        while self.current_bytes > self.max_bytes and len(self._datasets) > 1:
+            oldest = next(iter(self._datasets))
+            if oldest == keep:
+                self._datasets.move_to_end(oldest)
+                continue
+            self.current_bytes -= self._datasets.pop(oldest)
+            self.evictions += 1
+            # Open memory maps keep their pages alive after the unlink
+            shutil.rmtree(self._path(oldest), ignore_errors=True)
+
+    # =====================================================
+    # READ
+    # =====================================================
+    def load(self, dataset_id, columns=None):
+        if not self.enabled or not DATASET_ID_PATTERN.fullmatch(dataset_id):
+            return None
+
+        path = self._path(dataset_id)
+        try:
+            with open(os.path.join(path, META_FILE)) as f:
+                meta = json.load(f)
+            os.utime(os.path.join(path, META_FILE))
+        except OSError:
+            return None
+
+        entries = meta["columns"]
+        if columns is not None:
+            # Callers pass names trimmed of surrounding whitespace
+            wanted = {c.strip() if isinstance(c, str) else c for c in columns}
+            entries = [
+                column for column in entries
+                if (column["name"].strip() if isinstance(column["name"], str) else column["name"]) in wanted
+            ]
+
+        try:
+            data = {column["name"]: _read_column(path, column) for column in entries}
+            with self._lock:
+                known = dataset_id in self._datasets
+            # Written by another worker; counts towards this one's budget from now on
+            size = None if known else _dir_size(path)
+        except OSError:
+            return None
+        df = pd.DataFrame(data, index=pd.RangeIndex(meta["rows"]), copy=False)
+
+        with self._lock:
+            if dataset_id in self._datasets:
+                self._datasets.move_to_end(dataset_id)
+            elif size is not None:
+                self._datasets[dataset_id] = size
+                self.current_bytes += size
+            self.hits += 1
+
+        return {
+            "dataset_id": dataset_id,
+            "df": df,
+            "filename": meta["filename"],
+            "nbytes": int(df.memory_usage(deep=True).sum()),
+            "created_at": meta["created_at"],
+        }
+
+    def info(self, dataset_id):
+        # (bytes on disk, rows, columns) without mapping anything
+        if not self.enabled or not DATASET_ID_PATTERN.fullmatch(dataset_id):
+            return None
+        path = self._path(dataset_id)
+        try:
+            with open(os.path.join(path, META_FILE)) as f:
+                meta = json.load(f)
+            return _dir_size(path), meta["rows"], len(meta["columns"])
+        except OSError:
+            return None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "datasets": len(self._datasets),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "writes": self.writes,
+                "evictions": self.evictions,
+            }
+
+
+def _write_column(series, stem):
+    if pd.api.types.is_numeric_dtype(series) and isinstance(series.dtype, np.dtype):
+        np.save(f"{stem}.npy", series.to_numpy())
+        return {"kind": "values", "dtype": str(series.dtype), "file": os.path.basename(stem)}
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, categories = pd.factorize(series, use_na_sentinel=True)
+        codes = codes.astype(np.int32)
+    np.save(f"{stem}.npy", codes)
+    with open(f"{stem}.json", "w") as f:
+        json.dump(categories.tolist(), f)
+    return {"kind": "codes", "dtype": str(series.dtype), "file": os.path.basename(stem)}
+
+
+def _read_column(path, column):
+    stem = os.path.join(path, column["file"])
+    # Plain ndarray view over the map, so reductions do not return memmaps
+    values = np.load(f"{stem}.npy", mmap_mode="r").view(np.ndarray)
+    if column["kind"] == "values":
+        return values
+
+    with open(f"{stem}.json") as f:
+        categories = json.load(f)
+    if column["dtype"] == "category":
+        return pd.Categorical.from_codes(values, categories)
+
+    categories = np.array(categories + [np.nan], dtype=object)
+    # Code -1 (missing) picks the trailing NaN
+    return pd.Series(categories[values], dtype=column["dtype"]).array
+
+
+def _dir_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+COLUMN_STORE = ColumnStore(COLUMN_CACHE_DIR, COLUMN_CACHE_MAX_BYTES)
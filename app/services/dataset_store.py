@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException
+
+from app.core.config import DATASET_CACHE_MAX_BYTES
+from app.services.column_store import COLUMN_STORE
+from app.utils.csv_loader import hash_upload, load_csv, validate_csv_upload
+from app.utils.timing import stage
+
+
+class DatasetCache:
+    """LRU cache of parsed DataFrames bounded by their in-memory size.
+
+    Cached frames are shared between requests and must be treated as
+    read-only by callers.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, dataset_id):
+        with self._lock:
+            entry = self._entries.get(dataset_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(dataset_id)
+            self.hits += 1
+            return entry
+
+    def put(self, dataset_id, df, filename):
+        nbytes = int(df.memory_usage(deep=True).sum())
+        entry = {
+            "dataset_id": dataset_id,
+            "df": df,
+            "filename": filename,
+            "nbytes": nbytes,
+            "created_at": time.time(),
+        }
+
+        with self._lock:
+            if dataset_id in self._entries:
+                self.current_bytes -= self._entries.pop(dataset_id)["nbytes"]
+
+            # Frames larger than the whole budget are served but never cached
+            if nbytes > self.max_bytes:
+                return entry
+
+            while self._entries and self.current_bytes + nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted["nbytes"]
+                self.evictions += 1
+
+            self._entries[dataset_id] = entry
+            self.current_bytes += nbytes
+
+        return entry
+
+    def __contains__(self, dataset_id):
+        with self._lock:
+            return dataset_id in self._entries
+
+    def info(self, dataset_id):
+        # (bytes, rows, columns) of a cached frame, without counting a lookup
+        with self._lock:
+            entry = self._entries.get(dataset_id)
+        if entry is None:
+            return None
+        return entry["nbytes"], len(entry["df"]), len(entry["df"].columns)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else None,
+            }
+
+
+DATASET_CACHE = DatasetCache(DATASET_CACHE_MAX_BYTES)
+
+
+def register_upload(file, columns=None, content_hash=None):
+    validate_csv_upload(file)
+    dataset_id = content_hash
+    if dataset_id is None:
+        with stage("hash"):
+            dataset_id = hash_upload(file)
+
+    entry = DATASET_CACHE.get(dataset_id)
+    if entry is None:
+        entry = _load_columnar(dataset_id, columns)
+    if entry is None:
+        with stage("parse"):
+            df = load_csv(file)
+        with stage("columnar_write"):
+            COLUMN_STORE.write(dataset_id, df, file.filename)
+        entry = DATASET_CACHE.put(dataset_id, df, file.filename)
+
+    return entry
+
+
+def _load_columnar(dataset_id, columns=None):
+    # Column subsets are cheap to re-map and are not worth a cache slot
+    with stage("columnar_load"):
+        entry = COLUMN_STORE.load(dataset_id, columns)
+    if entry is not None and columns is None:
+        entry = DATASET_CACHE.put(dataset_id, entry["df"], entry["filename"])
+    return entry
+
+
+def get_dataset(dataset_id, columns=None):
+    entry = DATASET_CACHE.get(dataset_id) or _load_columnar(dataset_id, columns)
+    if entry is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Dataset '{dataset_id}' not found or evicted. Upload the CSV again."
+        )
+    return entry
+
+
+def resolve_dataset(file=None, dataset_id=None, columns=None, content_hash=None):
+    # columns: only these are needed (names trimmed); other columns may be left unread
+    # content_hash: the upload's hash_upload() digest when the caller already has it
+    if dataset_id:
+        return get_dataset(dataset_id, columns)
+
+    if file is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Provide either a CSV file or a dataset_id"
+        )
+
+    return register_upload(file, columns, content_hash)
@@ -0,0 +1,288 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.core.config import JOB_QUEUE_MAX, JOB_RETENTION, JOB_WORKERS
+from app.services.metrics import observe_timer
+from app.services.state_backend import SHARED_STATE
+from app.services.training_executor import TrainingCancelled
+from app.utils.timing import timer_scope
+
+FINISHED_STATUSES = {"succeeded", "failed", "cancelled"}
+# Not started yet: queued for a worker thread, or waiting for admission control
+PENDING_STATUSES = {"queued", "waiting"}
+
+# Recent queue wait samples used for the percentile report
+WAIT_SAMPLE_SIZE = 500
+# Seconds between checks of the shared state for a cancel sent to another worker
+SHARED_CANCEL_POLL_SECONDS = 1.0
+# Job fields that are not part of its status
+PRIVATE_FIELDS = {"cancel_event", "future", "cleanup", "shared_checked_at"}
+
+
+class JobManager:
+    """Runs background jobs on a local thread pool.
+
+    With a shared state `backend`, every status change is also published
+    there, so any worker process can report a job and accept its cancel
+    request. The worker that owns the job picks the request up at its next
+    cancellation check.
+    """
+
+    def __init__(self, workers, max_queue, retention, backend=None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retention = retention
+        self.backend = backend
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self._max_wait = 0.0
+        self._started = 0
+
+    def submit(self, fn, kwargs, cleanup=None):
+        with self._lock:
+            queued = sum(1 for job in self._jobs.values() if job["status"] == "queued")
+            if queued >= self.max_queue:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Job queue is full. Try again later.",
+                    headers={"Retry-After": "5"}
+                )
+
+            job = {
+                "job_id": uuid.uuid4().hex,
+                "status": "queued",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "progress": {},
+                "result": None,
+                "error": None,
+                "timings": None,
+                "cancel_event": threading.Event(),
+                # Stays set when the job finished before reaching a cancellation checkpoint
+                "cancel_requested": False,
+                "cleanup": cleanup,
+                "shared_checked_at": 0.0,
+            }
+            self._jobs[job["job_id"]] = job
+            self._forget_finished()
+            snapshot = self._snapshot(job)
+
+        self._publish(snapshot)
+        job["future"] = self._executor.submit(self._run, job, fn, kwargs)
+        return snapshot
+
+    def _run(self, job, fn, kwargs):
+        try:
+            # Admission-gated jobs start once their memory reservation is granted
+            gated = getattr(fn, "waits_for_admission", False)
+            self._cancelled_elsewhere(job)
+            with self._lock:
+                if job["cancel_event"].is_set():
+                    return
+                if gated:
+                    job["status"] = "waiting"
+                else:
+                    self._start(job)
+                snapshot = self._snapshot(job)
+            self._publish(snapshot)
+
+            def on_progress(name, status):
+                with self._lock:
+                    job["progress"][name] = status
+                    snapshot = self._snapshot(job)
+                self._publish(snapshot)
+
+            def should_cancel():
+                return job["cancel_event"].is_set() or self._cancelled_elsewhere(job)
+
+            if gated:
+                kwargs = {**kwargs, "on_admitted": lambda: self._admitted(job)}
+
+            result, error = None, None
+            with timer_scope() as timer:
+                try:
+                    result = fn(
+                        **kwargs,
+                        on_progress=on_progress,
+                        should_cancel=should_cancel
+                    )
+                    status = "succeeded"
+                except TrainingCancelled:
+                    status = "cancelled"
+                except HTTPException as e:
+                    status, error = "failed", {"status_code": e.status_code, "detail": e.detail}
+                except Exception as e:
+                    status, error = "failed", {"status_code": 500, "detail": str(e)}
+
+            observe_timer(f"job:{fn.__name__}", timer)
+            self._finish(job, status, result=result, error=error, timings=timer.as_dict())
+        finally:
+            self._cleanup(job)
+
+    def _start(self, job):
+        job["status"] = "running"
+        job["started_at"] = time.time()
+        wait = job["started_at"] - job["submitted_at"]
+        self._waits.append(wait)
+        self._max_wait = max(self._max_wait, wait)
+        self._started += 1
+
+    def _admitted(self, job):
+        with self._lock:
+            # A cancel that arrived while waiting keeps its "cancelling" status
+            if job["status"] == "waiting":
+                self._start(job)
+            snapshot = self._snapshot(job)
+        self._publish(snapshot)
+
+    def _cleanup(self, job):
+        cleanup, job["cleanup"] = job["cleanup"], None
+        if cleanup:
+            cleanup()
+
+    def _finish(self, job, status, result=None, error=None, timings=None):
+        with self._lock:
+            job["status"] = status
+            job["timings"] = timings
+            job["result"] = result
+            job["error"] = error
+            job["finished_at"] = time.time()
+            snapshot = self._snapshot(job)
+        self._publish(snapshot)
+
+    def _publish(self, snapshot):
+        if self.backend is not None:
+            self.backend.put_job(snapshot, snapshot["status"] in FINISHED_STATUSES, self.retention)
+
+    def _cancelled_elsewhere(self, job):
+        # Throttled, since training loops ask between every batch of fits
+        if self.backend is None:
+            return False
+        now = time.monotonic()
+        if now - job["shared_checked_at"] < SHARED_CANCEL_POLL_SECONDS:
+            return False
+        job["shared_checked_at"] = now
+        shared = self.backend.get_job(job["job_id"])
+        if shared is None or not shared[1]:
+            return False
+        self.cancel(job["job_id"])
+        return True
+
+    def _forget_finished(self):
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in FINISHED_STATUSES
+        ]
+        for job_id in finished[:max(len(finished) - self.retention, 0)]:
+            del self._jobs[job_id]
+
+    def _get(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+        return job
+
+    def _snapshot(self, job):
+        snapshot = {key: value for key, value in job.items() if key not in PRIVATE_FIELDS}
+        snapshot["progress"] = dict(job["progress"])
+        return _with_durations(snapshot)
+
+    def _shared(self, job_id):
+        # Status of a job owned by another worker process
+        shared = self.backend.get_job(job_id) if self.backend is not None else None
+        if shared is None:
+            raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+        snapshot, cancel_requested = shared
+        if cancel_requested and snapshot["status"] not in FINISHED_STATUSES:
+            # The owner has not reached a cancellation check yet
+            snapshot["status"] = "cancelling"
+        snapshot["cancel_requested"] = snapshot["cancel_requested"] or cancel_requested
+        return _with_durations(snapshot)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return self._snapshot(job)
+        return self._shared(job_id)
+
+    def cancel(self, job_id):
+        with self._lock:
+            local = job_id in self._jobs
+        if not local:
+            snapshot = self._shared(job_id)
+            if snapshot["status"] not in FINISHED_STATUSES:
+                self.backend.request_job_cancel(job_id)
+                snapshot.update(status="cancelling", cancel_requested=True)
+            return snapshot
+
+        never_ran = False
+        with self._lock:
+            job = self._get(job_id)
+            if job["status"] in FINISHED_STATUSES:
+                return self._snapshot(job)
+
+            job["cancel_event"].set()
+            job["cancel_requested"] = True
+            if job["status"] == "queued":
+                # A job already picked up by a worker sees the event and cleans up itself
+                never_ran = job["future"].cancel()
+                job["status"] = "cancelled"
+                job["finished_at"] = time.time()
+            else:
+                # Waiting and running jobs stop at the next cancellation checkpoint
+                job["status"] = "cancelling"
+            snapshot = self._snapshot(job)
+
+        self._publish(snapshot)
+        if never_ran:
+            self._cleanup(job)
+        return snapshot
+
+    def stats(self):
+        with self._lock:
+            now = time.time()
+            counts = {}
+            queued_waits = []
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+                if job["status"] in PENDING_STATUSES:
+                    queued_waits.append(now - job["submitted_at"])
+
+            waits = sorted(self._waits)
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queue_depth": counts.get("queued", 0),
+                "waiting_for_admission": counts.get("waiting", 0),
+                "running": counts.get("running", 0) + counts.get("cancelling", 0),
+                "status_counts": counts,
+                "jobs_started": self._started,
+                "oldest_queued_wait_seconds": max(queued_waits, default=None),
+                "wait_seconds": {
+                    "samples": len(waits),
+                    "mean": sum(waits) / len(waits) if waits else None,
+                    "p50": waits[len(waits) // 2] if waits else None,
+                    "p95": waits[min(int(len(waits) * 0.95), len(waits) - 1)] if waits else None,
+                    "max": self._max_wait if waits else None,
+                },
+            }
+
+
+def _with_durations(snapshot):
+    now = snapshot["finished_at"] or time.time()
+    started = snapshot["started_at"]
+    snapshot["wait_seconds"] = (started or now) - snapshot["submitted_at"]
+    snapshot["run_seconds"] = now - started if started else None
+    return snapshot
+
+
+JOB_MANAGER = JobManager(JOB_WORKERS, JOB_QUEUE_MAX, JOB_RETENTION, SHARED_STATE)
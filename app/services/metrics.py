@@ -0,0 +1,102 @@
+import math
+import threading
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+MEMORY_BUCKETS = tuple(float(2 ** power) for power in range(16, 34, 2))  # 64 KiB .. 8 GiB
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a fixed tuple of label values."""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = {
+                    "counts": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                base = _labels(zip(self.label_names, labels))
+                for bound, count in zip(self.buckets, series["counts"]):
+                    le = _labels([*zip(self.label_names, labels), ("le", _number(bound))])
+                    lines.append(f"{self.name}_bucket{le} {count}")
+                le = _labels([*zip(self.label_names, labels), ("le", "+Inf")])
+                lines.append(f"{self.name}_bucket{le} {series['count']}")
+                lines.append(f"{self.name}_sum{base} {_number(series['sum'])}")
+                lines.append(f"{self.name}_count{base} {series['count']}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs):
+    pairs = list(pairs)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "NaN"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+REQUEST_SECONDS = Histogram(
+    "regviz_request_duration_seconds",
+    "HTTP request duration.",
+    ("method", "route", "status"),
+    DURATION_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "regviz_stage_duration_seconds",
+    "Duration of one processing stage within a request or job.",
+    ("endpoint", "stage"),
+    DURATION_BUCKETS,
+)
+STAGE_MEMORY = Histogram(
+    "regviz_stage_memory_delta_bytes",
+    "Process RSS growth across one stage (process-wide, approximate under concurrency).",
+    ("endpoint", "stage"),
+    MEMORY_BUCKETS,
+)
+
+
+def observe_timer(endpoint, timer):
+    for entry in timer.stages:
+        STAGE_SECONDS.observe(entry["seconds"], endpoint, entry["stage"])
+        if entry["memory_delta_bytes"] is not None:
+            STAGE_MEMORY.observe(max(entry["memory_delta_bytes"], 0), endpoint, entry["stage"])
+
+
+def render_metrics(gauges=()):
+    # gauges: iterable of (name, help, value)
+    lines = []
+    for histogram in (REQUEST_SECONDS, STAGE_SECONDS, STAGE_MEMORY):
+        lines.extend(histogram.render())
+    for name, help_text, value in gauges:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {_number(value)}")
+    return "\n".join(lines) + "\n"
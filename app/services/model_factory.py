@@ -1,28 +1,201 @@
-from sklearn.linear_model import LinearRegression, Ridge, Lasso, ElasticNet
-from sklearn.preprocessing import PolynomialFeatures
+import copy
+
+import numpy as np
+import scipy.sparse as sp
+from fastapi import HTTPException
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import (
+    ElasticNet,
+    ElasticNetCV,
+    Lasso,
+    LassoCV,
+    LinearRegression,
+    Ridge,
+    RidgeCV,
+)
+from sklearn.model_selection import ShuffleSplit
+from sklearn.preprocessing import FunctionTransformer, PolynomialFeatures
 from sklearn.pipeline import Pipeline
 
-def get_regression_models(preprocessor):
+from app.core.config import POLY_MEMORY_BUDGET_BYTES, REGRESSION_TUNING, TUNING_VALIDATION_FRACTION
+
+# fixed: hand-picked alphas | path: alphas chosen along regularization paths
+TUNING_MODES = {"fixed", "path"}
+
+RIDGE_ALPHAS = np.logspace(-4, 4, 50)
+
+# Dense lstsq holds the expanded matrix, its centered copy and LAPACK workspace
+DENSE_SOLVER_COPIES = 3
+# CSR cost per stored value: float64 data + int32 column index
+SPARSE_BYTES_PER_VALUE = 12
+# Per-column float64 vectors of the sparse path (offsets, coef, lsqr work vectors)
+SPARSE_COLUMN_VECTORS = 6
+# Same cut-off ColumnTransformer uses to decide on sparse output
+SPARSE_DENSITY_THRESHOLD = 0.3
+ELASTICNET_L1_RATIOS = [0.1, 0.5, 0.9]
+
+def _validation_split():
+    # One held-out split of the training rows: each l1_ratio costs a single
+    # warm-started path plus one refit, instead of one fit per grid point per fold
+    return ShuffleSplit(n_splits=1, test_size=TUNING_VALIDATION_FRACTION, random_state=42)
+
+def get_regression_estimators(tuning=None, multi_output=False):
+    tuning = tuning or REGRESSION_TUNING
+    if tuning not in TUNING_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid tuning. Use one of: {', '.join(sorted(TUNING_MODES))}"
+        )
+
+    if tuning == "path":
+        # RidgeCV with cv=None scores every alpha by efficient leave-one-out
+        ridge = RidgeCV(alphas=RIDGE_ALPHAS, alpha_per_target=multi_output)
+        lasso = LassoCV(cv=_validation_split())
+        elastic_net = ElasticNetCV(l1_ratio=ELASTICNET_L1_RATIOS, cv=_validation_split())
+    else:
+        ridge = Ridge(alpha=1.0)
+        lasso = Lasso(alpha=0.01)
+        elastic_net = ElasticNet(alpha=0.01, l1_ratio=0.5)
+
+    # Pipeline steps that run after the shared preprocessing step
     return {
-        "LinearRegression": Pipeline([
-            ("preprocess", preprocessor),
+        "LinearRegression": [
             ("model", LinearRegression())
-        ]),
-        "Ridge": Pipeline([
-            ("preprocess", preprocessor),
-            ("model", Ridge(alpha=1.0))
-        ]),
-        "Lasso": Pipeline([
-            ("preprocess", preprocessor),
-            ("model", Lasso(alpha=0.01))
-        ]),
-        "ElasticNet": Pipeline([
-            ("preprocess", preprocessor),
-            ("model", ElasticNet(alpha=0.01, l1_ratio=0.5))
-        ]),
-        "PolynomialRegression": Pipeline([
-            ("preprocess", preprocessor),
+        ],
+        "Ridge": [
+            ("model", ridge)
+        ],
+        "Lasso": [
+            ("model", lasso)
+        ],
+        "ElasticNet": [
+            ("model", elastic_net)
+        ],
+        "PolynomialRegression": [
             ("poly", PolynomialFeatures(degree=2, include_bias=False)),
             ("model", LinearRegression())
-        ])
+        ]
     }
+
+def clone_steps(steps):
+    # Unfitted copies, for fitting the same candidate concurrently
+    return [(name, clone(step)) for name, step in steps]
+
+def supports_multi_output(steps):
+    # Whether the final estimator solves several targets in one fit
+    return steps[-1][1].__sklearn_tags__().target_tags.multi_output
+
+def select_target(estimator, index):
+    # Single-target copy of a fitted multi-output linear pipeline; earlier steps are shared
+    model = copy.copy(estimator.named_steps["model"])
+    model.coef_ = model.coef_[index]
+    model.intercept_ = model.intercept_[index]
+    if np.ndim(getattr(model, "alpha_", None)) == 1:
+        model.alpha_ = model.alpha_[index]
+    return Pipeline(estimator.steps[:-1] + [("model", model)])
+
+def assemble_pipeline(preprocessor, estimator):
+    # Join a fitted preprocessor and a fitted estimator head into one artifact
+    return Pipeline([("preprocess", preprocessor)] + list(estimator.steps))
+
+def _expanded_nnz(row_nnz):
+    # Degree 2 without bias: each row keeps its d values plus d(d+1)/2 products
+    row_nnz = row_nnz.astype(np.int64)
+    return int((row_nnz + row_nnz * (row_nnz + 1) // 2).sum())
+
+def _row_nnz(X, columns=None):
+    if columns is not None:
+        X = X[:, columns]
+    if sp.issparse(X):
+        return np.diff(sp.csr_matrix(X).indptr)
+    return np.count_nonzero(X, axis=1)
+
+def plan_polynomial(X_train, n_test, n_numeric, budget=POLY_MEMORY_BUDGET_BYTES):
+    """Estimate the degree-2 expansion of the preprocessed training matrix and
+    pick the cheapest representation that fits the memory budget.
+
+    Tries all pairwise interactions first, then interactions among the numeric
+    columns only (one-hot columns pass through linearly), and otherwise skips.
+    """
+    n_train, width = X_train.shape
+    test_ratio = n_test / n_train if n_train else 0
+    numeric = slice(0, n_numeric)
+    plan = {"input_columns": width, "budget_bytes": budget}
+
+    options = [("all", width + width * (width + 1) // 2, _expanded_nnz(_row_nnz(X_train)))]
+    if 0 < n_numeric < width:
+        other_nnz = int(_row_nnz(X_train, slice(n_numeric, width)).sum())
+        options.append((
+            "numeric_only",
+            width + n_numeric * (n_numeric + 1) // 2,
+            _expanded_nnz(_row_nnz(X_train, numeric)) + other_nnz
+        ))
+
+    cheapest = float("inf")
+    for interactions, columns, nnz in options:
+        sparse_bytes = nnz * SPARSE_BYTES_PER_VALUE + (n_train + 1) * 8
+        candidates = [("sparse", sparse_bytes + columns * 8 * SPARSE_COLUMN_VECTORS)]
+        # Dense input stays dense while the expansion is dense enough to make that pay off
+        if not sp.issparse(X_train):
+            dense = ("dense", n_train * columns * 8 * DENSE_SOLVER_COPIES)
+            dense_enough = nnz >= SPARSE_DENSITY_THRESHOLD * n_train * columns
+            candidates.insert(0 if dense_enough else 1, dense)
+
+        for representation, train_bytes in candidates:
+            estimated = int(train_bytes * (1 + test_ratio))
+            cheapest = min(cheapest, estimated)
+            if estimated <= budget:
+                plan.update({
+                    "interactions": interactions,
+                    "expanded_columns": columns,
+                    "representation": representation,
+                    "estimated_bytes": estimated
+                })
+                return plan
+
+    plan.update({"expanded_columns": options[0][1], "estimated_bytes": cheapest})
+    plan["skipped_reason"] = (
+        f"Skipped: degree-2 expansion of {width} columns needs about "
+        f"{cheapest / 1024 ** 2:.1f} MB, above the {budget / 1024 ** 2:.1f} MB "
+        f"POLY_MEMORY_BUDGET_BYTES"
+    )
+    return plan
+
+def polynomial_steps(plan, n_numeric):
+    if "skipped_reason" in plan:
+        return None
+
+    sparse = plan["representation"] == "sparse"
+    if plan["interactions"] == "all":
+        poly = PolynomialFeatures(degree=2, include_bias=False)
+    else:
+        poly = ColumnTransformer(
+            [
+                ("numeric_poly", PolynomialFeatures(degree=2, include_bias=False), slice(0, n_numeric)),
+                ("rest", "passthrough", slice(n_numeric, plan["input_columns"]))
+            ],
+            sparse_threshold=1.0 if sparse else 0.0
+        )
+
+    steps = [("poly", poly), ("model", LinearRegression())]
+    if sparse:
+        # CSR input keeps the expansion sparse; LinearRegression then solves with lsqr
+        steps.insert(0, ("to_sparse", FunctionTransformer(sp.csr_matrix, accept_sparse=True)))
+    return steps
+
+def describe_hyperparameters(estimator):
+    # Chosen values for CV estimators (alpha_), configured values otherwise
+    model = estimator.named_steps["model"]
+    params = {}
+    for name in ("alpha", "l1_ratio"):
+        if hasattr(model, f"{name}_"):
+            params[name] = float(getattr(model, f"{name}_"))
+        elif name in model.get_params():
+            params[name] = float(model.get_params()[name])
+    if "poly" in estimator.named_steps:
+        poly = estimator.named_steps["poly"]
+        if isinstance(poly, ColumnTransformer):
+            poly = poly.named_transformers_["numeric_poly"]
+        params["degree"] = poly.degree
+    return params
@@ -0,0 +1,247 @@
+import math
+import time
+
+import numpy as np
+from fastapi import HTTPException
+
+from app.core.config import (
+    HALVING_FACTOR,
+    HALVING_MIN_ROWS,
+    TRAINING_MAX_WORKERS_PER_REQUEST,
+)
+from app.services.model_factory import clone_steps
+from app.services.training_executor import train_candidates, train_tasks
+from app.utils.timing import stage
+
+# full: every candidate on the whole training set | halving: successive halving
+SELECTION_MODES = {"full", "halving"}
+# holdout: one train/test split | kfold: cross-validated scores, winner refit on all rows
+EVALUATION_MODES = {"holdout", "kfold"}
+
+
+def _take_rows(X, y, rows):
+    return X[rows], y.iloc[rows]
+
+
+def successive_halving(
+    estimators,
+    X_train,
+    y_train,
+    X_test,
+    y_test,
+    min_rows=HALVING_MIN_ROWS,
+    factor=HALVING_FACTOR,
+    mode=None,
+    max_workers=None,
+    on_progress=None,
+    should_cancel=None
+):
+    """Race candidates on nested, growing row subsamples of the training set.
+
+    Each round fits the surviving candidates on `rows` rows, scores them on
+    the test split and keeps the best 1/factor. Only the survivors are fitted
+    on the full training set, so selection costs about one full fit plus a
+    geometric series of smaller ones.
+
+    Returns (final outcomes, eliminated candidates, round reports).
+    """
+    if factor < 2:
+        raise HTTPException(400, "HALVING_FACTOR must be at least 2")
+
+    on_progress = on_progress or (lambda name, status: None)
+    n_rows = X_train.shape[0]
+    order = np.random.default_rng(42).permutation(n_rows)
+
+    alive = dict(estimators)
+    eliminated = {}
+    rounds = []
+    rows = min_rows
+
+    while len(alive) > 1 and rows < n_rows:
+        round_index = len(rounds)
+        X_sub, y_sub = _take_rows(X_train, y_train, order[:rows])
+
+        with stage(f"halving.round{round_index}"):
+            outcomes = train_candidates(
+                alive,
+                X_sub,
+                y_sub,
+                X_test,
+                y_test,
+                mode=mode,
+                max_workers=max_workers,
+                on_progress=on_progress,
+                should_cancel=should_cancel
+            )
+
+        scores = {
+            name: outcome["metrics"]["test_r2"]
+            for name, outcome in outcomes.items()
+            if "error" not in outcome and outcome["metrics"]["test_r2"] is not None
+        }
+        keep = max(math.ceil(len(alive) / factor), 1)
+        ranked = sorted(scores, key=scores.get, reverse=True)[:keep]
+
+        for name, outcome in outcomes.items():
+            if name in ranked:
+                continue
+            eliminated[name] = {
+                "outcome": outcome,
+                "round": round_index,
+                "rows": rows
+            }
+            del alive[name]
+            on_progress(name, "eliminated")
+
+        rounds.append({
+            "round": round_index,
+            "rows": rows,
+            "scores": scores,
+            "kept": ranked
+        })
+
+        if not alive:
+            break
+        rows *= factor
+
+    # Survivors (usually one) get the full training set
+    with stage("halving.final"):
+        final = train_candidates(
+            alive,
+            X_train,
+            y_train,
+            X_test,
+            y_test,
+            mode=mode,
+            max_workers=max_workers,
+            on_progress=on_progress,
+            should_cancel=should_cancel
+        ) if alive else {}
+
+    rounds.append({
+        "round": len(rounds),
+        "rows": n_rows,
+        "scores": {
+            name: outcome["metrics"]["test_r2"]
+            for name, outcome in final.items() if "error" not in outcome
+        },
+        "kept": list(final)
+    })
+    return final, eliminated, rounds
+
+
+def model_progress(on_progress, tasks):
+    # Tasks keyed (model, part) report per model: training on first start, finished with its last part
+    remaining = {}
+    for name, _ in tasks:
+        remaining[name] = remaining.get(name, 0) + 1
+    failed = set()
+
+    def report(key, status):
+        name = key[0]
+        if status in ("completed", "failed"):
+            remaining[name] -= 1
+            if status == "failed":
+                failed.add(name)
+            if not remaining[name]:
+                on_progress(name, "failed" if name in failed else "completed")
+        elif status != "pending":
+            on_progress(name, status)
+
+    return report
+
+
+def _fold_tasks(estimators, folds):
+    # Clone per task: folds of one model may fit concurrently in threads
+    return {
+        (name, index): (clone_steps(steps), fold[:4])
+        for index, fold in folds
+        for name, steps in estimators.items()
+    }
+
+
+def cross_validate(
+    estimators,
+    first_fold,
+    build_fold,
+    n_folds,
+    budget_seconds,
+    mode=None,
+    max_workers=None,
+    on_progress=None,
+    should_cancel=None
+):
+    """Score candidates on the folds of one k-fold partition.
+
+    Folds are (X_train, y_train, X_val, y_val, val_positions), already
+    preprocessed so all candidates share them. Fold 0 runs first and its
+    wall time sets how many more folds fit in `budget_seconds`; those then
+    run together on the pool. Returns per-model scores with out-of-fold
+    predictions, and a report of the folds actually evaluated.
+    """
+    on_progress = on_progress or (lambda name, status: None)
+    workers = 1 if mode == "serial" else min(
+        max_workers or TRAINING_MAX_WORKERS_PER_REQUEST, TRAINING_MAX_WORKERS_PER_REQUEST
+    )
+
+    folds = [(0, first_fold)]
+    start = time.perf_counter()
+    with stage("cv.fold0"):
+        tasks = _fold_tasks(estimators, folds)
+        outcomes = train_tasks(
+            tasks, mode=mode, max_workers=max_workers,
+            on_progress=model_progress(on_progress, tasks), should_cancel=should_cancel
+        )
+    first_seconds = time.perf_counter() - start
+
+    # The remaining folds spread over `workers` slots instead of min(workers, candidates)
+    per_fold = first_seconds * min(workers, len(estimators)) / workers
+    affordable = (budget_seconds - first_seconds) / per_fold if per_fold > 0 else n_folds
+    extra = int(min(max(affordable, 0), n_folds - 1))
+
+    if extra:
+        with stage("cv.folds"):
+            more = [(index, build_fold(index)) for index in range(1, extra + 1)]
+            tasks = _fold_tasks(estimators, more)
+            outcomes.update(train_tasks(
+                tasks, mode=mode, max_workers=max_workers,
+                on_progress=model_progress(on_progress, tasks), should_cancel=should_cancel
+            ))
+        folds.extend(more)
+
+    results = {}
+    for name in estimators:
+        fold_outcomes = [outcomes[(name, index)] for index, _ in folds]
+        failed = next((o for o in fold_outcomes if "error" in o), None)
+        if failed is not None:
+            results[name] = {"error": failed["error"]}
+            continue
+
+        r2 = np.array([o["metrics"]["test_r2"] for o in fold_outcomes], dtype=np.float64)
+        mse = np.array([o["metrics"]["test_mse"] for o in fold_outcomes], dtype=np.float64)
+        results[name] = {
+            "metrics": {
+                "train_r2": float(np.mean([o["metrics"]["train_r2"] for o in fold_outcomes])),
+                "test_r2": float(np.nanmean(r2)) if not np.isnan(r2).all() else None,
+                "test_mse": float(mse.mean()),
+                "cv_r2_std": float(np.nanstd(r2)) if not np.isnan(r2).all() else None,
+                "cv_mse_std": float(mse.std()),
+                "cv_fold_r2": r2.tolist(),
+                "hyperparameters": fold_outcomes[0]["metrics"]["hyperparameters"]
+            },
+            "oof_positions": np.concatenate([fold[4] for _, fold in folds]),
+            "oof_pred": np.concatenate([o["test_pred"] for o in fold_outcomes]),
+            "timings": {
+                step: sum(o["timings"][step] for o in fold_outcomes)
+                for step in fold_outcomes[0]["timings"]
+            }
+        }
+
+    report = {
+        "mode": "kfold",
+        "folds_planned": n_folds,
+        "folds_evaluated": len(folds),
+        "budget_seconds": budget_seconds,
+        "first_fold_seconds": first_seconds
+    }
+    return results, report
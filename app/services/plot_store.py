@@ -1 +1,217 @@
-PLOT_STORE = {}
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app.core.config import (
+    RUN_STORE_MAX_BYTES,
+    RUN_STORE_SPILL_DIR,
+    RUN_STORE_SPILL_MAX_BYTES,
+    RUN_STORE_TTL_SECONDS,
+    STATE_RUN_MAX_BYTES,
+)
+from app.services.state_backend import SHARED_STATE, SqliteRunStore
+
+# Rough cost of one boxed Python value inside a list or dict
+PY_OBJECT_BYTES = 32
+
+
+def payload_nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(payload_nbytes(item) + PY_OBJECT_BYTES for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_nbytes(item) + 8 for item in value)
+    if isinstance(value, str):
+        return len(value) + PY_OBJECT_BYTES
+    return PY_OBJECT_BYTES
+
+
+class RunStore:
+    """Run-scoped store for plot data and results.
+
+    Entries live in memory under a global byte budget with LRU + TTL
+    eviction. When a spill directory is configured, entries evicted for
+    space are written to disk and promoted back on access.
+    """
+
+    def __init__(self, max_bytes, ttl_seconds, spill_dir="", spill_max_bytes=0):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = spill_max_bytes
+        self._entries = OrderedDict()
+        self._spilled = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.spill_bytes = 0
+        self.latest_run_id = None
+        self.evictions = 0
+        self.expirations = 0
+        self.spills = 0
+
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    # =====================================================
+    # MEMORY TIER
+    # =====================================================
+    def put(self, run_id, payload):
+        entry = {
+            "payload": payload,
+            "nbytes": payload_nbytes(payload),
+            "created_at": time.time(),
+        }
+
+        with self._lock:
+            self._expire()
+            self._drop(run_id)
+            self.latest_run_id = run_id
+
+            if entry["nbytes"] > self.max_bytes:
+                self._spill(run_id, entry)
+                return
+
+            self._insert(run_id, entry)
+
+    def _insert(self, run_id, entry):
+        while self._entries and self.current_bytes + entry["nbytes"] > self.max_bytes:
+            evicted_id, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted["nbytes"]
+            self.evictions += 1
+            self._spill(evicted_id, evicted)
+
+        self._entries[run_id] = entry
+        self.current_bytes += entry["nbytes"]
+
+    def get(self, run_id):
+        with self._lock:
+            self._expire()
+
+            entry = self._entries.get(run_id)
+            if entry is not None:
+                self._entries.move_to_end(run_id)
+                return entry["payload"]
+
+            entry = self._load_spilled(run_id)
+            if entry is None:
+                return None
+            if entry["nbytes"] <= self.max_bytes:
+                self._remove_spilled(run_id)
+                self._insert(run_id, entry)
+            return entry["payload"]
+
+    def touch(self, run_id):
+        # Re-serving a stored run makes it the latest without rewriting it
+        with self._lock:
+            self._expire()
+            if run_id in self._entries:
+                self._entries.move_to_end(run_id)
+            elif run_id not in self._spilled:
+                return False
+            self.latest_run_id = run_id
+            return True
+
+    def latest(self):
+        if self.latest_run_id is None:
+            return None, None
+        run_id = self.latest_run_id
+        return run_id, self.get(run_id)
+
+    def _drop(self, run_id):
+        entry = self._entries.pop(run_id, None)
+        if entry is not None:
+            self.current_bytes -= entry["nbytes"]
+        self._remove_spilled(run_id)
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl_seconds
+        for store in (self._entries, self._spilled):
+            expired = [run_id for run_id, entry in store.items() if entry["created_at"] < cutoff]
+            for run_id in expired:
+                self._drop(run_id)
+                self.expirations += 1
+
+    # =====================================================
+    # DISK TIER
+    # =====================================================
+    def _spill_path(self, run_id):
+        return os.path.join(self.spill_dir, f"{run_id}.pkl")
+
+    def _spill(self, run_id, entry):
+        if not self.spill_dir:
+            return
+
+        path = self._spill_path(run_id)
+        with open(path, "wb") as f:
+            pickle.dump(entry["payload"], f, protocol=pickle.HIGHEST_PROTOCOL)
+        size = os.path.getsize(path)
+
+        self._spilled[run_id] = {
+            "size": size,
+            "nbytes": entry["nbytes"],
+            "created_at": entry["created_at"],
+        }
+        self.spill_bytes += size
+        self.spills += 1
+
+        while self._spilled and self.spill_bytes > self.spill_max_bytes:
+            oldest = next(iter(self._spilled))
+            self._remove_spilled(oldest)
+
+    def _load_spilled(self, run_id):
+        meta = self._spilled.get(run_id)
+        if meta is None:
+            return None
+
+        try:
+            with open(self._spill_path(run_id), "rb") as f:
+                payload = pickle.load(f)
+        except OSError:
+            self._remove_spilled(run_id)
+            return None
+
+        return {"payload": payload, "nbytes": meta["nbytes"], "created_at": meta["created_at"]}
+
+    def _remove_spilled(self, run_id):
+        meta = self._spilled.pop(run_id, None)
+        if meta is None:
+            return
+        self.spill_bytes -= meta["size"]
+        try:
+            os.remove(self._spill_path(run_id))
+        except OSError:
+            pass
+
+    def stats(self):
+        with self._lock:
+            self._expire()
+            return {
+                "backend": "memory",
+                "runs": len(self._entries) + len(self._spilled),
+                "runs_in_memory": len(self._entries),
+                "runs_spilled": len(self._spilled),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "spill_bytes": self.spill_bytes,
+                "spill_max_bytes": self.spill_max_bytes if self.spill_dir else 0,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "spills": self.spills,
+            }
+
+
+if SHARED_STATE is not None:
+    PLOT_STORE = SqliteRunStore(SHARED_STATE, STATE_RUN_MAX_BYTES, RUN_STORE_TTL_SECONDS)
+else:
+    PLOT_STORE = RunStore(
+        RUN_STORE_MAX_BYTES,
+        RUN_STORE_TTL_SECONDS,
+        RUN_STORE_SPILL_DIR,
+        RUN_STORE_SPILL_MAX_BYTES,
+    )
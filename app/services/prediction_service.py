@@ -0,0 +1,146 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+from app.core.config import MODEL_CACHE_SIZE, PREDICT_CHUNK_ROWS
+from app.utils.csv_loader import iter_csv_chunks
+from app.utils.model_storage import load_model, resolve_model_path
+from app.utils.schema_inference import widen_numeric
+
+PREDICTION_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class ModelCache:
+    """LRU cache of unpickled pipelines keyed by file name and mtime."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, filename):
+        path = resolve_model_path(filename)
+        key = (filename, os.path.getmtime(path))
+
+        with self._lock:
+            model = self._entries.get(key)
+            if model is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return model
+            self.misses += 1
+
+        model = load_model(path)
+
+        with self._lock:
+            self._entries[key] = model
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return model
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+MODEL_CACHE = ModelCache(MODEL_CACHE_SIZE)
+
+
+def required_columns(model):
+    preprocessor = model.named_steps.get("preprocess", model)
+    return list(getattr(preprocessor, "feature_names_in_", []))
+
+
+def predict_frame(model, df, columns):
+    # Same float64 inputs as at training time
+    X = widen_numeric(df[columns], columns)
+    # Rows with missing features get a null prediction instead of failing the batch
+    complete = X.notna().all(axis=1).to_numpy()
+    predictions = np.full(len(X), np.nan)
+    if complete.any():
+        predictions[complete] = model.predict(X[complete])
+    return predictions
+
+
+def _strip_columns(df):
+    # Same whitespace normalization as run_regression applies before training
+    return df.set_axis([c.strip() if isinstance(c, str) else c for c in df.columns], axis=1)
+
+
+def _encode(out, fmt, header):
+    if fmt == "ndjson":
+        text = out.to_json(orient="records", lines=True)
+        return (text if text.endswith("\n") else text + "\n").encode("utf-8")
+
+    buffer = io.StringIO()
+    out.to_csv(buffer, index=False, header=header)
+    return buffer.getvalue().encode("utf-8")
+
+
+def stream_predictions(
+    filename,
+    file=None,
+    df=None,
+    fmt="csv",
+    id_column=None,
+    chunk_rows=PREDICT_CHUNK_ROWS
+):
+    if fmt not in PREDICTION_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format. Use one of: {', '.join(sorted(PREDICTION_FORMATS))}"
+        )
+
+    model = MODEL_CACHE.get(filename)
+    columns = required_columns(model)
+
+    if df is not None:
+        chunks = (df.iloc[start:start + chunk_rows] for start in range(0, len(df), chunk_rows))
+    elif file is not None:
+        chunks = iter_csv_chunks(file, chunk_rows)
+    else:
+        raise HTTPException(status_code=400, detail="Provide either a CSV file or a dataset_id")
+
+    # Validate on the first chunk so errors surface before the response starts
+    first = next(chunks, None)
+    if first is None or first.empty:
+        raise HTTPException(status_code=400, detail="CSV file is empty")
+
+    first = _strip_columns(first)
+    missing = [col for col in columns if col not in first.columns]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing feature columns: {', '.join(missing)}")
+    if id_column and id_column not in first.columns:
+        raise HTTPException(status_code=400, detail=f"ID column '{id_column}' not found")
+
+    def generate():
+        offset = 0
+        chunk = first
+        while chunk is not None:
+            chunk = _strip_columns(chunk)
+            out = pd.DataFrame({
+                "row": np.arange(offset, offset + len(chunk)),
+                "prediction": predict_frame(model, chunk, columns)
+            })
+            if id_column:
+                out.insert(1, "id", chunk[id_column].to_numpy())
+            yield _encode(out, fmt, header=offset == 0)
+            offset += len(chunk)
+            chunk = next(chunks, None)
+
+    return generate(), PREDICTION_FORMATS[fmt]
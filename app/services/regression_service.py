@@ -1,75 +1,241 @@
-import math
+import uuid
+from functools import partial
+import numpy as np
 import pandas as pd
 from fastapi import HTTPException
-from sklearn.metrics import mean_squared_error, r2_score
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import KFold, train_test_split
 
-from app.utils.csv_loader import load_csv
 from app.utils.data_cleaning import clean_dataframe
 from app.utils.feature_detection import detect_feature_types
+from app.utils.schema_inference import widen_numeric
+from app.services.dataset_store import get_dataset, resolve_dataset
 from app.services.preprocessing import build_preprocessor
-from app.services.model_factory import get_regression_models
-from app.utils.model_storage import save_model
+from app.services.model_factory import (
+    TUNING_MODES,
+    assemble_pipeline,
+    clone_steps,
+    get_regression_estimators,
+    plan_polynomial,
+    polynomial_steps,
+    supports_multi_output,
+)
+from app.services.training_executor import (
+    TrainingCancelled,
+    fit_candidate,
+    train_candidates,
+    train_tasks,
+)
+from app.services.model_selection import (
+    EVALUATION_MODES,
+    SELECTION_MODES,
+    cross_validate,
+    model_progress,
+    successive_halving,
+)
+from app.services.streaming_trainer import run_streaming_regression
+from app.utils.csv_loader import hash_upload, upload_size
+from app.utils.model_storage import resolve_model_path, save_model
 from app.utils.json_sanitizer import sanitize
 from app.services.plot_store import PLOT_STORE
-from app.core.config import DEFAULT_NULL_STRATEGY, TRAIN_TEST_SPLIT_RATIO
+from app.services.result_cache import REGRESSION_RESULTS
+from app.utils.plot_reduction import build_plot_views
+from app.utils.timing import record_stage, stage
+from app.core.config import (
+    CV_FOLDS,
+    CV_TIME_BUDGET_SECONDS,
+    DEFAULT_NULL_STRATEGY,
+    MODEL_SELECTION,
+    PLOT_DENSITY_BINS,
+    REGRESSION_EVALUATION,
+    PLOT_HISTOGRAM_BINS,
+    PLOT_MAX_POINTS,
+    REGRESSION_TUNING,
+    STREAMING_TRAIN_MIN_BYTES,
+    TRAIN_TEST_SPLIT_RATIO,
+    TRAINING_ENGINE,
+)
+
+ENGINES = {"memory", "streaming", "auto"}
+
+
+def resolve_engine(engine, file=None, dataset_id=None):
+    engine = engine or TRAINING_ENGINE
+    if engine not in ENGINES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid engine. Use one of: {', '.join(sorted(ENGINES))}"
+        )
+    if engine == "auto":
+        # Cached datasets are already in memory; only big raw uploads stream
+        large = not dataset_id and file is not None and upload_size(file) >= STREAMING_TRAIN_MIN_BYTES
+        engine = "streaming" if large else "memory"
+    return engine
 
 
 def run_regression(
-    file,
+    file=None,
     target_column=None,
     feature_columns=None,
     null_strategy=None,
-    drop_columns=None
+    drop_columns=None,
+    dataset_id=None,
+    execution_mode=None,
+    max_workers=None,
+    tuning=None,
+    engine=None,
+    selection=None,
+    evaluation=None,
+    use_cache=True,
+    on_progress=None,
+    should_cancel=None,
+    target_columns=None,
+    admission=None
 ):
-    # =====================================================
-    # LOAD CSV
-    # =====================================================
-    df = load_csv(file)
-
-    # Normalize column names to avoid whitespace mismatches
-    original_cols = list(df.columns)
-    stripped_cols = [c.strip() if isinstance(c, str) else c for c in original_cols]
-    if len(set(stripped_cols)) != len(stripped_cols):
-        raise HTTPException(400, "Duplicate columns detected after trimming spaces")
-    if stripped_cols != original_cols:
-        df.columns = stripped_cols
-    if target_column:
-        target_column = target_column.strip()
-    if feature_columns:
-        feature_columns = [c.strip() for c in feature_columns]
-
-    if not feature_columns:
-        raise HTTPException(400, "Feature columns cannot be empty")
+    # admission: optional context factory (e.g. a memory reservation) entered only
+    # around actual training, so memoized hits and single-flight waiters skip it
+    # Several targets share one parse, cleaning and design matrix
+    targets = [c.strip() for c in target_columns or [] if c.strip()]
+    if len(targets) == 1:
+        target_column = targets[0]
+    elif targets:
+        if (engine or TRAINING_ENGINE) == "streaming":
+            raise HTTPException(400, "Multi-target regression needs the memory engine")
+        if (selection or MODEL_SELECTION) != "full" or (evaluation or REGRESSION_EVALUATION) != "holdout":
+            raise HTTPException(
+                status_code=400,
+                detail="Multi-target regression supports selection=full and evaluation=holdout only"
+            )
+        engine, selection, evaluation = "memory", "full", "holdout"
+    elif not target_column:
+        raise HTTPException(400, "Provide target_column or target_columns")
+
+    # Checked before loading: repeated or overlapping names break column selection
+    selected_targets = targets if len(targets) > 1 else [target_column.strip()]
+    if len(set(selected_targets)) != len(selected_targets):
+        raise HTTPException(400, "Duplicate target columns")
+    features = {c.strip() for c in feature_columns or []}
+    for col in selected_targets:
+        if col in features:
+            raise HTTPException(400, f"Target column '{col}' is also a feature column")
+
+    # Identical content + parameters reuse the stored response, plot and model
+    engine = resolve_engine(engine, file, dataset_id)
+    if engine == "streaming":
+        # The streaming trainer solves every candidate exactly; only an explicit request is an error
+        if selection == "halving":
+            raise HTTPException(400, "Halving selection needs the memory engine")
+        if evaluation == "kfold":
+            raise HTTPException(400, "K-fold evaluation needs the memory engine")
+        selection, evaluation = "full", "holdout"
+    content_hash = dataset_id
+    if not content_hash and file is not None:
+        with stage("hash"):
+            content_hash = hash_upload(file)
+    if len(targets) > 1:
+        train = partial(
+            _train_multi_regression,
+            file, targets, feature_columns, null_strategy, drop_columns, dataset_id,
+            execution_mode, max_workers, tuning, on_progress, should_cancel, content_hash
+        )
+    else:
+        train = partial(
+            _train_regression,
+            file, target_column, feature_columns, null_strategy, drop_columns, dataset_id,
+            execution_mode, max_workers, tuning, engine, selection, evaluation, on_progress,
+            should_cancel, content_hash
+        )
+    if admission is not None:
+        train = partial(_train_admitted, admission, train)
+    if content_hash is None:
+        return {**train(), "cached": False}
+
+    # Execution mode and worker count change speed, not results
+    key = (
+        content_hash,
+        tuple(targets) if len(targets) > 1 else target_column.strip(),
+        tuple(c.strip() for c in feature_columns or []),
+        null_strategy or DEFAULT_NULL_STRATEGY,
+        tuple(sorted(drop_columns or [])),
+        tuning or REGRESSION_TUNING,
+        engine,
+        selection or MODEL_SELECTION,
+        evaluation or REGRESSION_EVALUATION,
+    )
+    response, hit = REGRESSION_RESULTS.get_or_compute(
+        key,
+        train,
+        validate=_result_available,
+        bypass=not use_cache,
+        retry_on=(TrainingCancelled,),
+        should_cancel=should_cancel
+    )
+    return {**response, "cached": hit}
 
-    if target_column not in df.columns:
-        raise HTTPException(400, f"Target column '{target_column}' not found")
 
-    for col in feature_columns:
-        if col not in df.columns:
-            raise HTTPException(400, f"Feature column '{col}' not found")
+def _train_admitted(admission, train):
+    with admission():
+        return train()
 
-    # =====================================================
-    # DROP COLUMNS (OPTIONAL)
-    # =====================================================
-    if drop_columns:
-        df = df.drop(columns=drop_columns, errors="ignore")
 
-    strategy = null_strategy or DEFAULT_NULL_STRATEGY
+def _result_available(response):
+    if "targets" in response:
+        return all(_result_available(run) for run in response["targets"].values())
 
-    # =====================================================
-    # CLEAN DATA
-    # =====================================================
-    df = clean_dataframe(df, feature_columns, target_column, strategy)
+    # Plot data and the artifact can be evicted or pruned independently
+    if not PLOT_STORE.touch(response["run_id"]):
+        return False
+    try:
+        resolve_model_path(response["saved_model_filename"])
+    except HTTPException:
+        return False
+    return True
 
-    X = df[feature_columns]
-    y = df[target_column]
 
-    if not pd.api.types.is_numeric_dtype(y):
+def _train_regression(
+    file=None,
+    target_column=None,
+    feature_columns=None,
+    null_strategy=None,
+    drop_columns=None,
+    dataset_id=None,
+    execution_mode=None,
+    max_workers=None,
+    tuning=None,
+    engine=None,
+    selection=None,
+    evaluation=None,
+    on_progress=None,
+    should_cancel=None,
+    content_hash=None
+):
+    tuning = tuning or REGRESSION_TUNING
+    selection = selection or MODEL_SELECTION
+    evaluation = evaluation or REGRESSION_EVALUATION
+    if selection not in SELECTION_MODES:
         raise HTTPException(
             status_code=400,
-            detail=f"Target column '{target_column}' must be numeric for regression"
+            detail=f"Invalid selection. Use one of: {', '.join(sorted(SELECTION_MODES))}"
         )
+    if evaluation not in EVALUATION_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid evaluation. Use one of: {', '.join(sorted(EVALUATION_MODES))}"
+        )
+    if evaluation == "kfold" and selection == "halving":
+        raise HTTPException(400, "Halving selection needs holdout evaluation")
+    if resolve_engine(engine, file, dataset_id) == "streaming":
+        return _run_streaming(
+            file, target_column, feature_columns, null_strategy, dataset_id,
+            tuning, on_progress, should_cancel
+        )
+
+    strategy = null_strategy or DEFAULT_NULL_STRATEGY
+    dataset, df, (target_column,), feature_columns = _load_training_frame(
+        file, dataset_id, [target_column], feature_columns, drop_columns, strategy, content_hash
+    )
+
+    X = df[feature_columns]
+    y = df[target_column]
 
     # =====================================================
     # FEATURE TYPE DETECTION
@@ -84,15 +250,31 @@ def run_regression(
     # =====================================================
     preprocessor = build_preprocessor(numeric_features, categorical_features)
 
+    if evaluation == "kfold":
+        return _run_kfold(
+            X, y, numeric_features, categorical_features, tuning,
+            execution_mode, max_workers, on_progress, should_cancel,
+            data_info={
+                "rows": len(df),
+                "null_strategy": strategy,
+                "tuning": tuning,
+                "engine": "memory",
+                "dataset_id": dataset["dataset_id"]
+            },
+            target_column=target_column,
+            feature_columns=feature_columns
+        )
+
     # =====================================================
     # TRAIN / TEST SPLIT
     # =====================================================
-    X_train, X_test, y_train, y_test = train_test_split(
-        X,
-        y,
-        test_size=TRAIN_TEST_SPLIT_RATIO,
-        random_state=42
-    )
+    with stage("split"):
+        X_train, X_test, y_train, y_test = train_test_split(
+            X,
+            y,
+            test_size=TRAIN_TEST_SPLIT_RATIO,
+            random_state=42
+        )
 
     if len(y_test) < 2:
         raise HTTPException(
@@ -100,84 +282,560 @@ def run_regression(
             detail="Not enough test samples to evaluate regression. Please provide more data."
         )
 
+    # =====================================================
+    # SHARED PREPROCESSING (FIT & TRANSFORM ONCE)
+    # =====================================================
+    # Sparse output whenever one-hot columns dominate the design matrix
+    with stage("preprocess"):
+        Xt_train = preprocessor.fit_transform(X_train)
+        Xt_test = preprocessor.transform(X_test)
+
     # =====================================================
     # MODEL TRAINING & SELECTION
     # =====================================================
-    models = get_regression_models(preprocessor)
+    estimators, poly_plan = _candidate_estimators(
+        tuning, Xt_train, Xt_test.shape[0], len(numeric_features)
+    )
 
-    best_model = None
+    # Halving races candidates on row subsamples and fully fits only the survivor
+    eliminated = {}
+    rounds = None
+    with stage("train"):
+        if selection == "halving":
+            outcomes, eliminated, rounds = successive_halving(
+                estimators,
+                Xt_train,
+                y_train,
+                Xt_test,
+                y_test,
+                mode=execution_mode,
+                max_workers=max_workers,
+                on_progress=on_progress,
+                should_cancel=should_cancel
+            )
+        else:
+            outcomes = train_candidates(
+                estimators,
+                Xt_train,
+                y_train,
+                Xt_test,
+                y_test,
+                mode=execution_mode,
+                max_workers=max_workers,
+                on_progress=on_progress,
+                should_cancel=should_cancel
+            )
+
+    best_estimator = None
     best_model_name = None
     best_r2 = -1e9
+    best_train_pred = None
     best_test_pred = None
 
     results = {}
 
-    for name, model in models.items():
-        try:
-            model.fit(X_train, y_train)
+    for name, outcome in outcomes.items():
+        if "error" in outcome:
+            results[name] = {"error": outcome["error"]}
+            continue
+
+        results[name] = outcome["metrics"]
+        # Measured inside the worker, so pooled fits report their own time
+        for step, seconds in outcome["timings"].items():
+            record_stage(f"{step}.{name}", seconds)
+        test_r2 = outcome["metrics"]["test_r2"]
+
+        if test_r2 is not None and test_r2 > best_r2:
+            best_r2 = test_r2
+            best_estimator = outcome["estimator"]
+            best_model_name = name
+            best_train_pred = outcome["train_pred"]
+            best_test_pred = outcome["test_pred"]
+
+    # Eliminated candidates keep the metrics of the subsample they lost on
+    for name, info in eliminated.items():
+        outcome = info["outcome"]
+        entry = {"error": outcome["error"]} if "error" in outcome else dict(outcome["metrics"])
+        entry["eliminated_in_round"] = info["round"]
+        entry["fit_rows"] = info["rows"]
+        results[name] = entry
+    results = {name: results[name] for name in estimators if name in results}
+
+    _report_polynomial(results, poly_plan)
+
+    if not best_estimator:
+        raise HTTPException(500, "All models failed")
+
+    # Saved artifact stays a single self-contained pipeline
+    best_model = assemble_pipeline(preprocessor, best_estimator)
+
+    # A cancelled run must not publish plot data or a saved model
+    if should_cancel and should_cancel():
+        raise TrainingCancelled()
+
+    return publish_run(
+        best_model,
+        best_model_name,
+        results,
+        {
+            "train": (y_train.to_numpy(dtype=np.float64), best_train_pred),
+            "test": (y_test.to_numpy(dtype=np.float64), best_test_pred)
+        },
+        feature_engineering={
+            "numeric_features": numeric_features,
+            "categorical_features": categorical_features
+        },
+        data_info={
+            "rows": len(df),
+            "train_rows": len(X_train),
+            "test_rows": len(X_test),
+            "null_strategy": strategy,
+            "tuning": tuning,
+            "engine": "memory",
+            "dataset_id": dataset["dataset_id"]
+        },
+        target_column=target_column,
+        feature_columns=feature_columns,
+        selection={"mode": selection, "rounds": rounds}
+    )
+
+
+def _train_multi_regression(
+    file=None,
+    target_columns=None,
+    feature_columns=None,
+    null_strategy=None,
+    drop_columns=None,
+    dataset_id=None,
+    execution_mode=None,
+    max_workers=None,
+    tuning=None,
+    on_progress=None,
+    should_cancel=None,
+    content_hash=None
+):
+    """Regress several targets on one feature set.
+
+    The upload is parsed, cleaned, split and preprocessed once. Candidates
+    that support multi-output fit every target in a single solve; the others
+    (cross-validated Lasso / ElasticNet) fit once per target. Each target
+    then gets its own comparison, plot data and saved model.
+    """
+    tuning = tuning or REGRESSION_TUNING
+    strategy = null_strategy or DEFAULT_NULL_STRATEGY
+    dataset, df, target_columns, feature_columns = _load_training_frame(
+        file, dataset_id, target_columns, feature_columns, drop_columns, strategy, content_hash
+    )
+
+    X = df[feature_columns]
+    Y = df[target_columns]
 
-            train_pred = model.predict(X_train)
-            test_pred = model.predict(X_test)
+    numeric_features, categorical_features = detect_feature_types(df, feature_columns)
+    if not numeric_features and not categorical_features:
+        raise HTTPException(400, "No valid features detected")
 
-            train_r2 = r2_score(y_train, train_pred)
-            test_r2 = r2_score(y_test, test_pred)
+    preprocessor = build_preprocessor(numeric_features, categorical_features)
 
-            if math.isnan(test_r2):
-                test_r2 = None
+    with stage("split"):
+        X_train, X_test, Y_train, Y_test = train_test_split(
+            X,
+            Y,
+            test_size=TRAIN_TEST_SPLIT_RATIO,
+            random_state=42
+        )
 
-            test_mse = mean_squared_error(y_test, test_pred)
+    if len(Y_test) < 2:
+        raise HTTPException(
+            status_code=400,
+            detail="Not enough test samples to evaluate regression. Please provide more data."
+        )
 
-            results[name] = {
-                "train_r2": train_r2,
-                "test_r2": test_r2,
-                "test_mse": test_mse
-            }
+    with stage("preprocess"):
+        Xt_train = preprocessor.fit_transform(X_train)
+        Xt_test = preprocessor.transform(X_test)
 
+    estimators, poly_plan = _candidate_estimators(
+        tuning, Xt_train, Xt_test.shape[0], len(numeric_features), multi_output=True
+    )
+
+    # Multi-output candidates are one task for all targets, the rest one task per target
+    tasks = {}
+    for name, steps in estimators.items():
+        if supports_multi_output(steps):
+            tasks[(name, None)] = (steps, (Xt_train, Y_train, Xt_test, Y_test))
+            continue
+        for target in target_columns:
+            tasks[(name, target)] = (
+                clone_steps(steps),
+                (Xt_train, Y_train[target], Xt_test, Y_test[target])
+            )
+
+    with stage("train"):
+        outcomes = train_tasks(
+            tasks,
+            mode=execution_mode,
+            max_workers=max_workers,
+            on_progress=model_progress(on_progress or (lambda name, status: None), tasks),
+            should_cancel=should_cancel
+        )
+
+    per_target = {target: {} for target in target_columns}
+    for (name, target), outcome in outcomes.items():
+        if "error" not in outcome:
+            for step, seconds in outcome["timings"].items():
+                record_stage(f"{step}.{name}", seconds)
+        if target is not None:
+            per_target[target][name] = outcome
+        elif "error" in outcome:
+            for target in target_columns:
+                per_target[target][name] = outcome
+        else:
+            for target, scored in zip(target_columns, outcome["targets"]):
+                per_target[target][name] = scored
+
+    if should_cancel and should_cancel():
+        raise TrainingCancelled()
+
+    responses = {}
+    for target in target_columns:
+        results = {}
+        best_model_name = None
+        best_r2 = -1e9
+        for name in estimators:
+            outcome = per_target[target][name]
+            if "error" in outcome:
+                results[name] = {"error": outcome["error"]}
+                continue
+            results[name] = outcome["metrics"]
+            test_r2 = outcome["metrics"]["test_r2"]
             if test_r2 is not None and test_r2 > best_r2:
                 best_r2 = test_r2
-                best_model = model
                 best_model_name = name
-                best_test_pred = test_pred
+        _report_polynomial(results, poly_plan)
+
+        if best_model_name is None:
+            raise HTTPException(500, f"All models failed for target '{target}'")
+
+        best = per_target[target][best_model_name]
+        responses[target] = publish_run(
+            assemble_pipeline(preprocessor, best["estimator"]),
+            best_model_name,
+            results,
+            {
+                "train": (Y_train[target].to_numpy(dtype=np.float64), best["train_pred"]),
+                "test": (Y_test[target].to_numpy(dtype=np.float64), best["test_pred"])
+            },
+            feature_engineering={
+                "numeric_features": numeric_features,
+                "categorical_features": categorical_features
+            },
+            data_info={
+                "rows": len(df),
+                "train_rows": len(X_train),
+                "test_rows": len(X_test),
+                "null_strategy": strategy,
+                "tuning": tuning,
+                "engine": "memory",
+                "dataset_id": dataset["dataset_id"],
+                "target_columns": target_columns
+            },
+            target_column=target,
+            feature_columns=feature_columns
+        )
+
+    return {"target_columns": target_columns, "targets": responses}
+
+
+def _candidate_estimators(tuning, Xt_train, n_test_rows, n_numeric, multi_output=False):
+    estimators = get_regression_estimators(tuning, multi_output=multi_output)
+
+    # Degree-2 expansion is sized before fitting; too-large ones are capped or skipped
+    with stage("plan_polynomial"):
+        poly_plan = plan_polynomial(Xt_train, n_test_rows, n_numeric)
+    poly_steps = polynomial_steps(poly_plan, n_numeric)
+    if poly_steps is None:
+        del estimators["PolynomialRegression"]
+    else:
+        estimators["PolynomialRegression"] = poly_steps
+    return estimators, poly_plan
+
+
+def _report_polynomial(results, poly_plan):
+    if "PolynomialRegression" not in results:
+        results["PolynomialRegression"] = {"error": poly_plan["skipped_reason"]}
+    results["PolynomialRegression"]["feature_expansion"] = poly_plan
+
+
+def _load_training_frame(file, dataset_id, target_columns, feature_columns, drop_columns,
+                         strategy, content_hash=None):
+    # =====================================================
+    # LOAD CSV (OR CACHED DATASET)
+    # =====================================================
+    # Only the selected columns are read back from the columnar cache
+    needed = [*(feature_columns or []), *target_columns] if all(target_columns) else None
+    dataset = resolve_dataset(file, dataset_id, columns=needed, content_hash=content_hash)
+    df = dataset["df"]
+
+    # Normalize column names to avoid whitespace mismatches
+    original_cols = list(df.columns)
+    stripped_cols = [c.strip() if isinstance(c, str) else c for c in original_cols]
+    if len(set(stripped_cols)) != len(stripped_cols):
+        raise HTTPException(400, "Duplicate columns detected after trimming spaces")
+    if stripped_cols != original_cols:
+        # The cached frame is shared, rename on a shallow copy
+        df = df.set_axis(stripped_cols, axis=1)
+    target_columns = [c.strip() if c else c for c in target_columns]
+    if feature_columns:
+        feature_columns = [c.strip() for c in feature_columns]
+
+    if not feature_columns:
+        raise HTTPException(400, "Feature columns cannot be empty")
+
+    for col in target_columns:
+        if col not in df.columns:
+            raise HTTPException(400, f"Target column '{col}' not found")
+
+    for col in feature_columns:
+        if col not in df.columns:
+            raise HTTPException(400, f"Feature column '{col}' not found")
 
-        except Exception as e:
-            results[name] = {"error": str(e)}
+    # =====================================================
+    # DROP COLUMNS (OPTIONAL)
+    # =====================================================
+    if drop_columns:
+        df = df.drop(columns=drop_columns, errors="ignore")
 
-    if not best_model:
+    # =====================================================
+    # CLEAN DATA
+    # =====================================================
+    with stage("clean"):
+        # Fill values, scaling and metrics must not depend on CSV_DTYPES
+        selected = [*feature_columns, *target_columns]
+        df = widen_numeric(df[selected], selected)
+        df = clean_dataframe(df, feature_columns, target_columns, strategy)
+
+    for col in target_columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Target column '{col}' must be numeric for regression"
+            )
+
+    return dataset, df, target_columns, feature_columns
+
+
+def _run_kfold(X, y, numeric_features, categorical_features, tuning, execution_mode,
+               max_workers, on_progress, should_cancel, data_info, target_column,
+               feature_columns):
+    if CV_FOLDS < 2:
+        raise HTTPException(400, "CV_FOLDS must be at least 2")
+    n_folds = min(CV_FOLDS, len(X) // 2)
+    if n_folds < 2:
+        raise HTTPException(
+            status_code=400,
+            detail="Not enough samples for k-fold evaluation. Please provide more data."
+        )
+
+    with stage("split"):
+        splits = list(KFold(n_splits=n_folds, shuffle=True, random_state=42).split(X))
+
+    # Each fold's preprocessing is fitted once and shared by every candidate
+    def build_fold(index):
+        train_rows, val_rows = splits[index]
+        with stage("preprocess"):
+            preprocessor = build_preprocessor(numeric_features, categorical_features)
+            Xt_train = preprocessor.fit_transform(X.iloc[train_rows])
+            Xt_val = preprocessor.transform(X.iloc[val_rows])
+        return Xt_train, y.iloc[train_rows], Xt_val, y.iloc[val_rows], val_rows
+
+    first_fold = build_fold(0)
+
+    estimators, poly_plan = _candidate_estimators(
+        tuning, first_fold[0], first_fold[2].shape[0], len(numeric_features)
+    )
+
+    with stage("train"):
+        outcomes, evaluation = cross_validate(
+            estimators,
+            first_fold,
+            build_fold,
+            n_folds,
+            CV_TIME_BUDGET_SECONDS,
+            mode=execution_mode,
+            max_workers=max_workers,
+            on_progress=on_progress,
+            should_cancel=should_cancel
+        )
+
+    results = {}
+    best_model_name = None
+    best_r2 = -1e9
+    for name, outcome in outcomes.items():
+        if "error" in outcome:
+            results[name] = {"error": outcome["error"]}
+            continue
+
+        results[name] = outcome["metrics"]
+        for step, seconds in outcome["timings"].items():
+            record_stage(f"{step}.{name}", seconds)
+        test_r2 = outcome["metrics"]["test_r2"]
+        if test_r2 is not None and test_r2 > best_r2:
+            best_r2 = test_r2
+            best_model_name = name
+
+    _report_polynomial(results, poly_plan)
+
+    if best_model_name is None:
         raise HTTPException(500, "All models failed")
 
+    if should_cancel and should_cancel():
+        raise TrainingCancelled()
+
+    # Only the winner is refitted, on every row
+    with stage("refit"):
+        preprocessor = build_preprocessor(numeric_features, categorical_features)
+        Xt = preprocessor.fit_transform(X)
+        refit = fit_candidate(estimators[best_model_name], Xt, y, Xt, y)
+    record_stage(f"fit.{best_model_name}", refit["timings"]["fit"])
+
+    if should_cancel and should_cancel():
+        raise TrainingCancelled()
+
+    y_all = y.to_numpy(dtype=np.float64)
+    best = outcomes[best_model_name]
+    return publish_run(
+        assemble_pipeline(preprocessor, refit["estimator"]),
+        best_model_name,
+        results,
+        {
+            # Training fit of the refitted winner, and its out-of-fold predictions
+            "train": (y_all, refit["train_pred"]),
+            "test": (y_all[best["oof_positions"]], best["oof_pred"])
+        },
+        feature_engineering={
+            "numeric_features": numeric_features,
+            "categorical_features": categorical_features
+        },
+        data_info={
+            **data_info,
+            "train_rows": len(X),
+            "test_rows": len(best["oof_positions"]),
+            "evaluation": evaluation
+        },
+        target_column=target_column,
+        feature_columns=feature_columns
+    )
+
+
+def _run_streaming(file, target_column, feature_columns, null_strategy, dataset_id,
+                   tuning, on_progress, should_cancel):
+    target_column = target_column.strip() if target_column else target_column
+    feature_columns = [c.strip() for c in feature_columns or []]
+    if not feature_columns:
+        raise HTTPException(400, "Feature columns cannot be empty")
+    if tuning not in TUNING_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid tuning. Use one of: {', '.join(sorted(TUNING_MODES))}"
+        )
+
+    if dataset_id:
+        trained = run_streaming_regression(
+            df=get_dataset(dataset_id, [*feature_columns, target_column])["df"],
+            dataset_id=dataset_id,
+            target_column=target_column,
+            feature_columns=feature_columns,
+            strategy=null_strategy or DEFAULT_NULL_STRATEGY,
+            tuning=tuning,
+            on_progress=on_progress,
+            should_cancel=should_cancel
+        )
+    elif file is not None:
+        trained = run_streaming_regression(
+            file=file,
+            target_column=target_column,
+            feature_columns=feature_columns,
+            strategy=null_strategy or DEFAULT_NULL_STRATEGY,
+            tuning=tuning,
+            on_progress=on_progress,
+            should_cancel=should_cancel
+        )
+    else:
+        raise HTTPException(status_code=400, detail="Provide either a CSV file or a dataset_id")
+
+    if should_cancel and should_cancel():
+        raise TrainingCancelled()
+
+    return publish_run(
+        trained["best_model"],
+        trained["best_model_name"],
+        trained["results"],
+        trained["splits"],
+        feature_engineering=trained["feature_engineering"],
+        data_info=trained["data_info"],
+        target_column=target_column,
+        feature_columns=feature_columns
+    )
+
+
+def publish_run(
+    best_model,
+    best_model_name,
+    results,
+    splits,
+    feature_engineering,
+    data_info,
+    target_column,
+    feature_columns,
+    selection=None
+):
     # =====================================================
     # STORE PLOT DATA (BEST MODEL ONLY)
     # =====================================================
-    PLOT_STORE["last"] = {
-        "train": {
-            "y_actual": y_train.tolist(),
-            "y_pred": best_model.predict(X_train).tolist()
-        },
-        "test": {
-            "y_actual": y_test.tolist(),
-            "y_pred": best_test_pred.tolist()
+    run_id = uuid.uuid4().hex
+
+    plot = {
+        split: {
+            "y_actual": np.asarray(actual, dtype=np.float64),
+            "y_pred": np.asarray(pred, dtype=np.float64)
         }
+        for split, (actual, pred) in splits.items()
     }
+    with stage("plot_views"):
+        plot["views"] = build_plot_views(
+            splits,
+            PLOT_MAX_POINTS,
+            PLOT_DENSITY_BINS,
+            PLOT_HISTOGRAM_BINS
+        )
 
     # =====================================================
     # SAVE BEST MODEL
     # =====================================================
-    saved_model_info = save_model(best_model, best_model_name)
+    with stage("save_model"):
+        saved_model_info = save_model(
+            best_model,
+            best_model_name,
+            dataset_id=data_info["dataset_id"],
+            target=target_column,
+            features=feature_columns,
+            metrics=results[best_model_name]
+        )
 
     response = {
         "best_model": best_model_name,
-        "feature_engineering": {
-            "numeric_features": numeric_features,
-            "categorical_features": categorical_features
-        },
-        "data_info": {
-            "rows": len(df),
-            "train_rows": len(X_train),
-            "test_rows": len(X_test),
-            "null_strategy": strategy
-        },
+        "feature_engineering": feature_engineering,
+        "data_info": data_info,
         "model_comparison": results,
-        "saved_model_filename": saved_model_info["filename"]
+        "saved_model_filename": saved_model_info["filename"],
+        "run_id": run_id
     }
+    if selection is not None:
+        response["selection"] = selection
+
+    with stage("sanitize"):
+        response = sanitize(response)
+    with stage("store"):
+        PLOT_STORE.put(run_id, {"plot": plot, "result": response})
 
-    return sanitize(response)
+    return response
@@ -0,0 +1,160 @@
+import threading
+from collections import OrderedDict
+
+from app.core.config import REGRESSION_CACHE_MAX_BYTES
+from app.services.plot_store import payload_nbytes
+from app.services.state_backend import SHARED_STATE
+from app.services.training_executor import CANCEL_POLL_SECONDS, TrainingCancelled
+
+
+class ResultCache:
+    """Byte-bounded LRU of finished results with single-flight computation.
+
+    Concurrent callers with the same key share one computation: the first
+    one runs it, the others wait and receive its result (or its error).
+    With a shared state `backend`, results are also written through to it,
+    so other worker processes find them (single-flight stays per process).
+    """
+
+    def __init__(self, max_bytes, backend=None):
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def get_or_compute(self, key, compute, validate=None, bypass=False, retry_on=(),
+                       should_cancel=None):
+        """Returns (value, hit). `validate` rejects entries whose side state
+        is gone; `bypass` always recomputes, without waiting on an in-flight
+        leader, and refreshes the entry; leader errors in `retry_on` make
+        waiters compute for themselves instead of sharing the error. A waiter
+        whose `should_cancel` turns true stops waiting with TrainingCancelled."""
+        if not self.enabled:
+            return compute(), False
+
+        if bypass:
+            with self._lock:
+                self.misses += 1
+            value = compute()
+            self._store(key, value)
+            return value, False
+
+        while True:
+            value = self._lookup(key, validate)
+            if value is not None:
+                return value, True
+
+            with self._lock:
+                flight = self._inflight.get(key)
+                if flight is None:
+                    # A leader may have finished between the lookup and here
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        self.hits += 1
+                        return entry["value"], True
+                    flight = self._inflight[key] = {
+                        "event": threading.Event(),
+                        "value": None,
+                        "error": None,
+                    }
+                    self.misses += 1
+                    break
+                self.shared += 1
+
+            while not flight["event"].wait(CANCEL_POLL_SECONDS if should_cancel else None):
+                if should_cancel():
+                    raise TrainingCancelled()
+            if flight["error"] is None:
+                return flight["value"], True
+            if not isinstance(flight["error"], retry_on):
+                raise flight["error"]
+
+        try:
+            value = compute()
+        except BaseException as e:
+            flight["error"] = e
+            raise
+        else:
+            flight["value"] = value
+            self._store(key, value)
+            return value, False
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight["event"].set()
+
+    def _lookup(self, key, validate):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None and self.backend is not None:
+            value = self.backend.get_result(key)
+            if value is not None:
+                entry = self._store(key, value, write_through=False)
+        if entry is None:
+            return None
+
+        # Validation may touch disk, so it runs outside the lock
+        valid = validate is None or validate(entry["value"])
+        with self._lock:
+            if valid and key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry["value"]
+            if not valid and self._entries.get(key) is entry:
+                self._entries.pop(key)
+                self.current_bytes -= entry["nbytes"]
+                self.invalidations += 1
+        return None
+
+    def _store(self, key, value, write_through=True):
+        if write_through and self.backend is not None:
+            self.backend.put_result(key, value, self.max_bytes)
+
+        nbytes = payload_nbytes(value)
+        if nbytes > self.max_bytes:
+            return None
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous["nbytes"]
+
+            while self._entries and self.current_bytes + nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted["nbytes"]
+                self.evictions += 1
+
+            entry = self._entries[key] = {"value": value, "nbytes": nbytes}
+            self.current_bytes += nbytes
+        return entry
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory" if self.backend is None else "sqlite",
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "in_flight": len(self._inflight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared": self.shared,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else None,
+            }
+
+
+REGRESSION_RESULTS = ResultCache(REGRESSION_CACHE_MAX_BYTES, SHARED_STATE)
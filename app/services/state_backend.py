@@ -0,0 +1,251 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from app.core.config import COLUMN_CACHE_DIR, STATE_BACKEND, STATE_DB_PATH
+
+# memory: every worker process keeps its own state | sqlite: one file shared by all workers
+STATE_BACKENDS = {"memory", "sqlite"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    nbytes INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs (created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_accessed ON runs (accessed_at);
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    nbytes INTEGER NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at);
+CREATE TABLE IF NOT EXISTS pointers (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    snapshot BLOB NOT NULL,
+    finished INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished, updated_at);
+"""
+
+# Rows beyond a byte budget, newest access first
+EVICT_SQL = """
+DELETE FROM {table} WHERE {key} IN (
+    SELECT {key} FROM (
+        SELECT {key}, SUM(nbytes) OVER (ORDER BY accessed_at DESC, {key}) AS running
+        FROM {table}
+    ) WHERE running > ?
+)
+"""
+
+
+class SqliteState:
+    """SQLite file holding state that every worker process must see.
+
+    Payloads are pickled into BLOB rows; WAL mode lets readers in other
+    workers proceed while one worker writes.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._ready = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connect(self):
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    self._initialize()
+                    self._ready = True
+
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _initialize(self):
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    # =====================================================
+    # MEMOIZED RESULTS
+    # =====================================================
+    def get_result(self, key):
+        digest = _key_digest(key)
+        with self.connect() as conn:
+            row = conn.execute("SELECT value FROM results WHERE key = ?", (digest,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (time.time(), digest))
+        return pickle.loads(row[0])
+
+    def put_result(self, key, value, max_bytes):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > max_bytes:
+            return
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, nbytes, accessed_at) VALUES (?, ?, ?, ?)",
+                (_key_digest(key), blob, len(blob), time.time())
+            )
+            conn.execute(EVICT_SQL.format(table="results", key="key"), (max_bytes,))
+
+    # =====================================================
+    # BACKGROUND JOBS
+    # =====================================================
+    def put_job(self, snapshot, finished, retention):
+        # The cancel flag is only ever raised, by request_job_cancel
+        blob = pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, snapshot, finished, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (job_id) DO UPDATE SET "
+                "snapshot = excluded.snapshot, finished = excluded.finished, updated_at = excluded.updated_at",
+                (snapshot["job_id"], blob, int(finished), time.time())
+            )
+            if finished:
+                conn.execute(
+                    "DELETE FROM jobs WHERE finished = 1 AND job_id NOT IN ("
+                    "SELECT job_id FROM jobs WHERE finished = 1 ORDER BY updated_at DESC LIMIT ?)",
+                    (retention,)
+                )
+
+    def get_job(self, job_id):
+        # (snapshot, cancel_requested), or None for an unknown job
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT snapshot, cancel_requested FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0]), bool(row[1])
+
+    def request_job_cancel(self, job_id):
+        with self.connect() as conn:
+            conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE job_id = ?", (job_id,))
+
+
+class SqliteRunStore:
+    """Run store on a shared SQLite file, API-compatible with RunStore.
+
+    Any worker can serve a run (or the latest run) produced by another.
+    Runs expire after `ttl_seconds`; past `max_bytes` of pickled payloads
+    the least recently accessed are deleted.
+    """
+
+    def __init__(self, state, max_bytes, ttl_seconds):
+        self.state = state
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self.expirations = 0
+
+    def put(self, run_id, payload):
+        blob = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        with self.state.connect() as conn:
+            self._expire(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, payload, nbytes, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (run_id, blob, len(blob), now, now)
+            )
+            self._set_latest(conn, run_id)
+            self.evictions += conn.execute(
+                EVICT_SQL.format(table="runs", key="run_id"), (self.max_bytes,)
+            ).rowcount
+
+    def get(self, run_id):
+        with self.state.connect() as conn:
+            self._expire(conn)
+            row = conn.execute("SELECT payload FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE runs SET accessed_at = ? WHERE run_id = ?", (time.time(), run_id))
+        return pickle.loads(row[0])
+
+    def touch(self, run_id):
+        # Re-serving a stored run makes it the latest without rewriting it
+        with self.state.connect() as conn:
+            self._expire(conn)
+            updated = conn.execute(
+                "UPDATE runs SET accessed_at = ? WHERE run_id = ?", (time.time(), run_id)
+            ).rowcount
+            if not updated:
+                return False
+            self._set_latest(conn, run_id)
+            return True
+
+    def latest(self):
+        with self.state.connect() as conn:
+            row = conn.execute("SELECT value FROM pointers WHERE name = 'latest_run'").fetchone()
+        if row is None:
+            return None, None
+        return row[0], self.get(row[0])
+
+    def _set_latest(self, conn, run_id):
+        conn.execute(
+            "INSERT OR REPLACE INTO pointers (name, value) VALUES ('latest_run', ?)", (run_id,)
+        )
+
+    def _expire(self, conn):
+        cutoff = time.time() - self.ttl_seconds
+        self.expirations += conn.execute(
+            "DELETE FROM runs WHERE created_at < ?", (cutoff,)
+        ).rowcount
+
+    def stats(self):
+        with self.state.connect() as conn:
+            self._expire(conn)
+            runs, nbytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM runs").fetchone()
+        return {
+            "backend": "sqlite",
+            "runs": runs,
+            "current_bytes": nbytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def _key_digest(key):
+    # Cache keys are tuples of strings, None and nested tuples, so repr() is stable
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+def _create_shared_state():
+    if STATE_BACKEND not in STATE_BACKENDS:
+        raise ValueError(f"Invalid STATE_BACKEND. Use one of: {', '.join(sorted(STATE_BACKENDS))}")
+    if STATE_BACKEND == "memory":
+        return None
+    if not COLUMN_CACHE_DIR:
+        # dataset_id lookups on other workers read the on-disk columnar copy
+        raise ValueError("STATE_BACKEND=sqlite needs COLUMN_CACHE_DIR")
+    return SqliteState(STATE_DB_PATH)
+
+
+SHARED_STATE = _create_shared_state()
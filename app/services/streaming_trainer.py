@@ -0,0 +1,572 @@
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from fastapi import HTTPException
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import PolynomialFeatures
+
+from app.core.config import (
+    CSV_CHUNK_ROWS,
+    STREAMING_MAX_DESIGN_COLUMNS,
+    STREAMING_MAX_POLY_COLUMNS,
+    STREAMING_PLOT_SAMPLE_ROWS,
+    TRAIN_TEST_SPLIT_RATIO,
+    TUNING_VALIDATION_FRACTION,
+)
+from app.services.model_factory import RIDGE_ALPHAS, assemble_pipeline, describe_hyperparameters
+from app.services.preprocessing import build_preprocessor
+from app.services.training_executor import TrainingCancelled
+from app.utils.csv_loader import hash_upload, iter_csv_chunks
+from app.utils.timing import record_stage, stage
+
+# Split codes assigned per row by hashing its position in the file
+FIT, VALIDATION, TEST = 0, 1, 2
+
+SPLIT_SEED = np.uint64(0x9E3779B97F4A7C15)
+
+# Upper bound on one dense block of the expanded design held at a time
+GRAM_BLOCK_BYTES = 32 * 1024 * 1024
+
+STREAMING_MODELS = ("LinearRegression", "Ridge", "PolynomialRegression")
+UNSUPPORTED_MODELS = ("Lasso", "ElasticNet")
+
+
+def split_codes(positions, tuning):
+    # splitmix64 finalizer: a stable pseudo-random split that needs no global shuffle
+    z = positions.astype(np.uint64) + SPLIT_SEED
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z = z ^ (z >> np.uint64(31))
+    u = (z >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+    codes = np.full(len(positions), FIT, dtype=np.int8)
+    codes[u < TRAIN_TEST_SPLIT_RATIO] = TEST
+    if tuning == "path":
+        cutoff = TRAIN_TEST_SPLIT_RATIO + (1 - TRAIN_TEST_SPLIT_RATIO) * TUNING_VALIDATION_FRACTION
+        codes[(u >= TRAIN_TEST_SPLIT_RATIO) & (u < cutoff)] = VALIDATION
+    return codes
+
+
+class GramStats:
+    """Sufficient statistics of a linear least-squares problem over a row subset."""
+
+    def __init__(self, width):
+        self.n = 0
+        self.sum_x = np.zeros(width)
+        self.sum_y = 0.0
+        self.sum_yy = 0.0
+        self.xtx = np.zeros((width, width))
+        self.xty = np.zeros(width)
+
+    def add(self, X, y):
+        if not len(y):
+            return
+        self.n += len(y)
+        self.sum_y += float(y.sum())
+        self.sum_yy += float(y @ y)
+        if sp.issparse(X):
+            self.sum_x += np.asarray(X.sum(axis=0)).ravel()
+            self.xtx += (X.T @ X).toarray()
+        else:
+            self.sum_x += X.sum(axis=0)
+            self.xtx += X.T @ X
+        self.xty += X.T @ y
+
+    def merge(self, other):
+        merged = GramStats(len(self.sum_x))
+        for attr in ("n", "sum_x", "sum_y", "sum_yy", "xtx", "xty"):
+            setattr(merged, attr, getattr(self, attr) + getattr(other, attr))
+        return merged
+
+    def block(self, width):
+        # Leading columns only: the linear design is a prefix of the degree-2 design
+        sub = GramStats(width)
+        sub.n, sub.sum_y, sub.sum_yy = self.n, self.sum_y, self.sum_yy
+        sub.sum_x = self.sum_x[:width]
+        sub.xtx = self.xtx[:width, :width]
+        sub.xty = self.xty[:width]
+        return sub
+
+    def solve(self, alpha=0.0):
+        # Centered normal equations; the intercept is not penalized, as in sklearn
+        mean_x = self.sum_x / self.n
+        mean_y = self.sum_y / self.n
+        sxx = self.xtx - self.n * np.outer(mean_x, mean_x)
+        sxy = self.xty - self.n * mean_x * mean_y
+        if alpha:
+            coef = np.linalg.solve(sxx + alpha * np.eye(len(sxy)), sxy)
+        else:
+            # Minimum-norm solution, like LinearRegression on collinear one-hot columns
+            coef = np.linalg.lstsq(sxx, sxy, rcond=None)[0]
+        return coef, mean_y - mean_x @ coef
+
+    def sse(self, coef, intercept):
+        # sum((y - Xw - b)^2) expanded over the accumulated moments
+        value = (
+            self.sum_yy
+            - 2 * (intercept * self.sum_y + coef @ self.xty)
+            + self.n * intercept ** 2
+            + 2 * intercept * (coef @ self.sum_x)
+            + coef @ self.xtx @ coef
+        )
+        return max(value, 0.0)
+
+    def metrics(self, coef, intercept):
+        sse = self.sse(coef, intercept)
+        sst = self.sum_yy - self.sum_y ** 2 / self.n
+        if sst > 0:
+            r2 = 1 - sse / sst
+        else:
+            r2 = 1.0 if sse == 0 else 0.0
+        return r2, sse / self.n
+
+
+class _Moments:
+    """Count, mean and sum of squared deviations, merged chunk by chunk."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, values):
+        n = len(values)
+        if not n:
+            return
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        self.merge(n, mean, m2)
+
+    def merge(self, n, mean, m2):
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.n * n / total
+        self.n = total
+
+
+def _chunk_source(file, df, chunk_rows, **read_options):
+    if df is not None:
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+        return
+    yield from iter_csv_chunks(file, chunk_rows, **read_options)
+
+
+def _strip(chunk):
+    return chunk.set_axis([c.strip() if isinstance(c, str) else c for c in chunk.columns], axis=1)
+
+
+def _mode(counts):
+    # pandas mode() breaks ties by the smallest value
+    if not counts:
+        return "Unknown"
+    top = max(counts.values())
+    return sorted(value for value, count in counts.items() if count == top)[0]
+
+
+def _check_cancel(should_cancel):
+    if should_cancel and should_cancel():
+        raise TrainingCancelled()
+
+
+def run_streaming_regression(
+    file=None,
+    df=None,
+    dataset_id=None,
+    target_column=None,
+    feature_columns=None,
+    strategy="auto",
+    tuning="fixed",
+    chunk_rows=CSV_CHUNK_ROWS,
+    on_progress=None,
+    should_cancel=None
+):
+    """Two passes over row chunks; nothing larger than one chunk plus the
+    Gram matrices is held in memory.
+
+    Pass 1 collects imputation values, scaler moments and one-hot categories
+    over the training rows. Pass 2 transforms each chunk with the resulting
+    preprocessor and accumulates X^T X / X^T y per split. OLS, Ridge and the
+    degree-2 polynomial model are then solved in closed form, and train/test
+    metrics come from the same statistics.
+    """
+    on_progress = on_progress or (lambda name, status: None)
+    for name in STREAMING_MODELS:
+        on_progress(name, "pending")
+
+    if strategy not in {"drop", "mean", "auto"}:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid null_strategy. Use 'drop' or 'mean'."
+        )
+    if file is not None:
+        dataset_id = hash_upload(file)
+
+    selected = feature_columns + [target_column]
+    fill_nulls = strategy != "drop"
+
+    # =====================================================
+    # PASS 1: TYPES, IMPUTATION VALUES, SCALER MOMENTS, CATEGORIES
+    # =====================================================
+    numeric_ok = dict.fromkeys(selected, True)
+    value_sum = dict.fromkeys(selected, 0.0)
+    value_count = dict.fromkeys(selected, 0)
+    train_moments = {col: _Moments() for col in selected}
+    train_nulls = dict.fromkeys(selected, 0)
+    all_counts = {col: Counter() for col in feature_columns}
+    train_counts = {col: Counter() for col in feature_columns}
+    seen_numeric_values = set()
+    rows = 0
+
+    with stage("stream_pass1"):
+        offset = 0
+        for raw in _chunk_source(file, df, chunk_rows):
+            _check_cancel(should_cancel)
+            raw = _strip(raw)
+            if offset == 0:
+                _validate_columns(raw, target_column, feature_columns)
+
+            chunk = raw[selected]
+            positions = offset + np.arange(len(chunk))
+            offset += len(chunk)
+            if not fill_nulls:
+                keep = chunk.notna().all(axis=1).to_numpy()
+                chunk, positions = chunk[keep], positions[keep]
+            rows += len(chunk)
+            train = split_codes(positions, tuning) != TEST
+
+            for col in selected:
+                values = chunk[col]
+                if pd.api.types.is_numeric_dtype(values):
+                    present = values.notna().to_numpy()
+                    train_nulls[col] += int((train & ~present).sum())
+                    if present.any():
+                        seen_numeric_values.add(col)
+                    if numeric_ok[col]:
+                        data = values.to_numpy(dtype=np.float64, na_value=np.nan)
+                        value_sum[col] += float(np.nansum(data))
+                        value_count[col] += int(present.sum())
+                        train_moments[col].add(data[train & present])
+                else:
+                    numeric_ok[col] = False
+                    if col == target_column:
+                        continue
+                    all_counts[col].update(values.dropna().tolist())
+                    train_counts[col].update(values[train].dropna().tolist())
+                    train_nulls[col] += int((train & values.isna().to_numpy()).sum())
+
+    if not rows:
+        raise HTTPException(status_code=400, detail="No data left after cleaning")
+    if not numeric_ok[target_column]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Target column '{target_column}' must be numeric for regression"
+        )
+
+    numeric_features = [col for col in feature_columns if numeric_ok[col]]
+    categorical_features = [col for col in feature_columns if not numeric_ok[col]]
+
+    # A column that parsed as numbers in some chunks and text in others is
+    # categorical overall; count it again as text, as a full read would see it
+    flipped = [col for col in categorical_features if col in seen_numeric_values]
+    if flipped:
+        _recount_categories(
+            file, df, chunk_rows, flipped, selected, fill_nulls, tuning,
+            all_counts, train_counts, train_nulls, should_cancel
+        )
+
+    # =====================================================
+    # PREPROCESSOR FROM PASS-1 STATISTICS
+    # =====================================================
+    numeric_fill = {
+        col: value_sum[col] / value_count[col] if value_count[col] else np.nan
+        for col in numeric_features + [target_column]
+    }
+    categorical_fill = {col: _mode(all_counts[col]) for col in categorical_features}
+
+    for col in numeric_features + [target_column]:
+        if not value_count[col]:
+            raise HTTPException(400, f"Column '{col}' has no numeric values")
+
+    categories = {}
+    for col in categorical_features:
+        values = set(train_counts[col])
+        if fill_nulls and train_nulls[col]:
+            values.add(categorical_fill[col])
+        if not values:
+            raise HTTPException(400, f"Column '{col}' has no values in the training rows")
+        categories[col] = sorted(values)
+
+    width = len(numeric_features) + sum(len(v) for v in categories.values())
+    if width > STREAMING_MAX_DESIGN_COLUMNS:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Encoded design has {width} columns, above the streaming limit of "
+                f"{STREAMING_MAX_DESIGN_COLUMNS}. Drop high-cardinality features or use engine=memory."
+            )
+        )
+    poly_width = width + width * (width + 1) // 2
+    use_poly = poly_width <= STREAMING_MAX_POLY_COLUMNS
+
+    preprocessor = _fit_preprocessor(
+        numeric_features, categorical_features, categories,
+        {col: train_moments[col] for col in numeric_features},
+        {col: train_nulls[col] for col in numeric_features},
+        numeric_fill, fill_nulls
+    )
+    poly = PolynomialFeatures(degree=2, include_bias=False).fit(np.zeros((1, width)))
+    design_width = poly_width if use_poly else width
+
+    # Target is shifted by its training mean so the moments stay well conditioned
+    y_shift = train_moments[target_column].mean
+    fills = {**numeric_fill, **categorical_fill}
+
+    # =====================================================
+    # PASS 2: GRAM MATRICES PER SPLIT
+    # =====================================================
+    for name in STREAMING_MODELS:
+        on_progress(name, "training")
+
+    grams = {code: GramStats(design_width) for code in (FIT, VALIDATION, TEST)}
+    block_rows = max(GRAM_BLOCK_BYTES // (8 * design_width), 1)
+    samples = {"train": None, "test": None}
+    rng = np.random.default_rng(42)
+    read_options = {"dtype": {col: str for col in categorical_features}} if file is not None else {}
+
+    with stage("stream_pass2"):
+        offset = 0
+        for raw in _chunk_source(file, df, chunk_rows, **read_options):
+            _check_cancel(should_cancel)
+            chunk = _strip(raw)[selected]
+            positions = offset + np.arange(len(chunk))
+            offset += len(chunk)
+
+            if fill_nulls:
+                chunk = chunk.fillna({col: fills[col] for col in selected if chunk[col].hasnans})
+            else:
+                keep = chunk.notna().all(axis=1).to_numpy()
+                chunk, positions = chunk[keep], positions[keep]
+            if chunk.empty:
+                continue
+
+            codes = split_codes(positions, tuning)
+            X_all = preprocessor.transform(chunk[feature_columns])
+            y_all = chunk[target_column].to_numpy(dtype=np.float64) - y_shift
+
+            # Row blocks bound the size of the expanded polynomial design
+            for start in range(0, len(chunk), block_rows):
+                X = X_all[start:start + block_rows]
+                if use_poly:
+                    X = poly.transform(X)
+                y = y_all[start:start + block_rows]
+                block_codes = codes[start:start + block_rows]
+                for code, gram in grams.items():
+                    mask = block_codes == code
+                    if mask.any():
+                        gram.add(X[mask], y[mask])
+
+            # Priority sampling keeps a uniform sample of rows for the plots
+            priority = rng.random(len(chunk))
+            for split, mask in (("train", codes != TEST), ("test", codes == TEST)):
+                part = chunk[mask].assign(_priority=priority[mask])
+                merged = part if samples[split] is None else pd.concat([samples[split], part])
+                samples[split] = merged.nsmallest(STREAMING_PLOT_SAMPLE_ROWS, "_priority")
+
+    train_gram = grams[FIT].merge(grams[VALIDATION])
+    test_gram = grams[TEST]
+    if test_gram.n < 2:
+        raise HTTPException(
+            status_code=400,
+            detail="Not enough test samples to evaluate regression. Please provide more data."
+        )
+
+    # =====================================================
+    # CLOSED-FORM SOLVES
+    # =====================================================
+    linear_train = train_gram.block(width)
+    linear_test = test_gram.block(width)
+    ridge_alpha = 1.0
+    if tuning == "path" and grams[VALIDATION].n >= 2:
+        ridge_alpha = _choose_alpha(grams[FIT].block(width), grams[VALIDATION].block(width))
+
+    specs = {
+        "LinearRegression": (linear_train, linear_test, 0.0),
+        "Ridge": (linear_train, linear_test, ridge_alpha),
+        "PolynomialRegression": (train_gram, test_gram, 0.0) if use_poly else None,
+    }
+
+    results = {}
+    estimators = {}
+    for name, spec in specs.items():
+        if spec is None:
+            results[name] = {
+                "error": f"Skipped: {poly_width} polynomial columns exceed {STREAMING_MAX_POLY_COLUMNS}"
+            }
+            on_progress(name, "failed")
+            continue
+
+        train_stats, test_stats, alpha = spec
+        start = time.perf_counter()
+        try:
+            coef, intercept = train_stats.solve(alpha)
+        except np.linalg.LinAlgError as e:
+            results[name] = {"error": str(e)}
+            on_progress(name, "failed")
+            continue
+        record_stage(f"fit.{name}", time.perf_counter() - start)
+
+        train_r2, _ = train_stats.metrics(coef, intercept)
+        test_r2, test_mse = test_stats.metrics(coef, intercept)
+        estimator = _export_estimator(name, coef, intercept + y_shift, alpha, poly if name == "PolynomialRegression" else None)
+        estimators[name] = estimator
+        results[name] = {
+            "train_r2": train_r2,
+            "test_r2": test_r2,
+            "test_mse": test_mse,
+            "hyperparameters": describe_hyperparameters(estimator)
+        }
+        on_progress(name, "completed")
+
+    for name in UNSUPPORTED_MODELS:
+        results[name] = {"error": "Not available with engine=streaming"}
+
+    best_model_name = max(estimators, key=lambda name: results[name]["test_r2"], default=None)
+    if best_model_name is None:
+        raise HTTPException(500, "All models failed")
+    best_model = assemble_pipeline(preprocessor, estimators[best_model_name])
+
+    splits = {}
+    for split, sample in samples.items():
+        if sample is None or sample.empty:
+            splits[split] = (np.array([]), np.array([]))
+            continue
+        splits[split] = (
+            sample[target_column].to_numpy(dtype=np.float64),
+            best_model.predict(sample[feature_columns])
+        )
+
+    return {
+        "best_model": best_model,
+        "best_model_name": best_model_name,
+        "results": results,
+        "splits": splits,
+        "feature_engineering": {
+            "numeric_features": numeric_features,
+            "categorical_features": categorical_features
+        },
+        "data_info": {
+            "rows": rows,
+            "train_rows": train_gram.n,
+            "test_rows": test_gram.n,
+            "null_strategy": strategy,
+            "tuning": tuning,
+            "engine": "streaming",
+            "plot_sample_rows": {split: len(values[0]) for split, values in splits.items()},
+            "dataset_id": dataset_id
+        }
+    }
+
+
+def _validate_columns(chunk, target_column, feature_columns):
+    if len(set(chunk.columns)) != len(chunk.columns):
+        raise HTTPException(400, "Duplicate columns detected after trimming spaces")
+    if target_column not in chunk.columns:
+        raise HTTPException(400, f"Target column '{target_column}' not found")
+    for col in feature_columns:
+        if col not in chunk.columns:
+            raise HTTPException(400, f"Feature column '{col}' not found")
+
+
+def _recount_categories(file, df, chunk_rows, columns, selected, fill_nulls, tuning,
+                        all_counts, train_counts, train_nulls, should_cancel):
+    for col in columns:
+        all_counts[col].clear()
+        train_counts[col].clear()
+        train_nulls[col] = 0
+
+    read_options = {"dtype": {col: str for col in columns}} if file is not None else {}
+    offset = 0
+    for raw in _chunk_source(file, df, chunk_rows, **read_options):
+        _check_cancel(should_cancel)
+        chunk = _strip(raw)[selected]
+        positions = offset + np.arange(len(chunk))
+        offset += len(chunk)
+        if not fill_nulls:
+            keep = chunk.notna().all(axis=1).to_numpy()
+            chunk, positions = chunk[keep], positions[keep]
+        train = split_codes(positions, tuning) != TEST
+        for col in columns:
+            values = chunk[col]
+            all_counts[col].update(values.dropna().tolist())
+            train_counts[col].update(values[train].dropna().tolist())
+            train_nulls[col] += int((train & values.isna().to_numpy()).sum())
+
+
+def _fit_preprocessor(numeric_features, categorical_features, categories,
+                      moments, nulls, numeric_fill, fill_nulls):
+    preprocessor = build_preprocessor(numeric_features, categorical_features)
+    if categorical_features:
+        preprocessor.set_params(cat__categories=[categories[col] for col in categorical_features])
+
+    # Fit on one placeholder row for structure, then install the streamed statistics
+    placeholder = pd.DataFrame(
+        {col: [0.0] for col in numeric_features}
+        | {col: [categories[col][0]] for col in categorical_features}
+    )
+    preprocessor.fit(placeholder)
+
+    if numeric_features:
+        means, variances, counts = [], [], []
+        for col in numeric_features:
+            stats = moments[col]
+            n, mean, m2 = stats.n, stats.mean, stats.m2
+            if fill_nulls and nulls[col]:
+                # Imputed rows sit exactly on the fill value
+                fill = numeric_fill[col]
+                total = n + nulls[col]
+                delta = fill - mean
+                mean += delta * nulls[col] / total
+                m2 += delta ** 2 * n * nulls[col] / total
+                n = total
+            means.append(mean)
+            variances.append(m2 / n if n else 0.0)
+            counts.append(n)
+
+        scaler = preprocessor.named_transformers_["num"]
+        scaler.mean_ = np.array(means)
+        scaler.var_ = np.array(variances)
+        scale = np.sqrt(scaler.var_)
+        scale[scale < 10 * np.finfo(np.float64).eps] = 1.0
+        scaler.scale_ = scale
+        scaler.n_samples_seen_ = int(max(counts))
+
+    return preprocessor
+
+
+def _choose_alpha(fit_stats, validation_stats):
+    best_alpha, best_sse = RIDGE_ALPHAS[0], np.inf
+    for alpha in RIDGE_ALPHAS:
+        coef, intercept = fit_stats.solve(alpha)
+        sse = validation_stats.sse(coef, intercept)
+        if sse < best_sse:
+            best_alpha, best_sse = alpha, sse
+    return float(best_alpha)
+
+
+def _export_estimator(name, coef, intercept, alpha, poly):
+    # Plain sklearn estimators with the solved coefficients installed
+    model = Ridge(alpha=alpha) if name == "Ridge" else LinearRegression()
+    model.coef_ = coef
+    model.intercept_ = float(intercept)
+    model.n_features_in_ = len(coef)
+
+    steps = [("model", model)]
+    if poly is not None:
+        steps.insert(0, ("poly", poly))
+    return Pipeline(steps)
@@ -0,0 +1,261 @@
+import math
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.pipeline import Pipeline
+
+from app.services.model_factory import describe_hyperparameters, select_target
+from app.core.config import (
+    MODEL_FIT_TIMEOUT_SECONDS,
+    TRAINING_EXECUTOR,
+    TRAINING_MAX_WORKERS_PER_REQUEST,
+    TRAINING_POOL_SIZE,
+)
+
+EXECUTION_MODES = {"serial", "thread", "process"}
+
+# Seconds between cancellation checks while waiting on pool futures
+CANCEL_POLL_SECONDS = 0.5
+# Seconds between checks for a queued fit having started, which starts its deadline
+START_POLL_SECONDS = 0.05
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+class TrainingCancelled(Exception):
+    pass
+
+
+def fit_candidate(steps, X_train, y_train, X_test, y_test):
+    # Module level so it can be pickled into process pool workers.
+    # A 2-D y (one column per target) is solved in one multi-output fit.
+    estimator = Pipeline(steps)
+    start = time.perf_counter()
+    estimator.fit(X_train, y_train)
+    fitted = time.perf_counter()
+
+    train_pred = estimator.predict(X_train)
+    test_pred = estimator.predict(X_test)
+    predicted = time.perf_counter()
+
+    timings = {
+        "fit": fitted - start,
+        "predict": predicted - fitted
+    }
+    if y_train.ndim == 2:
+        return {
+            "targets": [
+                _score(
+                    select_target(estimator, i),
+                    y_train.iloc[:, i], train_pred[:, i], y_test.iloc[:, i], test_pred[:, i]
+                )
+                for i in range(y_train.shape[1])
+            ],
+            "timings": timings
+        }
+    return {**_score(estimator, y_train, train_pred, y_test, test_pred), "timings": timings}
+
+
+def _score(estimator, y_train, train_pred, y_test, test_pred):
+    test_r2 = r2_score(y_test, test_pred)
+    if math.isnan(test_r2):
+        test_r2 = None
+
+    return {
+        "estimator": estimator,
+        "metrics": {
+            "train_r2": r2_score(y_train, train_pred),
+            "test_r2": test_r2,
+            "test_mse": mean_squared_error(y_test, test_pred),
+            "hyperparameters": describe_hyperparameters(estimator)
+        },
+        "train_pred": train_pred,
+        "test_pred": test_pred
+    }
+
+
+def _get_pool(mode):
+    with _POOLS_LOCK:
+        pool = _POOLS.get(mode)
+        if pool is None:
+            if mode == "process":
+                pool = ProcessPoolExecutor(max_workers=TRAINING_POOL_SIZE)
+            else:
+                pool = ThreadPoolExecutor(
+                    max_workers=TRAINING_POOL_SIZE,
+                    thread_name_prefix="train"
+                )
+            _POOLS[mode] = pool
+        return pool
+
+
+def _discard_pool(mode, pool):
+    with _POOLS_LOCK:
+        if _POOLS.get(mode) is pool:
+            del _POOLS[mode]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_one(steps, args):
+    try:
+        return fit_candidate(steps, *args)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def train_candidates(
+    estimators,
+    X_train,
+    y_train,
+    X_test,
+    y_test,
+    mode=None,
+    max_workers=None,
+    timeout=None,
+    on_progress=None,
+    should_cancel=None
+):
+    args = (X_train, y_train, X_test, y_test)
+    return train_tasks(
+        {name: (steps, args) for name, steps in estimators.items()},
+        mode=mode,
+        max_workers=max_workers,
+        timeout=timeout,
+        on_progress=on_progress,
+        should_cancel=should_cancel
+    )
+
+
+def train_tasks(
+    tasks,
+    mode=None,
+    max_workers=None,
+    timeout=None,
+    on_progress=None,
+    should_cancel=None
+):
+    # tasks: key -> (steps, (X_train, y_train, X_test, y_test)); each task brings its own data
+    mode = mode or TRAINING_EXECUTOR
+    if mode not in EXECUTION_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid execution_mode. Use one of: {', '.join(sorted(EXECUTION_MODES))}"
+        )
+
+    on_progress = on_progress or (lambda name, status: None)
+    should_cancel = should_cancel or (lambda: False)
+
+    for name in tasks:
+        on_progress(name, "pending")
+
+    if mode == "serial":
+        # Fits run on the calling thread and cannot be interrupted, so no timeout applies
+        outcomes = {}
+        for name, (steps, args) in tasks.items():
+            if should_cancel():
+                for skipped in tasks:
+                    if skipped not in outcomes:
+                        on_progress(skipped, "cancelled")
+                raise TrainingCancelled()
+            on_progress(name, "training")
+            outcomes[name] = _run_one(steps, args)
+            on_progress(name, "failed" if "error" in outcomes[name] else "completed")
+        return outcomes
+
+    workers = min(
+        max_workers or TRAINING_MAX_WORKERS_PER_REQUEST,
+        TRAINING_MAX_WORKERS_PER_REQUEST,
+        len(tasks)
+    )
+    workers = max(workers, 1)
+    timeout = timeout or MODEL_FIT_TIMEOUT_SECONDS
+
+    pool = _get_pool(mode)
+    pending = list(tasks.items())
+    # future -> [name, monotonic time the pool started it, or None while queued]
+    running = {}
+    # Timed-out fits cannot be stopped; they keep their slot until they return.
+    # future -> monotonic time it was abandoned
+    abandoned = {}
+    outcomes = {}
+
+    # Sliding window: never more than `workers` futures of this request in flight
+    while pending or running:
+        if should_cancel():
+            for future, (name, _) in running.items():
+                future.cancel()
+                on_progress(name, "cancelled")
+            for name, _ in pending:
+                on_progress(name, "cancelled")
+            raise TrainingCancelled()
+
+        while pending and len(running) + len(abandoned) < workers:
+            name, (steps, args) = pending.pop(0)
+            future = pool.submit(fit_candidate, steps, *args)
+            running[future] = [name, None]
+            on_progress(name, "training")
+
+        now = time.monotonic()
+        if pending and not running and all(now - since >= timeout for since in abandoned.values()):
+            # Every slot is still held, a further full timeout after its fit was abandoned
+            for name, _ in pending:
+                outcomes[name] = {"error": "No training slot freed up: earlier fits timed out and are still running"}
+                on_progress(name, "failed")
+            break
+
+        # Deadlines start when the pool picks the fit up, not while it waits in the queue
+        for future, entry in running.items():
+            if entry[1] is None and future.running():
+                entry[1] = now
+        deadlines = [started + timeout for _, started in running.values() if started is not None]
+        if pending and not running:
+            deadlines += [since + timeout for since in abandoned.values()]
+        queued = any(started is None for _, started in running.values())
+        poll = START_POLL_SECONDS if queued else CANCEL_POLL_SECONDS
+        done, _ = wait(
+            [*running, *abandoned],
+            timeout=min([max(d - now, 0) for d in deadlines] + [poll]),
+            return_when=FIRST_COMPLETED
+        )
+
+        broken = False
+        for future in done:
+            if future in abandoned:
+                del abandoned[future]
+                continue
+            name, _ = running.pop(future)
+            try:
+                outcomes[name] = future.result()
+            except BrokenProcessPool:
+                broken = True
+                outcomes[name] = {"error": "Training worker crashed"}
+            except Exception as e:
+                outcomes[name] = {"error": str(e)}
+            on_progress(name, "failed" if "error" in outcomes[name] else "completed")
+
+        if broken:
+            _discard_pool(mode, pool)
+            pool = _get_pool(mode)
+            abandoned.clear()
+
+        now = time.monotonic()
+        for future, (name, started) in list(running.items()):
+            if started is not None and started + timeout <= now:
+                del running[future]
+                if not future.cancel():
+                    abandoned[future] = now
+                outcomes[name] = {"error": f"Timed out after {timeout:g}s"}
+                on_progress(name, "failed")
+
+    # Keep the declaration order so best-model ties resolve like the serial loop
+    return {name: outcomes[name] for name in tasks}
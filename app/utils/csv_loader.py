@@ -1,16 +1,65 @@
+import hashlib
 import pandas as pd
 from fastapi import HTTPException
 
-def load_csv(file):
+from app.core.config import (
+    CSV_CATEGORY_MAX_RATIO,
+    CSV_DTYPES,
+    CSV_FLOAT32_TOLERANCE,
+    CSV_SCHEMA_SAMPLE_ROWS,
+)
+from app.utils.schema_inference import downcast_numeric, infer_read_dtypes
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+def validate_csv_upload(file):
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="File must be a CSV")
 
+def hash_upload(file):
+    digest = hashlib.sha256()
+    file.file.seek(0)
+    for chunk in iter(lambda: file.file.read(HASH_CHUNK_BYTES), b""):
+        digest.update(chunk)
+    file.file.seek(0)
+    return digest.hexdigest()
+
+def upload_size(file):
+    position = file.file.tell()
+    file.file.seek(0, 2)
+    size = file.file.tell()
+    file.file.seek(position)
+    return size
+
+def iter_csv_chunks(file, chunk_rows, **read_options):
+    validate_csv_upload(file)
+    file.file.seek(0)
+
     try:
-        df = pd.read_csv(file.file)
+        for chunk in pd.read_csv(file.file, chunksize=chunk_rows, **read_options):
+            yield chunk
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid CSV format")
+
+def load_csv(file):
+    validate_csv_upload(file)
+
+    try:
+        dtypes = None
+        if CSV_DTYPES == "optimized":
+            # Low-cardinality strings are parsed straight into category codes
+            file.file.seek(0)
+            sample = pd.read_csv(file.file, nrows=CSV_SCHEMA_SAMPLE_ROWS)
+            dtypes = infer_read_dtypes(sample, CSV_CATEGORY_MAX_RATIO)
+            file.file.seek(0)
+        df = pd.read_csv(file.file, dtype=dtypes)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid CSV format")
 
     if df.empty:
         raise HTTPException(status_code=400, detail="CSV file is empty")
 
+    if CSV_DTYPES == "optimized":
+        df = downcast_numeric(df, CSV_FLOAT32_TOLERANCE)
+
     return df
@@ -1,20 +1,22 @@
-from urllib import response
 import pandas as pd
 from fastapi import HTTPException
+from app.core.config import (
+    CSV_CATEGORY_MAX_RATIO,
+    CSV_CHUNK_ROWS,
+    CSV_DTYPES,
+    CSV_FLOAT32_TOLERANCE,
+    CSV_SCHEMA_SAMPLE_ROWS,
+)
+from app.utils.csv_loader import iter_csv_chunks, load_csv
+from app.utils.schema_inference import StreamingMemoryReport, memory_report
 from app.utils.json_sanitizer import sanitize
+from app.utils.timing import stage
 
 def analyze_csv(file, preview_rows: int = 5):
-    if not file.filename.endswith(".csv"):
-        raise HTTPException(status_code=400, detail="File must be a CSV")
-
-    try:
-        df = pd.read_csv(file.file)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid CSV format")
-
-    if df.empty:
-        raise HTTPException(status_code=400, detail="CSV file is empty")
+    df = load_csv(file)
+    return summarize_dataframe(df, file.filename, preview_rows)
 
+def summarize_dataframe(df: pd.DataFrame, filename: str, preview_rows: int = 5):
     columns = list(df.columns)
 
     numeric_columns = [
@@ -22,15 +24,13 @@ def analyze_csv(file, preview_rows: int = 5):
         if pd.api.types.is_numeric_dtype(df[col])
     ]
 
-    null_info = {
-        col: int(df[col].isnull().sum())
-        for col in df.columns
-    }
+    null_info = df.isnull().sum()
 
-    preview_data = df.head(preview_rows).to_dict(orient="records")
+    # Frames and Series are converted in bulk by sanitize
+    preview_data = df.head(preview_rows)
 
     response = {
-        "filename": file.filename,
+        "filename": filename,
         "total_rows": len(df),
         "total_columns": len(columns),
         "columns": columns,
@@ -38,5 +38,60 @@ def analyze_csv(file, preview_rows: int = 5):
         "null_summary": null_info,
         "preview": preview_data
     }
+    with stage("memory_report"):
+        response["memory"] = memory_report(df)
+
+    with stage("sanitize"):
+        return sanitize(response)
+
+def analyze_csv_streaming(file, preview_rows: int = 5, chunk_rows: int = CSV_CHUNK_ROWS):
+    # Same response as summarize_dataframe, holding one chunk in memory at a time
+    columns = None
+    total_rows = 0
+    null_info = {}
+    is_numeric = {}
+    preview = None
+    memory = StreamingMemoryReport(
+        CSV_DTYPES == "optimized",
+        CSV_SCHEMA_SAMPLE_ROWS,
+        CSV_CATEGORY_MAX_RATIO,
+        CSV_FLOAT32_TOLERANCE
+    )
+
+    with stage("stream_summary"):
+        for chunk in iter_csv_chunks(file, chunk_rows):
+            if columns is None:
+                columns = list(chunk.columns)
+                null_info = dict.fromkeys(columns, 0)
+                is_numeric = dict.fromkeys(columns, True)
+                preview = chunk.head(preview_rows)
+
+            total_rows += len(chunk)
+            memory.update(chunk)
+
+            for col, count in chunk.isnull().sum().items():
+                null_info[col] += int(count)
+
+            # A single non-numeric chunk makes the whole column non-numeric,
+            # matching what a full read_csv would infer
+            for col in columns:
+                if is_numeric[col] and not pd.api.types.is_numeric_dtype(chunk[col]):
+                    is_numeric[col] = False
+
+    if not total_rows:
+        raise HTTPException(status_code=400, detail="CSV file is empty")
+
+    response = {
+        "filename": file.filename,
+        "total_rows": total_rows,
+        "total_columns": len(columns),
+        "columns": columns,
+        "numeric_columns": [col for col in columns if is_numeric[col]],
+        "null_summary": null_info,
+        "preview": preview,
+        # Estimated from the chunks, since the whole frame is never built
+        "memory": memory.report()
+    }
 
-    return sanitize(response)
\ No newline at end of file
+    with stage("sanitize"):
+        return sanitize(response)
@@ -1,8 +1,10 @@
 import pandas as pd
 from fastapi import HTTPException
 
-def clean_dataframe(df: pd.DataFrame, features: list, target: str, strategy: str):
-    selected_cols = features + [target]
+def clean_dataframe(df: pd.DataFrame, features: list, target, strategy: str):
+    # target: one column name, or a list of them for multi-target regression
+    targets = [target] if isinstance(target, str) else list(target)
+    selected_cols = features + targets
     df = df[selected_cols]
 
     if strategy == "drop":
@@ -17,6 +19,8 @@ def clean_dataframe(df: pd.DataFrame, features: list, target: str, strategy: str
                 if df[col].isnull().any():
                     mode = df[col].mode(dropna=True)
                     fill_value = mode.iloc[0] if not mode.empty else "Unknown"
+                    if isinstance(df[col].dtype, pd.CategoricalDtype) and fill_value not in df[col].cat.categories:
+                        df[col] = df[col].cat.add_categories([fill_value])
                     df[col] = df[col].fillna(fill_value)
     else:
         raise HTTPException(
@@ -1,38 +1,54 @@
+from collections import deque
+
 import pandas as pd
+from fastapi import HTTPException
+from app.core.config import CSV_CHUNK_ROWS, EDA_CHUNK_ROWS, EDA_WORKERS
+from app.utils.csv_loader import iter_csv_chunks
+from app.utils.frame_stats import FrameStats, compute_frame_stats
 from app.utils.json_sanitizer import sanitize
+from app.utils.timing import stage
 
 def analyze_eda(df: pd.DataFrame):
-    numeric_cols = df.select_dtypes(include="number").columns.tolist()
-    categorical_cols = df.select_dtypes(exclude="number").columns.tolist()
+    # One pass over row chunks, partial states merged across threads
+    with stage("stats"):
+        stats = compute_frame_stats(df, EDA_CHUNK_ROWS, EDA_WORKERS)
 
     # Head & Tail
-    head = df.head(5).to_dict(orient="records")
-    tail = df.tail(5).to_dict(orient="records")
-
-    # Numeric summary
-    numeric_summary = {}
-    for col in numeric_cols:
-        numeric_summary[col] = {
-            "mean": df[col].mean(),
-            "std": df[col].std(),
-            "min": df[col].min(),
-            "max": df[col].max(),
-            "null_count": int(df[col].isnull().sum())
-        }
-
-    # Categorical summary
-    categorical_summary = {}
-    for col in categorical_cols:
-        categorical_summary[col] = {
-            "unique_count": int(df[col].nunique()),
-            "null_count": int(df[col].isnull().sum())
-        }
+    head = df.head(5)
+    tail = df.tail(5)
+
+    return build_eda_response(stats, head, tail)
+
+def analyze_eda_streaming(file, chunk_rows: int = CSV_CHUNK_ROWS):
+    stats = None
+    head = None
+    tail = deque(maxlen=5)
+
+    with stage("stream_stats"):
+        for chunk in iter_csv_chunks(file, chunk_rows):
+            if stats is None:
+                stats = FrameStats.from_chunk(chunk)
+                head = chunk.head(5).to_dict(orient="records")
+            else:
+                stats.update(chunk)
+            tail.extend(chunk.tail(5).to_dict(orient="records"))
+
+    if stats is None or not stats.rows:
+        raise HTTPException(status_code=400, detail="CSV file is empty")
+
+    return build_eda_response(stats, head, list(tail))
+
+def build_eda_response(stats: FrameStats, head, tail):
+    numeric_cols = stats.summary_numeric()
+    categorical_cols = stats.summary_categorical()
 
     # Correlation matrix
     correlation_matrix = {}
     if len(numeric_cols) >= 2:
-        corr = df[numeric_cols].corr()
-        correlation_matrix = corr.to_dict()
+        with stage("correlation"):
+            corr = stats.correlation()
+        # Column-wise Series keep the to_dict() layout without a per-cell walk
+        correlation_matrix = {col: corr[col] for col in corr.columns}
 
     response = {
         "head": head,
@@ -41,9 +57,10 @@ def analyze_eda(df: pd.DataFrame):
             "numeric": numeric_cols,
             "categorical": categorical_cols
         },
-        "summary_statistics": numeric_summary,
-        "categorical_summary": categorical_summary,
+        "summary_statistics": stats.numeric_summary(),
+        "categorical_summary": stats.categorical_summary(),
         "correlation_matrix": correlation_matrix
     }
 
-    return sanitize(response)
+    with stage("sanitize"):
+        return sanitize(response)
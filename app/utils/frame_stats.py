@@ -0,0 +1,269 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from app.utils.sketches import DistinctCounter
+
+
+def is_summary_numeric(series):
+    # Mirrors select_dtypes(include="number"), which leaves booleans out
+    return (
+        pd.api.types.is_numeric_dtype(series)
+        and not pd.api.types.is_bool_dtype(series)
+    )
+
+
+class FrameStats:
+    """Single-pass, mergeable column statistics for EDA.
+
+    Tracks row and null counts, distinct counts, Welford/Chan moments,
+    min/max and the pairwise-complete sums behind the Pearson correlation
+    matrix. The sums are kept around a per-accumulator shift to avoid
+    cancellation, and re-shifted when two partial states merge.
+    """
+
+    def __init__(self, columns, numeric_columns):
+        self.columns = list(columns)
+        self.numeric_columns = list(numeric_columns)
+        # Columns that turned non-numeric in a later chunk drop out at the end
+        self.is_numeric = {col: col in set(numeric_columns) for col in self.columns}
+        self.is_integer = {col: True for col in self.numeric_columns}
+
+        p = len(self.numeric_columns)
+        self.rows = 0
+        self.null_count = dict.fromkeys(self.columns, 0)
+        # Only categorical columns report distinct counts
+        self.distinct = {
+            col: DistinctCounter() for col in self.columns if not self.is_numeric[col]
+        }
+
+        self.n = np.zeros(p)
+        self.mean = np.zeros(p)
+        self.m2 = np.zeros(p)
+        self.min = [None] * p
+        self.max = [None] * p
+
+        self.shift = None
+        self.pair_n = np.zeros((p, p))
+        self.pair_sum = np.zeros((p, p))
+        self.pair_sumsq = np.zeros((p, p))
+        self.cross = np.zeros((p, p))
+
+    @classmethod
+    def from_chunk(cls, chunk, numeric_columns=None):
+        if numeric_columns is None:
+            numeric_columns = [col for col in chunk.columns if is_summary_numeric(chunk[col])]
+        stats = cls(chunk.columns, numeric_columns)
+        stats.update(chunk)
+        return stats
+
+    # =====================================================
+    # ACCUMULATE
+    # =====================================================
+    def update(self, chunk):
+        self.rows += len(chunk)
+
+        for col, count in chunk.isnull().sum().items():
+            self.null_count[col] += int(count)
+
+        for col in self.numeric_columns:
+            if self.is_numeric[col] and not is_summary_numeric(chunk[col]):
+                # Values seen while the column still parsed as numeric are not
+                # counted, so its unique_count is a lower bound
+                self.is_numeric[col] = False
+                self.distinct[col] = DistinctCounter()
+
+        for col, counter in self.distinct.items():
+            counter.add(chunk[col])
+
+        if not self.numeric_columns:
+            return
+
+        values = np.column_stack([
+            pd.to_numeric(chunk[col], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+            if self.is_numeric[col] else np.full(len(chunk), np.nan)
+            for col in self.numeric_columns
+        ])
+        valid = ~np.isnan(values)
+
+        self._update_moments(chunk, values, valid)
+        self._update_cross_products(values, valid)
+
+    def _update_moments(self, chunk, values, valid):
+        n_b = valid.sum(axis=0).astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sums = np.where(valid, values, 0.0).sum(axis=0)
+            mean_b = np.where(n_b > 0, sums / np.maximum(n_b, 1), 0.0)
+        m2_b = (np.where(valid, values - mean_b, 0.0) ** 2).sum(axis=0)
+
+        self._combine_moments(n_b, mean_b, m2_b)
+
+        for i, col in enumerate(self.numeric_columns):
+            if not n_b[i]:
+                continue
+            series = chunk[col]
+            if not pd.api.types.is_integer_dtype(series):
+                self.is_integer[col] = False
+            low, high = series.min(), series.max()
+            self.min[i] = low if self.min[i] is None else min(self.min[i], low)
+            self.max[i] = high if self.max[i] is None else max(self.max[i], high)
+
+    def _combine_moments(self, n_b, mean_b, m2_b):
+        n = self.n + n_b
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = mean_b - self.mean
+            ratio = np.where(n > 0, n_b / np.maximum(n, 1), 0.0)
+            self.mean = self.mean + delta * ratio
+            self.m2 = self.m2 + m2_b + delta ** 2 * self.n * ratio
+        self.n = n
+
+    def _update_cross_products(self, values, valid):
+        if self.shift is None:
+            with np.errstate(invalid="ignore"):
+                counts = valid.sum(axis=0)
+                sums = np.where(valid, values, 0.0).sum(axis=0)
+                self.shift = np.where(counts > 0, sums / np.maximum(counts, 1), 0.0)
+
+        mask = valid.astype(np.float64)
+        centered = np.where(valid, values - self.shift, 0.0)
+
+        self.pair_n += mask.T @ mask
+        # pair_sum[i, j]: sum of column i over rows where i and j are both present
+        self.pair_sum += centered.T @ mask
+        self.pair_sumsq += (centered ** 2).T @ mask
+        self.cross += centered.T @ centered
+
+    # =====================================================
+    # MERGE
+    # =====================================================
+    def _reshift(self, shift):
+        if self.shift is None:
+            self.shift = shift
+            return
+        d = self.shift - shift
+        self.cross = (
+            self.cross
+            + self.pair_sum * d[None, :]
+            + self.pair_sum.T * d[:, None]
+            + self.pair_n * np.outer(d, d)
+        )
+        self.pair_sumsq = self.pair_sumsq + 2 * d[:, None] * self.pair_sum + d[:, None] ** 2 * self.pair_n
+        self.pair_sum = self.pair_sum + d[:, None] * self.pair_n
+        self.shift = shift
+
+    def merge(self, other):
+        if other.columns != self.columns or other.numeric_columns != self.numeric_columns:
+            raise ValueError("Cannot merge statistics of frames with different columns")
+
+        self.rows += other.rows
+        for col in self.columns:
+            self.null_count[col] += other.null_count[col]
+
+        for col, counter in other.distinct.items():
+            if col in self.distinct:
+                self.distinct[col].merge(counter)
+            else:
+                self.distinct[col] = counter
+
+        for i, col in enumerate(self.numeric_columns):
+            self.is_numeric[col] = self.is_numeric[col] and other.is_numeric[col]
+            self.is_integer[col] = self.is_integer[col] and other.is_integer[col]
+            if other.min[i] is not None:
+                self.min[i] = other.min[i] if self.min[i] is None else min(self.min[i], other.min[i])
+                self.max[i] = other.max[i] if self.max[i] is None else max(self.max[i], other.max[i])
+
+        self._combine_moments(other.n, other.mean, other.m2)
+
+        if other.shift is not None:
+            if self.shift is None:
+                self.shift = other.shift
+            else:
+                other._reshift(self.shift)
+            self.pair_n += other.pair_n
+            self.pair_sum += other.pair_sum
+            self.pair_sumsq += other.pair_sumsq
+            self.cross += other.cross
+
+        return self
+
+    # =====================================================
+    # RESULTS
+    # =====================================================
+    def summary_numeric(self):
+        return [col for col in self.numeric_columns if self.is_numeric[col]]
+
+    def summary_categorical(self):
+        numeric = set(self.summary_numeric())
+        return [col for col in self.columns if col not in numeric]
+
+    def numeric_summary(self):
+        summary = {}
+        for i, col in enumerate(self.numeric_columns):
+            if not self.is_numeric[col]:
+                continue
+            n = self.n[i]
+            low, high = self.min[i], self.max[i]
+            if low is not None and not self.is_integer[col]:
+                low, high = float(low), float(high)
+            summary[col] = {
+                "mean": self.mean[i] if n else np.nan,
+                "std": np.sqrt(self.m2[i] / (n - 1)) if n > 1 else np.nan,
+                "min": np.nan if low is None else low,
+                "max": np.nan if high is None else high,
+                "null_count": self.null_count[col]
+            }
+        return summary
+
+    def categorical_summary(self):
+        return {
+            col: {
+                "unique_count": self.distinct[col].count() if col in self.distinct else 0,
+                "null_count": self.null_count[col]
+            }
+            for col in self.summary_categorical()
+        }
+
+    def correlation(self):
+        keep = [i for i, col in enumerate(self.numeric_columns) if self.is_numeric[col]]
+        columns = [self.numeric_columns[i] for i in keep]
+        idx = np.ix_(keep, keep)
+
+        n = self.pair_n[idx]
+        s = self.pair_sum[idx]
+        ss = self.pair_sumsq[idx]
+        cross = self.cross[idx]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var_i = n * ss - s ** 2
+            var_j = var_i.T
+            cov = n * cross - s * s.T
+            # Rounding noise on a constant column must not become a correlation
+            degenerate = (var_i <= 1e-12 * n * ss) | (var_j <= 1e-12 * n * ss.T)
+            corr = cov / np.sqrt(var_i * var_j)
+
+        corr[degenerate | (n < 2)] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+        diagonal = np.diag_indices_from(corr)
+        corr[diagonal] = np.where(np.isnan(corr[diagonal]), np.nan, 1.0)
+
+        return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+def compute_frame_stats(df, chunk_rows, workers=1):
+    numeric_columns = [col for col in df.columns if is_summary_numeric(df[col])]
+    bounds = range(0, max(len(df), 1), chunk_rows)
+    chunks = [df.iloc[start:start + chunk_rows] for start in bounds]
+
+    if workers > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(
+                lambda chunk: FrameStats.from_chunk(chunk, numeric_columns), chunks
+            ))
+    else:
+        partials = [FrameStats.from_chunk(chunk, numeric_columns) for chunk in chunks]
+
+    stats = partials[0]
+    for partial in partials[1:]:
+        stats.merge(partial)
+    return stats
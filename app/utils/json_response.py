@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+from app.utils.json_sanitizer import sanitize
+from app.utils.timing import stage
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson else 0
+)
+
+
+def _default(obj):
+    # Anything orjson cannot encode natively (non-contiguous arrays, pandas objects)
+    if isinstance(obj, np.generic):
+        # A scalar sanitize() cannot convert would come back unchanged and loop in json.dumps
+        return sanitize(obj.item())
+    if isinstance(obj, (np.ndarray, pd.Series, pd.DataFrame)):
+        return sanitize(obj)
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    return str(obj)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response that serializes NumPy/pandas payloads natively.
+
+    Returning it from an endpoint skips FastAPI's jsonable_encoder walk.
+    NaN and inf become null, matching sanitize(). Uses orjson when it is
+    installed and falls back to the standard library otherwise.
+    """
+
+    def render(self, content):
+        with stage("serialize"):
+            return self._dumps(content)
+
+    def _dumps(self, content):
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+        return json.dumps(
+            sanitize(content),
+            default=_default,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
@@ -1,5 +1,26 @@
 import math
 import numpy as np
+import pandas as pd
+
+def _nullify(values):
+    # Bulk NaN/inf -> None on a whole column, returned as Python objects
+    values = np.asarray(values)
+
+    if values.dtype.kind == "f":
+        missing = ~np.isfinite(values)
+    elif values.dtype.kind in "iub":
+        return values.astype(object)
+    else:
+        values = values.astype(object)
+        missing = pd.isna(values)
+        # inf hidden inside object columns
+        floats = np.fromiter((isinstance(v, float) for v in values), bool, len(values))
+        if floats.any():
+            missing |= floats & ~np.isfinite(np.where(floats, values, 0.0).astype(float))
+
+    out = values.astype(object)
+    out[missing] = None
+    return out
 
 def sanitize(obj):
     # numpy scalar → python native
@@ -11,11 +32,32 @@ def sanitize(obj):
             return None
         return float(obj)
 
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+
+    # any other numpy scalar (datetime64, str_, ...)
+    if isinstance(obj, np.generic):
+        return sanitize(obj.item())
+
     if isinstance(obj, float):
         if math.isnan(obj) or math.isinf(obj):
             return None
         return obj
 
+    # arrays and frames are converted column-wise instead of element by element
+    if isinstance(obj, np.ndarray):
+        if obj.ndim != 1:
+            return [sanitize(row) for row in obj]
+        return _nullify(obj).tolist()
+
+    if isinstance(obj, pd.Series):
+        return dict(zip(obj.index.tolist(), _nullify(obj.to_numpy())))
+
+    if isinstance(obj, pd.DataFrame):
+        columns = [_nullify(obj[col].to_numpy()) for col in obj.columns]
+        keys = obj.columns.tolist()
+        return [dict(zip(keys, row)) for row in zip(*columns)]
+
     if isinstance(obj, dict):
         return {k: sanitize(v) for k, v in obj.items()}
 
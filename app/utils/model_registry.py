@@ -0,0 +1,186 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from app.core.config import (
+    MODEL_REGISTRY_DB,
+    MODEL_RETENTION_DAYS,
+    MODEL_RETENTION_INCLUDE_LEGACY,
+    MODEL_RETENTION_MAX_COUNT,
+)
+
+ARTIFACT_EXTENSIONS = (".joblib", ".pkl")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    filename TEXT PRIMARY KEY,
+    model_name TEXT NOT NULL,
+    dataset_id TEXT,
+    target TEXT,
+    features TEXT NOT NULL DEFAULT '[]',
+    metrics TEXT NOT NULL DEFAULT '{}',
+    artifact_size INTEGER NOT NULL,
+    compression INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    legacy INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_models_dataset ON models (dataset_id);
+CREATE INDEX IF NOT EXISTS idx_models_target ON models (target);
+CREATE INDEX IF NOT EXISTS idx_models_name ON models (model_name);
+CREATE INDEX IF NOT EXISTS idx_models_created ON models (created_at);
+"""
+
+
+class ModelRegistry:
+    """SQLite index of saved model artifacts and their training metadata."""
+
+    def __init__(self, db_path, model_dir):
+        self.db_path = db_path
+        self.model_dir = model_dir
+        self._ready = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _connect(self):
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    self._initialize()
+                    self._ready = True
+
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _initialize(self):
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                self._create_schema(conn)
+        finally:
+            conn.close()
+
+    def _create_schema(self, conn):
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(models)")}
+        if "legacy" not in columns:
+            conn.execute("ALTER TABLE models ADD COLUMN legacy INTEGER NOT NULL DEFAULT 0")
+            # Registries created before the column indexed legacy files without metrics
+            conn.execute("UPDATE models SET legacy = 1 WHERE metrics = '{}'")
+
+        # Artifacts saved before the registry existed are indexed by file name only
+        if os.path.isdir(self.model_dir):
+            known = {row[0] for row in conn.execute("SELECT filename FROM models")}
+            for filename in os.listdir(self.model_dir):
+                if filename in known or not filename.endswith(ARTIFACT_EXTENSIONS):
+                    continue
+                path = os.path.join(self.model_dir, filename)
+                conn.execute(
+                    "INSERT INTO models (filename, model_name, artifact_size, compression, created_at, legacy) "
+                    "VALUES (?, ?, ?, ?, ?, 1)",
+                    (filename, filename.split("_")[0], os.path.getsize(path), 0, os.path.getmtime(path))
+                )
+
+    def register(self, filename, model_name, artifact_size, compression,
+                 dataset_id=None, target=None, features=None, metrics=None):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO models "
+                "(filename, model_name, dataset_id, target, features, metrics, "
+                "artifact_size, compression, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    filename,
+                    model_name,
+                    dataset_id,
+                    target,
+                    json.dumps(features or []),
+                    json.dumps(metrics or {}),
+                    artifact_size,
+                    compression,
+                    time.time(),
+                )
+            )
+
+    def get(self, filename):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM models WHERE filename = ?", (filename,)).fetchone()
+        return _row_to_dict(row) if row else None
+
+    def search(self, model_name=None, dataset_id=None, target=None, feature=None,
+               min_test_r2=None, limit=50, offset=0):
+        clauses, params = [], []
+        if model_name:
+            clauses.append("model_name = ?")
+            params.append(model_name)
+        if dataset_id:
+            clauses.append("dataset_id = ?")
+            params.append(dataset_id)
+        if target:
+            clauses.append("target = ?")
+            params.append(target)
+        if feature:
+            clauses.append("EXISTS (SELECT 1 FROM json_each(models.features) WHERE value = ?)")
+            params.append(feature)
+        if min_test_r2 is not None:
+            clauses.append("json_extract(metrics, '$.test_r2') >= ?")
+            params.append(min_test_r2)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM models {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT * FROM models {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+
+        return {"total": total, "models": [_row_to_dict(row) for row in rows]}
+
+    def prune(self, max_count=MODEL_RETENTION_MAX_COUNT, max_age_days=MODEL_RETENTION_DAYS,
+              include_legacy=MODEL_RETENTION_INCLUDE_LEGACY):
+        # Pre-registry artifacts only have a file mtime, so they are kept unless opted in
+        with self._connect() as conn:
+            stale = set()
+            if max_age_days:
+                cutoff = time.time() - max_age_days * 86400
+                stale.update(
+                    row[0] for row in conn.execute(
+                        "SELECT filename FROM models WHERE (legacy = 0 OR ?) AND created_at < ?",
+                        (include_legacy, cutoff)
+                    )
+                )
+            if max_count:
+                stale.update(
+                    row[0] for row in conn.execute(
+                        "SELECT filename FROM models WHERE legacy = 0 OR ? "
+                        "ORDER BY created_at DESC LIMIT -1 OFFSET ?",
+                        (include_legacy, max_count)
+                    )
+                )
+
+            for filename in stale:
+                try:
+                    os.remove(os.path.join(self.model_dir, filename))
+                except OSError:
+                    pass
+                conn.execute("DELETE FROM models WHERE filename = ?", (filename,))
+
+        return sorted(stale)
+
+
+def _row_to_dict(row):
+    entry = dict(row)
+    entry["features"] = json.loads(entry["features"])
+    entry["metrics"] = json.loads(entry["metrics"])
+    entry["legacy"] = bool(entry["legacy"])
+    return entry
+
@@ -1,18 +1,37 @@
 import pickle
 import os
+import uuid
 from datetime import datetime
+import joblib
+from fastapi import HTTPException
+from app.core.config import MODEL_ARTIFACT_COMPRESSION, MODEL_REGISTRY_DB
+from app.utils.model_registry import ARTIFACT_EXTENSIONS, ModelRegistry
 
 MODEL_DIR = "models/saved"
 
-def save_model(model, model_name):
+MODEL_REGISTRY = ModelRegistry(MODEL_REGISTRY_DB, MODEL_DIR)
+
+def save_model(model, model_name, dataset_id=None, target=None, features=None, metrics=None):
     os.makedirs(MODEL_DIR, exist_ok=True)
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{model_name}_{timestamp}.pkl"
+    # Short suffix keeps concurrent runs in the same second from colliding
+    filename = f"{model_name}_{timestamp}_{uuid.uuid4().hex[:6]}.joblib"
     path = os.path.join(MODEL_DIR, filename)
 
-    with open(path, "wb") as f:
-        pickle.dump(model, f)
+    joblib.dump(model, path, compress=MODEL_ARTIFACT_COMPRESSION)
+
+    MODEL_REGISTRY.register(
+        filename,
+        model_name,
+        artifact_size=os.path.getsize(path),
+        compression=MODEL_ARTIFACT_COMPRESSION,
+        dataset_id=dataset_id,
+        target=target,
+        features=features,
+        metrics=metrics
+    )
+    MODEL_REGISTRY.prune()
 
     return {
         "model_name": model_name,
@@ -21,5 +40,22 @@ def save_model(model, model_name):
     }
 
 def load_model(file_path):
-    with open(file_path, "rb") as f:
-        return pickle.load(f)
+    if file_path.endswith(".pkl"):
+        with open(file_path, "rb") as f:
+            return pickle.load(f)
+
+    # Uncompressed artifacts map their arrays instead of reading them into memory
+    entry = MODEL_REGISTRY.get(os.path.basename(file_path))
+    mmap_mode = "r" if entry is not None and not entry["compression"] else None
+    return joblib.load(file_path, mmap_mode=mmap_mode)
+
+def resolve_model_path(filename):
+    # Only bare file names of registered artifacts inside MODEL_DIR are accepted
+    if not filename or os.path.basename(filename) != filename or not filename.endswith(ARTIFACT_EXTENSIONS):
+        raise HTTPException(status_code=400, detail="Invalid model filename")
+
+    path = os.path.join(MODEL_DIR, filename)
+    if MODEL_REGISTRY.get(filename) is None or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Model not found")
+
+    return path
@@ -0,0 +1,122 @@
+import numpy as np
+
+
+def lttb_indices(x, y, n_out):
+    # Largest-Triangle-Three-Buckets over points already sorted by x
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    # Average point of each bucket, used as the third triangle vertex
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    sizes = np.diff(edges)
+    avg_x = np.append(sums_x / sizes, x[-1])
+    avg_y = np.append(sums_y / sizes, y[-1])
+
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        bx, by = x[start:stop], y[start:stop]
+        area = np.abs(
+            (x[previous] - avg_x[bucket + 1]) * (by - y[previous])
+            - (x[previous] - bx) * (avg_y[bucket + 1] - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def minmax_indices(x, y, n_bins):
+    # Keep the lowest and highest y of every x bin so outliers survive
+    n = len(x)
+    if 2 * n_bins >= n:
+        return np.arange(n)
+
+    bins = np.minimum(((x - x[0]) / ((x[-1] - x[0]) or 1) * n_bins).astype(np.intp), n_bins - 1)
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    stops = np.r_[starts[1:], n]
+
+    order = np.lexsort((y, bins))
+    lows = order[starts]
+    highs = order[stops - 1]
+    return np.unique(np.concatenate((lows, highs)))
+
+
+def _sorted_points(actual, pred):
+    order = np.argsort(actual, kind="stable")
+    return actual[order], pred[order]
+
+
+def downsample(actual, pred, n_points, method="lttb"):
+    x, y = _sorted_points(actual, pred)
+    if method == "minmax":
+        keep = minmax_indices(x, y, max(n_points // 2, 1))
+    else:
+        keep = lttb_indices(x, y, n_points)
+    return {"y_actual": x[keep], "y_pred": y[keep]}
+
+
+def density_grid(actual, pred, bins):
+    # Every prediction may have been non-finite, or a streaming split may be empty
+    if not len(actual):
+        return {"edges": np.empty(0), "counts": np.empty((0, 0), dtype=np.int64)}
+
+    low = min(actual.min(), pred.min())
+    high = max(actual.max(), pred.max())
+    if high == low:
+        high = low + 1.0
+
+    # Shared axis range keeps the y = x reference line on the diagonal
+    counts, edges, _ = np.histogram2d(actual, pred, bins=bins, range=[[low, high], [low, high]])
+    return {
+        "edges": edges,
+        "counts": counts.astype(np.int64)
+    }
+
+
+def residual_histogram(actual, pred, bins):
+    if not len(actual):
+        return {"bin_edges": np.empty(0), "counts": np.empty(0, dtype=np.int64), "mean": None, "std": None}
+
+    residuals = actual - pred
+    counts, edges = np.histogram(residuals, bins=bins)
+    return {
+        "bin_edges": edges,
+        "counts": counts,
+        "mean": residuals.mean(),
+        "std": residuals.std(ddof=1) if len(residuals) > 1 else 0.0
+    }
+
+
+def _as_lists(value):
+    if isinstance(value, dict):
+        return {key: _as_lists(item) for key, item in value.items()}
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def build_plot_views(splits, max_points, density_bins, histogram_bins):
+    # Precomputed once per run so the plot endpoint only picks a view
+    views = {"lttb": {}, "minmax": {}, "density": {}, "residuals": {}}
+
+    for split, (actual, pred) in splits.items():
+        actual = np.asarray(actual, dtype=np.float64)
+        pred = np.asarray(pred, dtype=np.float64)
+        finite = np.isfinite(actual) & np.isfinite(pred)
+        actual, pred = actual[finite], pred[finite]
+        views["lttb"][split] = downsample(actual, pred, max_points, "lttb")
+        views["minmax"][split] = downsample(actual, pred, max_points, "minmax")
+        views["density"][split] = density_grid(actual, pred, density_bins)
+        views["residuals"][split] = residual_histogram(actual, pred, histogram_bins)
+
+    return _as_lists(views)
@@ -1,102 +1,288 @@
+import math
+from statistics import NormalDist
+
 import pandas as pd
 import numpy as np
+from fastapi import HTTPException
+
+from app.core.config import (
+    RECOMMENDATION_CONFIDENCE,
+    RECOMMENDATION_MODE,
+    RECOMMENDATION_SAMPLE_ROWS,
+)
 from app.utils.json_sanitizer import sanitize
+from app.utils.sketches import HyperLogLog, hash_values
+from app.utils.timing import stage
+
+# exact: full-data counts and correlation matrix | fast: sketches and row samples
+RECOMMENDATION_MODES = {"exact", "fast"}
+
+ID_UNIQUE_RATIO = 0.95
+TARGET_CORRELATION = 0.3
+
+
+def recommend_regression_columns(df: pd.DataFrame, mode=None):
+    mode = mode or RECOMMENDATION_MODE
+    if mode not in RECOMMENDATION_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid mode. Use one of: {', '.join(sorted(RECOMMENDATION_MODES))}"
+        )
 
-def recommend_regression_columns(df: pd.DataFrame):
     numeric_cols = df.select_dtypes(include="number").columns.tolist()
     categorical_cols = df.select_dtypes(exclude="number").columns.tolist()
 
-    recommendations = {
-        "target_candidates": [],
-        "feature_candidates": [],
-        "drop_recommendations": []
+    if mode == "fast":
+        recommendations = _fast_candidates(df, numeric_cols, categorical_cols)
+    else:
+        recommendations = _exact_candidates(df, numeric_cols, categorical_cols)
+
+ # ===== DEFAULT AUTO-FILL =====
+    default_target = None
+    default_features = []
+
+    if recommendations["target_candidates"]:
+        default_target = recommendations["target_candidates"][0]["column"]
+
+        for feat in recommendations["feature_candidates"]:
+            if feat["column"] != default_target:
+                default_features.append(feat["column"])
+
+        # batasi jumlah feature default
+        default_features = default_features[:6]
+
+    recommendations["default_selection"] = {
+        "target": default_target,
+        "features": default_features
     }
 
-    # Drop rules
-    for col in df.columns:
-        null_ratio = df[col].isnull().mean()
-        unique_ratio = df[col].nunique() / len(df)
+    return sanitize(recommendations)
 
-        if null_ratio > 0.5:
-            recommendations["drop_recommendations"].append({
-                "column": col,
-                "reason": "High null ratio (>50%)"
-            })
-        elif unique_ratio > 0.95:
-            recommendations["drop_recommendations"].append({
-                "column": col,
-                "reason": "Likely ID / high cardinality"
-            })
+
+def _exact_candidates(df, numeric_cols, categorical_cols):
+    # Drop rules
+    drops = _drop_recommendations(
+        df.columns,
+        df.isnull().mean(),
+        df.nunique() / len(df) > ID_UNIQUE_RATIO
+    )
 
     # Correlation matrix
     corr = df[numeric_cols].corr() if len(numeric_cols) >= 2 else None
 
     # Target recommendation
+    std = df[numeric_cols].std()
+    targets = []
     for col in numeric_cols:
-        if df[col].std() == 0:
+        if std[col] == 0:
             continue
 
         score = 0
         if corr is not None:
-            score = (corr[col].abs() > 0.3).sum() - 1
+            score = (corr[col].abs() > TARGET_CORRELATION).sum() - 1
 
-        recommendations["target_candidates"].append({
+        targets.append({
             "column": col,
             "score": int(score),
-            "std": df[col].std()
+            "std": std[col]
         })
 
-    recommendations["target_candidates"].sort(
-        key=lambda x: (x["score"], x["std"]),
-        reverse=True
-    )
+    targets.sort(key=lambda x: (x["score"], x["std"]), reverse=True)
 
     # Feature recommendation (based on top target)
-    if recommendations["target_candidates"]:
-        best_target = recommendations["target_candidates"][0]["column"]
-
-        for col in df.columns:
-            if col == best_target:
-                continue
-
-            if col in numeric_cols:
-                corr_value = (
-                    corr.loc[col, best_target]
-                    if corr is not None and col in corr.index
-                    else 0
-                )
-
-                if abs(corr_value) > 0.2:
-                    recommendations["feature_candidates"].append({
-                        "column": col,
-                        "type": "numeric",
-                        "correlation": corr_value
-                    })
-
-            elif col in categorical_cols:
-                recommendations["feature_candidates"].append({
+    features = []
+    if targets:
+        best_target = targets[0]["column"]
+        target_corr = corr[best_target] if corr is not None else pd.Series(dtype="float64")
+        features = _feature_candidates(df, best_target, numeric_cols, categorical_cols, target_corr)
+
+    return {
+        "target_candidates": targets,
+        "feature_candidates": features,
+        "drop_recommendations": drops
+    }
+
+
+def _fast_candidates(df, numeric_cols, categorical_cols):
+    """Recommendation in O(rows * columns) instead of O(rows * columns^2).
+
+    Null ratios are exact. ID columns are pre-screened on a row sample and
+    confirmed with a HyperLogLog distinct count. Target scores come from a
+    correlation matrix over sampled rows, with Fisher-z bounds on the score.
+    Only the chosen target's correlations are computed on every row.
+    """
+    sample = df.sample(n=RECOMMENDATION_SAMPLE_ROWS, random_state=42) \
+        if len(df) > RECOMMENDATION_SAMPLE_ROWS else df
+    sampled = len(sample) < len(df)
+
+    with stage("distinct"):
+        drops = _drop_recommendations(df.columns, df.isna().mean(), _likely_id_columns(df, sample))
+
+    with stage("correlation"):
+        std = df[numeric_cols].std()
+        scored = [col for col in numeric_cols if std[col] != 0]
+        corr, pair_n = _sample_correlation(sample[scored])
+        scores, bounds = _score_bounds(corr, pair_n, sampled)
+
+    targets = []
+    for i, col in enumerate(scored):
+        candidate = {"column": col, "score": int(scores[i]), "std": std[col]}
+        if bounds is not None:
+            candidate["score_bounds"] = [int(bounds[0][i]), int(bounds[1][i])]
+        targets.append(candidate)
+
+    targets.sort(key=lambda x: (x["score"], x["std"]), reverse=True)
+
+    features = []
+    if targets:
+        best_target = targets[0]["column"]
+        with stage("feature_correlation"):
+            others = [col for col in scored if col != best_target]
+            target_corr = _target_correlations(df, best_target, others)
+        features = _feature_candidates(df, best_target, numeric_cols, categorical_cols, target_corr)
+
+    return {
+        "target_candidates": targets,
+        "feature_candidates": features,
+        "drop_recommendations": drops,
+        "approximation": {
+            "mode": "fast",
+            "sample_rows": len(sample),
+            "confidence": RECOMMENDATION_CONFIDENCE,
+            "distinct_counts": "hyperloglog" if sampled else "exact"
+        }
+    }
+
+
+def _drop_recommendations(columns, null_ratio, likely_id):
+    drops = []
+    for col in columns:
+        if null_ratio[col] > 0.5:
+            drops.append({
+                "column": col,
+                "reason": "High null ratio (>50%)"
+            })
+        elif likely_id[col]:
+            drops.append({
+                "column": col,
+                "reason": "Likely ID / high cardinality"
+            })
+    return drops
+
+
+def _feature_candidates(df, best_target, numeric_cols, categorical_cols, target_corr):
+    features = []
+    for col in df.columns:
+        if col == best_target:
+            continue
+
+        if col in numeric_cols:
+            corr_value = target_corr.get(col, 0)
+
+            if abs(corr_value) > 0.2:
+                features.append({
                     "column": col,
-                    "type": "categorical",
-                    "note": "Will be OneHotEncoded"
+                    "type": "numeric",
+                    "correlation": corr_value
                 })
 
- # ===== DEFAULT AUTO-FILL =====
-    default_target = None
-    default_features = []
+        elif col in categorical_cols:
+            features.append({
+                "column": col,
+                "type": "categorical",
+                "note": "Will be OneHotEncoded"
+            })
+    return features
 
-    if recommendations["target_candidates"]:
-        default_target = recommendations["target_candidates"][0]["column"]
 
-        for feat in recommendations["feature_candidates"]:
-            if feat["column"] != default_target:
-                default_features.append(feat["column"])
+def _likely_id_columns(df, sample):
+    n_rows = len(df)
+    if len(sample) == n_rows:
+        return df.nunique() / n_rows > ID_UNIQUE_RATIO
 
-        # batasi jumlah feature default
-        default_features = default_features[:6]
+    # A sampled row repeating an earlier sampled value (or null) is never a
+    # value's first occurrence; ID columns have under 5% such rows, so a
+    # sample well above that rules the column out (Hoeffding bound)
+    slack = math.sqrt(math.log(1 / (1 - RECOMMENDATION_CONFIDENCE)) / (2 * len(sample)))
+    repeated = 1 - sample.nunique() / len(sample)
+    candidates = repeated.index[repeated <= (1 - ID_UNIQUE_RATIO) + slack]
 
-    recommendations["default_selection"] = {
-        "target": default_target,
-        "features": default_features
-    }
+    likely_id = pd.Series(False, index=df.columns)
+    for col in candidates:
+        sketch = HyperLogLog()
+        sketch.add_hashes(hash_values(df[col]))
+        likely_id[col] = sketch.estimate() / n_rows > ID_UNIQUE_RATIO
+    return likely_id
 
-    return sanitize(recommendations)
+
+def _sample_correlation(frame):
+    # Products over pairwise-complete rows scaled by each column's own variance;
+    # identical to Pearson when the sample has no nulls
+    values = frame.to_numpy(dtype=np.float32, na_value=np.nan)
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(valid, values, 0).sum(axis=0) / counts
+        centered = np.where(valid, values - mean, 0).astype(np.float32)
+        std = np.sqrt((centered ** 2).sum(axis=0) / counts)
+        if valid.all():
+            pair_n = np.float64(len(values))
+        else:
+            mask = valid.astype(np.float32)
+            pair_n = (mask.T @ mask).astype(np.float64)
+        corr = (centered.T @ centered).astype(np.float64) / (pair_n * np.outer(std, std))
+    corr[(pair_n < 2) | ~np.isfinite(corr)] = np.nan
+    return np.clip(corr, -1.0, 1.0), pair_n
+
+
+def _target_correlations(df, target, columns, block_cells=4_000_000):
+    # Pairwise-complete Pearson against one column, vectorized over column blocks
+    y = df[target].to_numpy(dtype=np.float64, na_value=np.nan)
+    y_valid = ~np.isnan(y)
+    y = np.where(y_valid, y - y[y_valid].mean() if y_valid.any() else 0.0, np.nan)
+
+    corr = {}
+    step = max(1, block_cells // max(len(df), 1))
+    for start in range(0, len(columns), step):
+        block = columns[start:start + step]
+        X = df[block].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(X) & y_valid[:, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if valid.all():
+                X = X - X.mean(axis=0)
+                n = np.full(len(block), len(X))
+                cov = y @ X
+                var_x = np.einsum("ij,ij->j", X, X)
+                var_y = np.full(len(block), y @ y)
+            else:
+                n = valid.sum(axis=0)
+                # Shifting by the column mean keeps the sums of squares well conditioned
+                X = X - np.where(valid, X, 0).sum(axis=0) / n
+                xv = np.where(valid, X, 0.0)
+                yv = np.where(valid, y[:, None], 0.0)
+                sx, sy = xv.sum(axis=0), yv.sum(axis=0)
+                cov = (xv * yv).sum(axis=0) - sx * sy / n
+                var_x = (xv ** 2).sum(axis=0) - sx ** 2 / n
+                var_y = (yv ** 2).sum(axis=0) - sy ** 2 / n
+            r = cov / np.sqrt(var_x * var_y)
+        r[(n < 2) | (var_x <= 0) | (var_y <= 0)] = np.nan
+        corr.update(zip(block, np.clip(r, -1.0, 1.0)))
+    return pd.Series(corr, dtype="float64")
+
+
+def _score_bounds(corr, pair_n, sampled):
+    off_diagonal = ~np.eye(len(corr), dtype=bool)
+    abs_corr = np.abs(corr)
+    with np.errstate(invalid="ignore"):
+        scores = ((abs_corr > TARGET_CORRELATION) & off_diagonal).sum(axis=1)
+    if not sampled:
+        return scores, None
+
+    # Fisher z interval of |r|; the score bounds count pairs certainly / possibly above the cut
+    critical = NormalDist().inv_cdf(0.5 + RECOMMENDATION_CONFIDENCE / 2)
+    z = np.arctanh(np.clip(abs_corr, 0.0, 1 - 1e-12))
+    margin = critical / np.sqrt(np.maximum(pair_n - 3, 1))
+    with np.errstate(invalid="ignore"):
+        certain = ((np.tanh(z - margin) > TARGET_CORRELATION) & off_diagonal).sum(axis=1)
+        possible = ((np.tanh(z + margin) > TARGET_CORRELATION) & off_diagonal).sum(axis=1)
+    return scores, (certain, possible)
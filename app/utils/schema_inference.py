@@ -0,0 +1,223 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Deep memory of an object column: one pointer per cell plus each boxed value
+OBJECT_POINTER_BYTES = 8
+NAN_OBJECT_BYTES = sys.getsizeof(float("nan"))
+
+
+def infer_read_dtypes(sample, category_max_ratio):
+    # Only strings are decided from the sample; numeric narrowing needs every row
+    dtypes = {}
+    for col in sample.columns:
+        series = sample[col]
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            continue
+        values = series.dropna()
+        if len(values) and values.nunique() <= category_max_ratio * len(values):
+            dtypes[col] = "category"
+    return dtypes
+
+
+def downcast_numeric(df, float_tolerance=0.0):
+    for col in df.columns:
+        series = df[col]
+        if not isinstance(series.dtype, np.dtype):
+            continue
+
+        if series.dtype.kind == "i" and series.dtype.itemsize > 1:
+            # Range-based, always lossless
+            narrow = pd.to_numeric(series, downcast="integer")
+        elif series.dtype == np.float64:
+            narrow = series.astype(np.float32)
+            if not float32_lossless(series.to_numpy(), float_tolerance):
+                continue
+        else:
+            continue
+
+        if narrow.dtype != series.dtype:
+            df[col] = narrow
+    return df
+
+
+def float32_lossless(values, float_tolerance=0.0):
+    wide = values.astype(np.float32).astype(np.float64)
+    if float_tolerance > 0:
+        return np.allclose(wide, values, rtol=float_tolerance, atol=0, equal_nan=True)
+    return np.array_equal(wide, values, equal_nan=True)
+
+
+def narrowest_integer(low, high):
+    # Same choice as pd.to_numeric(downcast="integer") for a column spanning [low, high]
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def category_codes_dtype(n_categories):
+    # Mirrors pandas' smallest signed code type that still leaves room for -1
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def widen_numeric(df, columns):
+    # Narrowed dtypes are for storage; models and statistics see the float64/int64 values
+    widened = {}
+    for col in columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, np.dtype) and dtype.itemsize < 8:
+            if dtype.kind == "f":
+                widened[col] = np.float64
+            elif dtype.kind == "i":
+                widened[col] = np.int64
+    return df.astype(widened) if widened else df
+
+
+def default_memory_bytes(df):
+    """Estimated deep memory of the same frame under read_csv's default dtypes."""
+    total = int(df.index.memory_usage())
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            sizes = np.array([sys.getsizeof(str(c)) for c in series.cat.categories], dtype=np.int64)
+            counts = np.bincount(codes[codes >= 0], minlength=len(sizes))
+            nulls = int((codes < 0).sum())
+            total += int(counts @ sizes) + nulls * NAN_OBJECT_BYTES + len(series) * OBJECT_POINTER_BYTES
+        elif isinstance(series.dtype, np.dtype) and series.dtype.kind in "iuf":
+            total += len(series) * 8
+        else:
+            total += int(series.memory_usage(deep=True, index=False))
+    return total
+
+
+def memory_report(df):
+    actual = int(df.memory_usage(deep=True).sum())
+    default = default_memory_bytes(df)
+    return {
+        "bytes": actual,
+        "default_bytes": default,
+        "saved_bytes": max(default - actual, 0),
+        "optimized_dtypes": {
+            col: str(dtype) for col, dtype in df.dtypes.items()
+            if isinstance(dtype, pd.CategoricalDtype)
+            or (isinstance(dtype, np.dtype) and dtype.kind in "iuf" and dtype.itemsize < 8)
+        }
+    }
+
+
+class StreamingMemoryReport:
+    """memory_report() for a CSV that is read in chunks and never held whole.
+
+    Follows load_csv's inference without materializing its result: string
+    columns are chosen as categories from the first `sample_rows` rows, integers
+    are narrowed over their range across all chunks, and floats count as
+    float32 only if every chunk survives the round trip. Byte counts are
+    therefore estimates of what the full parse would hold.
+    """
+
+    def __init__(self, optimize, sample_rows, category_max_ratio, float_tolerance=0.0):
+        self.optimize = optimize
+        self.sample_rows = sample_rows
+        self.category_max_ratio = category_max_ratio
+        self.float_tolerance = float_tolerance
+        self.rows = 0
+        self.columns = None
+        # Chunks held back until the schema sample is complete
+        self._sample = []
+
+    def update(self, chunk):
+        if self.columns is not None:
+            self._add(chunk)
+            return
+        self._sample.append(chunk)
+        if sum(len(c) for c in self._sample) >= self.sample_rows:
+            self._start()
+
+    def _start(self):
+        sample = pd.concat(self._sample) if len(self._sample) > 1 else self._sample[0]
+        categories = (
+            infer_read_dtypes(sample.head(self.sample_rows), self.category_max_ratio)
+            if self.optimize else {}
+        )
+        self.columns = {
+            col: {
+                "default_bytes": 0,
+                "categories": set() if col in categories else None,
+                "text": False,
+                "float": False,
+                "float32": True,
+                "low": None,
+                "high": None,
+            }
+            for col in sample.columns
+        }
+        for chunk in self._sample:
+            self._add(chunk)
+        self._sample = []
+
+    def _add(self, chunk):
+        self.rows += len(chunk)
+        for col, state in self.columns.items():
+            series = chunk[col]
+            numeric = isinstance(series.dtype, np.dtype) and series.dtype.kind in "iuf"
+            state["default_bytes"] += len(series) * 8 if numeric else int(series.memory_usage(deep=True, index=False))
+
+            if state["categories"] is not None:
+                state["categories"].update(series.dropna().unique())
+            elif not numeric:
+                state["text"] = True
+            elif not state["text"] and self.optimize:
+                values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+                if series.dtype.kind == "f":
+                    state["float"] = True
+                if state["float32"]:
+                    state["float32"] = float32_lossless(values, self.float_tolerance)
+                finite = values[~np.isnan(values)]
+                if len(finite):
+                    low, high = finite.min(), finite.max()
+                    state["low"] = low if state["low"] is None else min(state["low"], low)
+                    state["high"] = high if state["high"] is None else max(state["high"], high)
+
+    def report(self):
+        if self.columns is None and self._sample:
+            self._start()
+        index_bytes = int(pd.RangeIndex(self.rows).memory_usage())
+        actual = default = index_bytes
+        optimized = {}
+        for col, state in (self.columns or {}).items():
+            nbytes = state["default_bytes"]
+            default += nbytes
+            if state["categories"] is not None:
+                categories = pd.Index(sorted(state["categories"], key=str))
+                if len(categories):
+                    # A parsed categorical carries the categories' hash table too
+                    categories.get_loc(categories[0])
+                codes = category_codes_dtype(len(categories))
+                nbytes = self.rows * codes.itemsize + int(categories.memory_usage(deep=True))
+                optimized[col] = "category"
+            elif state["text"] or not self.optimize:
+                pass
+            elif state["float"]:
+                if state["float32"]:
+                    nbytes = self.rows * 4
+                    optimized[col] = "float32"
+            elif state["low"] is not None:
+                dtype = narrowest_integer(state["low"], state["high"])
+                if dtype.itemsize < 8:
+                    nbytes = self.rows * dtype.itemsize
+                    optimized[col] = str(dtype)
+            actual += nbytes
+
+        return {
+            "bytes": actual,
+            "default_bytes": default,
+            "saved_bytes": max(default - actual, 0),
+            "optimized_dtypes": optimized,
+        }
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+UINT64_MAX = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# Exact distinct tracking switches to HyperLogLog above this many values
+EXACT_DISTINCT_LIMIT = 100_000
+
+
+def hash_values(values):
+    # Nulls are not counted as distinct values, like Series.nunique()
+    series = pd.Series(values)
+    series = series[series.notna()]
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        # 1 and 1.0 must collide whether a chunk was parsed as int or float
+        series = series.astype("float64")
+    return pd.util.hash_array(series.to_numpy(), categorize=False)
+
+
+def _sorted_unique(hashes):
+    # Sort-based; np.unique's hash table path is far slower for uint64 hashes
+    hashes = np.sort(hashes)
+    if len(hashes) < 2:
+        return hashes
+    return hashes[np.concatenate(([True], hashes[1:] != hashes[:-1]))]
+
+
+def _shift_leading_zeros(x):
+    zeros = np.zeros(x.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        top_clear = x <= (UINT64_MAX >> np.uint64(shift))
+        zeros += top_clear.astype(np.uint8) * np.uint8(shift)
+        x = np.where(top_clear, x << np.uint64(shift), x)
+    return zeros
+
+
+def _leading_zeros(x):
+    # frexp's exponent is exact for x >> 11 (< 2**53); only values below 2**11 need the shift loop
+    _, exponent = np.frexp((x >> np.uint64(11)).astype(np.float64))
+    zeros = (53 - exponent).astype(np.uint8)
+    small = exponent == 0
+    if small.any():
+        zeros[small] = _shift_leading_zeros(x[small])
+    return zeros
+
+
+class HyperLogLog:
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        if not len(hashes):
+            return
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        # Sentinel bit keeps the rank bounded for all-zero remainders
+        remainder = (hashes << p) | (np.uint64(1) << (p - np.uint64(1)))
+        rank = _leading_zeros(remainder) + np.uint8(1)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+
+        empty = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and empty:
+            # Linear counting is more accurate for small cardinalities
+            return m * np.log(m / empty)
+        return raw
+
+
+class DistinctCounter:
+    """Exact distinct count over value hashes, degrading to HyperLogLog.
+
+    Partial counters from different chunks merge into one, so columns can be
+    counted in parallel.
+    """
+
+    def __init__(self, exact_limit=EXACT_DISTINCT_LIMIT):
+        self.exact_limit = exact_limit
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.sketch = None
+
+    def add(self, values):
+        self.add_hashes(hash_values(values))
+
+    def add_hashes(self, hashes):
+        if self.sketch is not None:
+            self.sketch.add_hashes(hashes)
+            return
+        self.hashes = _sorted_unique(np.concatenate((self.hashes, hashes)))
+        if len(self.hashes) > self.exact_limit:
+            self._to_sketch()
+
+    def _to_sketch(self):
+        self.sketch = HyperLogLog()
+        self.sketch.add_hashes(self.hashes)
+        self.hashes = None
+
+    def merge(self, other):
+        if other.sketch is None:
+            self.add_hashes(other.hashes)
+            return self
+        if self.sketch is None:
+            self._to_sketch()
+        self.sketch.merge(other.sketch)
+        return self
+
+    def count(self):
+        if self.sketch is None:
+            return len(self.hashes)
+        return int(round(self.sketch.estimate()))
@@ -0,0 +1,100 @@
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_CURRENT_TIMER = ContextVar("stage_timer", default=None)
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def current_rss_bytes():
+    # Resident set size right now; falls back to the peak where /proc is missing
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageTimer:
+    """Ordered per-request record of stage durations and RSS deltas."""
+
+    def __init__(self):
+        self.stages = []
+        self.started_at = time.perf_counter()
+
+    def add(self, name, seconds, memory_delta=None):
+        self.stages.append({
+            "stage": name,
+            "seconds": seconds,
+            "memory_delta_bytes": memory_delta,
+        })
+
+    def total_seconds(self):
+        return time.perf_counter() - self.started_at
+
+    def as_dict(self):
+        return {
+            "total_seconds": self.total_seconds(),
+            "stages": list(self.stages),
+        }
+
+    def server_timing(self):
+        # Repeated stage names are legal in Server-Timing but merged here for readability
+        merged = {}
+        for entry in self.stages:
+            merged[entry["stage"]] = merged.get(entry["stage"], 0.0) + entry["seconds"]
+        parts = [f"{_token(name)};dur={seconds * 1000:.1f}" for name, seconds in merged.items()]
+        parts.append(f"total;dur={self.total_seconds() * 1000:.1f}")
+        return ", ".join(parts)
+
+
+def _token(name):
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+@contextmanager
+def timer_scope():
+    timer = StageTimer()
+    token = _CURRENT_TIMER.set(timer)
+    try:
+        yield timer
+    finally:
+        _CURRENT_TIMER.reset(token)
+
+
+def record_stage(name, seconds, memory_delta=None):
+    timer = _CURRENT_TIMER.get()
+    if timer is not None:
+        timer.add(name, seconds, memory_delta)
+
+
+@contextmanager
+def stage(name):
+    # No-op bookkeeping outside a timer scope, so library code can always call it
+    timer = _CURRENT_TIMER.get()
+    if timer is None:
+        yield
+        return
+
+    rss_before = current_rss_bytes()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - start, current_rss_bytes() - rss_before)
+
+
+def with_timings(payload, include):
+    if include:
+        timer = _CURRENT_TIMER.get()
+        if timer is not None:
+            payload = {**payload, "timings": timer.as_dict()}
+    return payload
@@ -0,0 +1,378 @@
+"""Benchmark the HTTP endpoints across synthetic dataset shapes.
+
+Every (shape, endpoint) case runs in a fresh interpreter so caches start
+cold and peak RSS belongs to that case alone. The app is driven in-process
+through FastAPI's TestClient.
+
+    python -m benchmarks.bench_endpoints --preset quick
+    python -m benchmarks.bench_endpoints --rows 1000,1000000 --cols 10 --endpoints eda,regression
+    python -m benchmarks.bench_endpoints --preset quick --baseline benchmarks/results/baseline.json
+
+Each case records:
+- wall_seconds: end to end with a fresh file upload, as a client would send it
+- warm_seconds: min/median over --repeat calls that reuse the parsed dataset_id
+  (regression retrains with use_cache=false, so this stays a training time)
+- stages: Server-Timing entries from the cold call, when the app emits them, plus the
+  dataset upload and, for regression, one call answered from the memoized result (cached)
+- peak_rss_mb / rss_delta_mb: process high-water mark and growth over the idle app
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_PREFIX = "BENCH_RESULT "
+ENDPOINTS = ("preview", "eda", "recommendation", "regression", "plot")
+PLOT_MODES = ("auto", "raw", "lttb", "minmax", "density", "residuals")
+
+# rows, numeric cols, categorical cols, categorical cardinality, null ratio
+PRESETS = {
+    "quick": [
+        ("tiny", 1_000, 5, 0, 0, 0.0),
+        ("medium", 100_000, 16, 4, 20, 0.0),
+        ("wide", 10_000, 400, 100, 20, 0.0),
+        ("high_cardinality", 100_000, 6, 4, 10_000, 0.0),
+        ("nulls", 100_000, 16, 4, 20, 0.2),
+    ],
+    "full": [
+        ("tiny", 1_000, 5, 0, 0, 0.0),
+        ("medium", 100_000, 16, 4, 20, 0.0),
+        ("large", 1_000_000, 40, 10, 50, 0.05),
+        ("tall", 5_000_000, 8, 2, 20, 0.0),
+        ("wide", 10_000, 400, 100, 20, 0.0),
+        ("very_wide", 10_000, 1_600, 400, 20, 0.0),
+        ("high_cardinality", 1_000_000, 6, 4, 100_000, 0.0),
+        ("nulls", 1_000_000, 16, 4, 20, 0.3),
+    ],
+}
+
+GENERATE_CHUNK_ROWS = 250_000
+
+
+# =========================
+# DATA GENERATION
+# =========================
+def shape_from_args(name, rows, numeric, categorical, cardinality, null_ratio):
+    return {
+        "name": name,
+        "rows": rows,
+        "numeric": numeric,
+        "categorical": categorical,
+        "cardinality": cardinality,
+        "null_ratio": null_ratio,
+    }
+
+
+def csv_path(shape, data_dir):
+    key = "r{rows}_n{numeric}_c{categorical}_k{cardinality}_z{null_ratio}".format(**shape)
+    return os.path.join(data_dir, f"{key}.csv")
+
+
+def generate_csv(shape, path):
+    if os.path.exists(path):
+        return path
+
+    rng = np.random.default_rng(42)
+    weights = rng.normal(size=shape["numeric"])
+    tmp_path = path + ".partial"
+
+    # Written in chunks so the tall shapes never exist in memory at once
+    with open(tmp_path, "w", newline="") as f:
+        for start in range(0, shape["rows"], GENERATE_CHUNK_ROWS):
+            n = min(GENERATE_CHUNK_ROWS, shape["rows"] - start)
+            numeric = rng.normal(size=(n, shape["numeric"]))
+            chunk = pd.DataFrame(numeric, columns=[f"x{i}" for i in range(shape["numeric"])])
+
+            for i in range(shape["categorical"]):
+                codes = rng.integers(0, shape["cardinality"], size=n)
+                chunk[f"cat{i}"] = pd.Series(codes).map(lambda code: f"v{code}")
+
+            chunk["y"] = numeric @ weights + rng.normal(scale=0.5, size=n)
+
+            if shape["null_ratio"]:
+                features = chunk.columns[:-1]
+                mask = rng.random(size=(n, len(features))) < shape["null_ratio"]
+                chunk[features] = chunk[features].mask(mask)
+
+            chunk.to_csv(f, index=False, header=start == 0, float_format="%.6g")
+
+    os.replace(tmp_path, path)
+    return path
+
+
+# =========================
+# WORKER (ONE CASE PER PROCESS)
+# =========================
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def parse_server_timing(header):
+    stages = {}
+    for item in filter(None, (part.strip() for part in (header or "").split(","))):
+        name, *params = [p.strip() for p in item.split(";")]
+        for param in params:
+            if param.startswith("dur="):
+                stages[name] = float(param[4:]) / 1000
+    return stages
+
+
+def timed(fn):
+    start = time.perf_counter()
+    response = fn()
+    return time.perf_counter() - start, response
+
+
+def check(response):
+    if response.status_code >= 400:
+        raise RuntimeError(f"{response.request.url.path} -> {response.status_code}: {response.text[:300]}")
+    return response
+
+
+def run_case(spec):
+    import warnings
+    warnings.filterwarnings("ignore")
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    idle_rss = peak_rss_mb()
+    endpoint = spec["endpoint"]
+    path = spec["csv"]
+    filename = os.path.basename(path)
+
+    header = pd.read_csv(path, nrows=0).columns.tolist()
+    features = [c for c in header if c != "y"][:spec["max_features"]]
+    regression_form = {"target_column": "y", "feature_columns": ",".join(features)}
+    if spec.get("execution_mode"):
+        regression_form["execution_mode"] = spec["execution_mode"]
+
+    def post_file(url, data=None):
+        with open(path, "rb") as f:
+            return check(client.post(url, files={"file": (filename, f, "text/csv")}, data=data or {}))
+
+    urls = {
+        "preview": "/api/csv/preview",
+        "eda": "/api/csv/eda",
+        "recommendation": "/api/csv/recommendation",
+        "regression": "/api/regression",
+    }
+
+    stages = {}
+    warm = []
+
+    if endpoint == "plot":
+        post_file(urls["regression"], regression_form)
+        wall, response = timed(lambda: check(client.get("/api/regression/plot")))
+        for mode in PLOT_MODES:
+            elapsed, _ = timed(lambda: check(client.get("/api/regression/plot", params={"mode": mode})))
+            stages[f"mode_{mode}"] = elapsed
+        for _ in range(spec["repeat"]):
+            warm.append(timed(lambda: check(client.get("/api/regression/plot")))[0])
+    else:
+        data = regression_form if endpoint == "regression" else None
+        wall, response = timed(lambda: post_file(urls[endpoint], data))
+        stages.update(parse_server_timing(response.headers.get("server-timing")))
+
+        stages["upload"], uploaded = timed(lambda: post_file("/api/dataset/upload"))
+        warm_form = dict(data or {}, dataset_id=uploaded.json()["dataset_id"])
+        if endpoint == "regression":
+            # Identical forms hit the memoized result; measure that once and keep warm runs training
+            stages["cached"], _ = timed(lambda: check(client.post(urls[endpoint], data=warm_form)))
+            warm_form["use_cache"] = "false"
+        for _ in range(spec["repeat"]):
+            warm.append(timed(lambda: check(client.post(urls[endpoint], data=warm_form)))[0])
+
+    peak = peak_rss_mb()
+    return {
+        "status": response.status_code,
+        "wall_seconds": wall,
+        "warm_seconds": {
+            "min": min(warm) if warm else None,
+            "median": statistics.median(warm) if warm else None,
+        },
+        "stages": stages,
+        "response_bytes": len(response.content),
+        "peak_rss_mb": peak,
+        "rss_delta_mb": peak - idle_rss,
+    }
+
+
+# =========================
+# DRIVER
+# =========================
+def run_in_subprocess(spec, timeout):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    # Saved models and spill files land in the scratch directory, not the repo
+    workdir = tempfile.mkdtemp(prefix="regviz-bench-")
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_endpoints", "--worker", json.dumps(spec)],
+            cwd=workdir,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return {"error": f"timed out after {timeout}s"}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    return {"error": (proc.stderr or proc.stdout).strip().splitlines()[-1:] or "no output"}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_shapes(args):
+    if args.rows or args.cols:
+        rows = [int(v) for v in (args.rows or "10000").split(",")]
+        cols = [int(v) for v in (args.cols or "10").split(",")]
+        cards = [int(v) for v in args.cardinality.split(",")]
+        nulls = [float(v) for v in args.null_ratio.split(",")]
+        shapes = []
+        for r, c, k, z in itertools.product(rows, cols, cards, nulls):
+            categorical = c // 5 if k else 0
+            name = f"r{r}_c{c}_k{k}_z{z}"
+            shapes.append(shape_from_args(name, r, c - categorical, categorical, k, z))
+        return shapes
+
+    return [shape_from_args(*preset) for preset in PRESETS[args.preset]]
+
+
+def compare(results, baseline, threshold):
+    previous = {r["case"]: r for r in baseline["results"]}
+    regressions = []
+
+    print(f"\n{'case':<36} {'metric':<12} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for result in results:
+        old = previous.get(result["case"])
+        if old is None or "error" in result or "error" in old:
+            continue
+
+        metrics = {
+            "wall": (old["wall_seconds"], result["wall_seconds"]),
+            "warm_median": (old["warm_seconds"]["median"], result["warm_seconds"]["median"]),
+            "peak_rss_mb": (old["peak_rss_mb"], result["peak_rss_mb"]),
+        }
+        for metric, (before, after) in metrics.items():
+            if not before or after is None:
+                continue
+            ratio = after / before
+            flag = ""
+            if ratio > 1 + threshold:
+                flag = "  REGRESSION"
+                regressions.append((result["case"], metric, ratio))
+            print(f"{result['case']:<36} {metric:<12} {before:>10.3f} {after:>10.3f} {ratio:>6.2f}x{flag}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--rows", help="comma separated row counts (overrides --preset)")
+    parser.add_argument("--cols", help="comma separated total feature column counts")
+    parser.add_argument("--cardinality", default="20", help="categorical cardinalities; 0 = numeric only")
+    parser.add_argument("--null-ratio", default="0.0", help="comma separated null ratios")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--repeat", type=int, default=3, help="warm calls per case")
+    parser.add_argument("--max-features", type=int, default=20, help="features passed to regression")
+    parser.add_argument("--execution-mode", help="training executor for regression cases")
+    parser.add_argument("--timeout", type=int, default=1800, help="seconds per case")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "regviz-bench-data"))
+    parser.add_argument("--output", default=os.path.join(REPO_ROOT, "benchmarks", "results", "latest.json"))
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before flagging")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(RESULT_PREFIX + json.dumps(run_case(json.loads(args.worker))))
+        return
+
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = []
+
+    print(f"{'case':<36} {'status':>6} {'wall s':>9} {'warm s':>9} {'peak MB':>9}")
+    for shape in build_shapes(args):
+        path = generate_csv(shape, csv_path(shape, args.data_dir))
+        for endpoint in endpoints:
+            spec = {
+                "csv": path,
+                "endpoint": endpoint,
+                "repeat": args.repeat,
+                "max_features": args.max_features,
+                "execution_mode": args.execution_mode,
+            }
+            result = {"case": f"{shape['name']}/{endpoint}", "shape": shape, "endpoint": endpoint}
+            result.update(run_in_subprocess(spec, args.timeout))
+            results.append(result)
+
+            if "error" in result:
+                print(f"{result['case']:<36} {'ERR':>6}  {result['error']}")
+            else:
+                warm = result["warm_seconds"]["median"]
+                print(
+                    f"{result['case']:<36} {result['status']:>6} {result['wall_seconds']:>9.3f} "
+                    f"{warm if warm is not None else float('nan'):>9.3f} {result['peak_rss_mb']:>9.1f}"
+                )
+
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k != "worker"},
+        },
+        "results": results,
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) slower than baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compare the legacy response path with the vectorized/orjson one.
+
+Legacy: .tolist()/to_dict() -> sanitize() element walk -> jsonable_encoder
+-> JSONResponse. Fast: bulk sanitize of arrays/frames -> FastJSONResponse.
+
+    python -m benchmarks.bench_json_serialization --rows 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.utils.json_response import FastJSONResponse, orjson
+from app.utils.json_sanitizer import sanitize
+
+
+def legacy_render(payload):
+    return JSONResponse(jsonable_encoder(sanitize(payload))).body
+
+
+def fast_render(payload):
+    return FastJSONResponse(sanitize(payload)).body
+
+
+def build_cases(rows, width):
+    rng = np.random.default_rng(0)
+
+    actual = rng.normal(size=rows)
+    pred = actual + rng.normal(scale=0.1, size=rows)
+    pred[::997] = np.nan
+
+    corr = pd.DataFrame(rng.uniform(-1, 1, size=(width, width)))
+    corr.columns = corr.index = [f"c{i}" for i in range(width)]
+    corr.iloc[::7, 3] = np.nan
+
+    frame = pd.DataFrame(rng.normal(size=(min(rows, 50_000), 20)))
+    frame.columns = [f"f{i}" for i in range(20)]
+    frame["label"] = rng.choice(["a", "b", None], len(frame))
+    frame.iloc[::11, 0] = np.nan
+
+    return {
+        "plot_raw": (
+            {"train": {"y_actual": actual.tolist(), "y_pred": pred.tolist()}},
+            {"train": {"y_actual": actual, "y_pred": pred}},
+        ),
+        "correlation_matrix": (
+            {"correlation_matrix": corr.to_dict()},
+            {"correlation_matrix": {col: corr[col] for col in corr.columns}},
+        ),
+        "preview_records": (
+            {"preview": frame.to_dict(orient="records")},
+            {"preview": frame},
+        ),
+    }
+
+
+def best_of(fn, payload, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(payload)
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--width", type=int, default=500, help="correlation matrix size")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"orjson: {'yes' if orjson else 'no (stdlib fallback)'}")
+    print(f"{'case':<20} {'legacy ms':>10} {'fast ms':>10} {'speedup':>8} {'bytes':>12}")
+
+    for name, (legacy_payload, fast_payload) in build_cases(args.rows, args.width).items():
+        legacy, size = best_of(legacy_render, legacy_payload, args.repeat)
+        fast, _ = best_of(fast_render, fast_payload, args.repeat)
+        print(f"{name:<20} {legacy * 1000:>10.1f} {fast * 1000:>10.1f} {legacy / fast:>7.1f}x {size:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import io
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException, UploadFile
+
+import app.services.admission as admission
+import app.services.dataset_store as dataset_store
+import app.services.regression_service as regression_service
+import app.utils.model_storage as model_storage
+from app.services.admission import AdmissionController, admitted_job
+from app.services.column_store import ColumnStore
+from app.services.dataset_store import DatasetCache
+from app.services.regression_service import run_regression
+from app.services.result_cache import ResultCache
+from app.utils.model_registry import ModelRegistry
+
+
+def test_budget_is_split_across_worker_processes(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_MEMORY_BYTES", 0)
+    monkeypatch.setattr(admission, "ADMISSION_MEMORY_FRACTION", 0.5)
+    monkeypatch.setattr(admission, "_memory_limit", lambda: 8_000)
+    monkeypatch.setattr(admission, "WEB_CONCURRENCY", 4)
+    assert admission._default_budget() == 1_000
+
+    monkeypatch.setattr(admission, "ADMISSION_MEMORY_BYTES", 6_000)
+    assert admission._default_budget() == 1_500
+
+    monkeypatch.setattr(admission, "ADMISSION_MEMORY_BYTES", -1)
+    assert admission._default_budget() == -1
+
+
+def test_queued_job_gives_up_waiting_for_its_reservation(monkeypatch):
+    controller = AdmissionController(100, {"regression": 1}, queue_seconds=0)
+    monkeypatch.setattr(admission, "ADMISSION", controller)
+    monkeypatch.setattr(admission, "ADMISSION_JOB_QUEUE_SECONDS", 0.2)
+    held = controller.acquire("regression", 80)
+
+    def job(admission, should_cancel):
+        with admission():
+            return "trained"
+
+    run = admitted_job(job, "regression", 50)
+    with pytest.raises(HTTPException) as error:
+        run(should_cancel=lambda: False)
+    assert error.value.status_code == 503
+
+    controller.release(held)
+    assert run(should_cancel=lambda: False) == "trained"
+
+
+def test_memoized_regression_does_not_reserve(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(dataset_store, "DATASET_CACHE", DatasetCache(64 * 1024 * 1024))
+    monkeypatch.setattr(dataset_store, "COLUMN_STORE", ColumnStore(None, 0))
+    monkeypatch.setattr(regression_service, "REGRESSION_RESULTS", ResultCache(64 * 1024 * 1024))
+    monkeypatch.setattr(
+        model_storage, "MODEL_REGISTRY",
+        ModelRegistry(str(tmp_path / "registry.sqlite3"), model_storage.MODEL_DIR)
+    )
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({"a": rng.normal(size=300), "b": rng.normal(size=300)})
+    df["y"] = df["a"] - 2 * df["b"] + rng.normal(size=300)
+    data = df.to_csv(index=False).encode()
+
+    reservations = []
+
+    @contextmanager
+    def reserve():
+        reservations.append(True)
+        yield
+
+    results = [
+        run_regression(
+            file=UploadFile(file=io.BytesIO(data), filename="data.csv"),
+            target_column="y",
+            feature_columns=["a", "b"],
+            admission=reserve,
+        )
+        for _ in range(2)
+    ]
+
+    assert [r["cached"] for r in results] == [False, True]
+    assert reservations == [True]
@@ -0,0 +1,85 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import UploadFile
+
+import app.services.dataset_store as dataset_store
+import app.utils.csv_loader as csv_loader
+import app.utils.csv_preview as csv_preview
+import app.utils.model_storage as model_storage
+from app.services.column_store import ColumnStore
+from app.services.dataset_store import DatasetCache
+from app.services.regression_service import run_regression
+from app.utils.model_registry import ModelRegistry
+
+
+def _csv_bytes():
+    rng = np.random.default_rng(0)
+    n = 400
+    # Multiples of 1/64 are exact in float32, so "optimized" narrows every float column
+    df = pd.DataFrame({
+        "a": np.round(rng.normal(size=n) * 64) / 64,
+        "b": np.round(rng.normal(size=n) * 64) / 64,
+        "c": rng.integers(0, 100, size=n),
+    })
+    df.loc[::17, "b"] = np.nan
+    df["y"] = np.round((3 * df["a"] - 2 * df["b"].fillna(0) + 0.1 * df["c"] + rng.normal(size=n)) * 64) / 64
+    return df.to_csv(index=False).encode()
+
+
+def _run(monkeypatch, tmp_path, csv_dtypes, null_strategy):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(csv_loader, "CSV_DTYPES", csv_dtypes)
+    # Fresh, memory-only dataset caches so each mode parses the CSV itself
+    monkeypatch.setattr(dataset_store, "DATASET_CACHE", DatasetCache(64 * 1024 * 1024))
+    monkeypatch.setattr(dataset_store, "COLUMN_STORE", ColumnStore(None, 0))
+    monkeypatch.setattr(
+        model_storage, "MODEL_REGISTRY",
+        ModelRegistry(str(tmp_path / "registry.sqlite3"), model_storage.MODEL_DIR)
+    )
+
+    upload = UploadFile(file=io.BytesIO(_csv_bytes()), filename="data.csv")
+    return run_regression(
+        file=upload,
+        target_column="y",
+        feature_columns=["a", "b", "c"],
+        null_strategy=null_strategy,
+        execution_mode="thread",
+        use_cache=False,
+    )
+
+
+@pytest.mark.parametrize("null_strategy", ["mean", "drop"])
+def test_optimized_dtypes_match_default_regression(monkeypatch, tmp_path, null_strategy):
+    baseline = _run(monkeypatch, tmp_path, "default", null_strategy)
+    optimized = _run(monkeypatch, tmp_path, "optimized", null_strategy)
+
+    assert optimized["best_model"] == baseline["best_model"]
+    assert optimized["model_comparison"] == baseline["model_comparison"]
+
+
+def test_streamed_preview_estimates_the_parsed_memory_report(monkeypatch):
+    rng = np.random.default_rng(2)
+    n = 3000
+    df = pd.DataFrame({
+        "small": rng.integers(0, 100, size=n),
+        "wide": rng.integers(0, 10**6, size=n),
+        "exact": np.round(rng.normal(size=n) * 8) / 8,
+        "noisy": rng.normal(size=n),
+        "city": rng.choice(["oslo", "lima", "pune", None], size=n),
+        "label": [f"row-{i}" for i in range(n)],
+    })
+    data = df.to_csv(index=False).encode()
+    monkeypatch.setattr(csv_loader, "CSV_DTYPES", "optimized")
+    monkeypatch.setattr(csv_preview, "CSV_DTYPES", "optimized")
+
+    parsed = csv_preview.analyze_csv(UploadFile(file=io.BytesIO(data), filename="data.csv"))
+    streamed = csv_preview.analyze_csv_streaming(
+        UploadFile(file=io.BytesIO(data), filename="data.csv"), chunk_rows=700
+    )
+
+    assert streamed["memory"]["optimized_dtypes"] == parsed["memory"]["optimized_dtypes"]
+    assert streamed["memory"]["default_bytes"] == parsed["memory"]["default_bytes"]
+    assert streamed["memory"]["bytes"] == pytest.approx(parsed["memory"]["bytes"], rel=0.01)
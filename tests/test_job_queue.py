@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.job_queue import JobManager
+from app.services.state_backend import SqliteState
+from app.services.training_executor import TrainingCancelled
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_cancelled_queued_job_runs_cleanup():
+    manager = JobManager(workers=1, max_queue=5, retention=10)
+    release = threading.Event()
+
+    def blocker(on_progress, should_cancel):
+        release.wait(5)
+
+    cleaned = []
+    manager.submit(blocker, {})
+    queued = manager.submit(blocker, {}, cleanup=lambda: cleaned.append(True))
+
+    snapshot = manager.cancel(queued["job_id"])
+    release.set()
+
+    assert snapshot["status"] == "cancelled"
+    assert cleaned == [True]
+
+
+def test_job_waiting_for_admission_is_reported_as_waiting():
+    manager = JobManager(workers=1, max_queue=5, retention=10)
+    admit = threading.Event()
+
+    def gated(on_admitted, on_progress, should_cancel):
+        while not admit.wait(0.01):
+            if should_cancel():
+                return None
+        on_admitted()
+        return "done"
+
+    gated.waits_for_admission = True
+    job_id = manager.submit(gated, {})["job_id"]
+
+    _wait_for(lambda: manager.get(job_id)["status"] == "waiting")
+    stats = manager.stats()
+    assert stats["waiting_for_admission"] == 1
+    assert stats["oldest_queued_wait_seconds"] is not None
+    assert manager.get(job_id)["started_at"] is None
+
+    admit.set()
+    _wait_for(lambda: manager.get(job_id)["status"] == "succeeded")
+    assert manager.get(job_id)["started_at"] is not None
+    assert manager.stats()["wait_seconds"]["samples"] == 1
+
+
+def test_job_finishing_after_a_cancel_request_reports_it():
+    manager = JobManager(workers=1, max_queue=5, retention=10)
+    running, release = threading.Event(), threading.Event()
+
+    def uncancellable(on_progress, should_cancel):
+        running.set()
+        release.wait(5)
+        return "done"
+
+    job_id = manager.submit(uncancellable, {})["job_id"]
+    running.wait(5)
+    assert manager.cancel(job_id)["status"] == "cancelling"
+    release.set()
+
+    _wait_for(lambda: manager.get(job_id)["status"] not in {"running", "cancelling"})
+    job = manager.get(job_id)
+    assert job["status"] == "succeeded"
+    assert job["cancel_requested"] is True
+
+
+def test_jobs_are_visible_and_cancellable_from_another_worker(tmp_path):
+    state = SqliteState(str(tmp_path / "state.sqlite3"))
+    owner = JobManager(workers=1, max_queue=5, retention=10, backend=state)
+    other = JobManager(workers=1, max_queue=5, retention=10, backend=state)
+    running = threading.Event()
+
+    def cancellable(on_progress, should_cancel):
+        running.set()
+        on_progress("Ridge", "training")
+        while not should_cancel():
+            time.sleep(0.01)
+        raise TrainingCancelled()
+
+    job_id = owner.submit(cancellable, {})["job_id"]
+    running.wait(5)
+    _wait_for(lambda: other.get(job_id)["progress"] == {"Ridge": "training"})
+    assert other.get(job_id)["status"] == "running"
+
+    cancelled = other.cancel(job_id)
+    assert cancelled["status"] == "cancelling"
+    assert cancelled["cancel_requested"] is True
+
+    _wait_for(lambda: other.get(job_id)["status"] == "cancelled")
+    assert owner.get(job_id)["status"] == "cancelled"
+
+
+def test_unknown_job_is_not_found_on_any_worker(tmp_path):
+    manager = JobManager(workers=1, max_queue=5, retention=10,
+                         backend=SqliteState(str(tmp_path / "state.sqlite3")))
+    with pytest.raises(HTTPException) as error:
+        manager.get("missing")
+    assert error.value.status_code == 404
@@ -0,0 +1,43 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.utils.json_response as json_response
+from app.utils.json_response import FastJSONResponse
+
+PAYLOAD = {
+    "flag": np.bool_(True),
+    "count": np.int8(3),
+    "ratio": np.float32(0.5),
+    "missing": np.float64("nan"),
+    "values": np.array([1.0, np.inf, 2.0]),
+    "strided": np.arange(6, dtype=np.float64)[::2],
+    "flags": np.array([True, False]),
+    "series": pd.Series([1.5, np.nan], index=["a", "b"]),
+    "rows": pd.DataFrame({"x": [1, 2], "ok": [True, False]}),
+}
+
+EXPECTED = {
+    "flag": True,
+    "count": 3,
+    "ratio": 0.5,
+    "missing": None,
+    "values": [1.0, None, 2.0],
+    "strided": [0.0, 2.0, 4.0],
+    "flags": [True, False],
+    "series": {"a": 1.5, "b": None},
+    "rows": [{"x": 1, "ok": True}, {"x": 2, "ok": False}],
+}
+
+
+def test_stdlib_fallback_serializes_numpy_and_pandas(monkeypatch):
+    monkeypatch.setattr(json_response, "orjson", None)
+    assert json.loads(FastJSONResponse(PAYLOAD).body) == EXPECTED
+
+
+def test_orjson_matches_the_fallback():
+    if json_response.orjson is None:
+        pytest.skip("orjson is not installed")
+    assert json.loads(FastJSONResponse(PAYLOAD).body) == EXPECTED
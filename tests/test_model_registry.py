@@ -0,0 +1,55 @@
+import os
+import sqlite3
+import time
+
+from app.utils.model_registry import ModelRegistry
+
+
+def _write(path, age_days=0):
+    with open(path, "wb") as f:
+        f.write(b"model")
+    stamp = time.time() - age_days * 86400
+    os.utime(path, (stamp, stamp))
+
+
+def test_prune_keeps_pre_registry_artifacts_by_default(tmp_path):
+    model_dir = tmp_path / "saved"
+    model_dir.mkdir()
+    _write(model_dir / "Linear_old.pkl", age_days=90)
+    registry = ModelRegistry(str(tmp_path / "registry.sqlite3"), str(model_dir))
+
+    _write(model_dir / "Ridge_new.joblib")
+    registry.register("Ridge_new.joblib", "Ridge", artifact_size=5, compression=3,
+                      metrics={"test_r2": 0.5})
+
+    assert registry.prune(max_count=1, max_age_days=30) == []
+    assert (model_dir / "Linear_old.pkl").exists()
+    assert registry.get("Linear_old.pkl")["legacy"] is True
+
+    assert registry.prune(max_count=1, max_age_days=30, include_legacy=True) == ["Linear_old.pkl"]
+    assert not (model_dir / "Linear_old.pkl").exists()
+
+
+def test_existing_registry_marks_indexed_files_as_legacy(tmp_path):
+    db_path = tmp_path / "registry.sqlite3"
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute(
+            "CREATE TABLE models (filename TEXT PRIMARY KEY, model_name TEXT NOT NULL, "
+            "dataset_id TEXT, target TEXT, features TEXT NOT NULL DEFAULT '[]', "
+            "metrics TEXT NOT NULL DEFAULT '{}', artifact_size INTEGER NOT NULL, "
+            "compression INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "INSERT INTO models (filename, model_name, artifact_size, created_at) "
+            "VALUES ('Linear_old.pkl', 'Linear', 5, 0)"
+        )
+        conn.execute(
+            "INSERT INTO models (filename, model_name, metrics, artifact_size, created_at) "
+            "VALUES ('Ridge_new.joblib', 'Ridge', '{\"test_r2\": 0.5}', 5, 0)"
+        )
+    conn.close()
+
+    registry = ModelRegistry(str(db_path), str(tmp_path / "saved"))
+    assert registry.get("Linear_old.pkl")["legacy"] is True
+    assert registry.get("Ridge_new.joblib")["legacy"] is False
@@ -0,0 +1,30 @@
+import numpy as np
+
+from app.utils.plot_reduction import build_plot_views
+
+
+def test_views_of_empty_and_non_finite_splits_are_empty():
+    views = build_plot_views(
+        {
+            "train": (np.array([1.0, 2.0]), np.array([np.nan, np.inf])),
+            "test": (np.empty(0), np.empty(0)),
+        },
+        max_points=100,
+        density_bins=10,
+        histogram_bins=10,
+    )
+
+    for split in ("train", "test"):
+        assert views["lttb"][split] == {"y_actual": [], "y_pred": []}
+        assert views["minmax"][split] == {"y_actual": [], "y_pred": []}
+        assert views["density"][split] == {"edges": [], "counts": []}
+        assert views["residuals"][split] == {"bin_edges": [], "counts": [], "mean": None, "std": None}
+
+
+def test_density_and_residual_views_cover_every_point():
+    actual = np.arange(50, dtype=np.float64)
+    views = build_plot_views({"test": (actual, actual + 1)}, 10, 5, 4)
+
+    assert sum(map(sum, views["density"]["test"]["counts"])) == 50
+    assert sum(views["residuals"]["test"]["counts"]) == 50
+    assert views["residuals"]["test"]["mean"] == -1.0
@@ -0,0 +1,43 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.services.regression_service import run_regression
+
+
+def _upload():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({"a": rng.normal(size=200), "b": rng.normal(size=200)})
+    df["y1"] = 2 * df["a"] + rng.normal(size=200)
+    df["y2"] = df["b"] - df["a"]
+    return UploadFile(file=io.BytesIO(df.to_csv(index=False).encode()), filename="data.csv")
+
+
+@pytest.mark.parametrize("options, detail", [
+    ({"selection": "halving"}, "Halving selection needs the memory engine"),
+    ({"evaluation": "kfold"}, "K-fold evaluation needs the memory engine"),
+])
+def test_streaming_engine_rejects_memory_only_options(options, detail):
+    with pytest.raises(HTTPException) as error:
+        run_regression(
+            file=_upload(), target_column="y1", feature_columns=["a", "b"],
+            engine="streaming", **options
+        )
+    assert error.value.status_code == 400
+    assert error.value.detail == detail
+
+
+@pytest.mark.parametrize("targets, detail", [
+    ({"target_columns": ["y1", "y1"]}, "Duplicate target columns"),
+    ({"target_columns": ["y1", " y1 "]}, "Duplicate target columns"),
+    ({"target_columns": ["y1", "a"]}, "Target column 'a' is also a feature column"),
+    ({"target_column": "a"}, "Target column 'a' is also a feature column"),
+])
+def test_invalid_target_selection_is_rejected(targets, detail):
+    with pytest.raises(HTTPException) as error:
+        run_regression(file=_upload(), feature_columns=["a", "b"], **targets)
+    assert error.value.status_code == 400
+    assert error.value.detail == detail
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from app.services.result_cache import ResultCache
+from app.services.training_executor import TrainingCancelled
+
+
+def test_bypass_recomputes_while_leader_is_in_flight():
+    cache = ResultCache(max_bytes=1024 * 1024)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return {"run": "leader"}
+
+    leader = threading.Thread(target=cache.get_or_compute, args=("key", slow))
+    leader.start()
+    started.wait(5)
+
+    value, hit = cache.get_or_compute("key", lambda: {"run": "bypass"}, bypass=True)
+    release.set()
+    leader.join(5)
+
+    assert value == {"run": "bypass"}
+    assert hit is False
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = ResultCache(max_bytes=1024 * 1024)
+    calls = []
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"run": "leader"}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("key", slow)))
+    leader.start()
+    started.wait(5)
+    waiter = threading.Thread(target=lambda: results.append(cache.get_or_compute("key", slow)))
+    waiter.start()
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert len(calls) == 1
+    assert sorted(hit for _, hit in results) == [False, True]
+
+
+def test_cancelled_waiter_stops_waiting_for_the_leader():
+    cache = ResultCache(max_bytes=1024 * 1024)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return {"run": "leader"}
+
+    leader = threading.Thread(target=cache.get_or_compute, args=("key", slow))
+    leader.start()
+    started.wait(5)
+
+    began = time.monotonic()
+    with pytest.raises(TrainingCancelled):
+        cache.get_or_compute("key", slow, should_cancel=lambda: True)
+    assert time.monotonic() - began < 2
+    release.set()
+    leader.join(5)
@@ -0,0 +1,56 @@
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, RegressorMixin
+
+from app.services.training_executor import train_tasks
+
+
+class SleepyRegressor(RegressorMixin, BaseEstimator):
+    def __init__(self, seconds=0.0):
+        self.seconds = seconds
+
+    def fit(self, X, y):
+        time.sleep(self.seconds)
+        self.mean_ = float(np.mean(y))
+        return self
+
+    def predict(self, X):
+        return np.full(len(X), self.mean_)
+
+
+def _data():
+    X = pd.DataFrame({"a": np.arange(20, dtype=float)})
+    y = pd.Series(np.arange(20, dtype=float))
+    return X[:15], y[:15], X[15:], y[15:]
+
+
+def _tasks(*seconds):
+    return {
+        f"m{i}": ([("model", SleepyRegressor(s))], _data())
+        for i, s in enumerate(seconds)
+    }
+
+
+def test_queue_time_does_not_count_against_the_fit_timeout():
+    # One slot: the second fit waits ~0.6s in the queue but only runs ~0.6s itself
+    outcomes = train_tasks(_tasks(0.6, 0.6), mode="thread", max_workers=1, timeout=1.0)
+    assert all("error" not in outcome for outcome in outcomes.values())
+
+
+def test_timed_out_fit_keeps_its_slot():
+    started = time.monotonic()
+    outcomes = train_tasks(_tasks(1.0, 0.1), mode="thread", max_workers=1, timeout=0.6)
+
+    assert outcomes["m0"]["error"].startswith("Timed out")
+    assert "error" not in outcomes["m1"]
+    # m1 only started once the abandoned fit returned its slot
+    assert time.monotonic() - started >= 1.0
+
+
+def test_pending_fits_fail_when_abandoned_fits_never_free_their_slot():
+    outcomes = train_tasks(_tasks(3.0, 0.1), mode="thread", max_workers=1, timeout=0.5)
+
+    assert outcomes["m0"]["error"].startswith("Timed out")
+    assert outcomes["m1"]["error"].startswith("No training slot freed up")